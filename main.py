@@ -4,12 +4,13 @@ Purpose: Entry point for the Cron Job Manager CLI tool with logging.
 Responsibilities:
 - Initialize and parse CLI arguments
 - Initialize JobManager with logger
-- Execute add/list/remove cron job operations based on user input
+- Execute add/list/remove/run/logs cron job operations based on user input
 - Log all operations and errors professionally
 """
 
 import sys
 from script.cli import parse_args
+from script.config_loader import load_config
 from core.logger import get_logger
 from script.job import JobManager
 
@@ -25,6 +26,16 @@ def main():
         - Add job (--add)
         - Remove job (--remove)
         - List jobs (--list)
+        - Run a job through the capturing runner (--run)
+        - Show captured job output (--logs)
+        - Catch up on missed runs (--catch-up)
+        - Report or remove duplicate jobs (--dedupe [--apply])
+        - Show crontab versions or roll back (--history, --rollback VERSION)
+        - Simulate the job load for capacity planning (--simulate)
+        - Export or import job sets (--export FILE, --import FILE)
+        - Show the host each job is sharded to (--shards)
+        - List jobs firing in a time window (--window)
+        - Send pending notifications (--notify-flush)
     4. Handle errors and missing required arguments gracefully
     5. Log all actions and errors to console and file
     """
@@ -34,14 +45,33 @@ def main():
     # Parse command-line arguments
     args = parse_args()
     
+    # Load configuration (defaults are used if the file is missing)
+    try:
+        config = load_config()
+    except FileNotFoundError:
+        logger.warning("Config file not found. Using default settings.")
+        config = {}
+
+    # Storage backend selected on the command line overrides the config file
+    if args.backend or args.tabfile:
+        storage = dict(config.get("storage") or {})
+        storage["backend"] = args.backend or "tabfile"
+        if args.tabfile:
+            storage["tabfile"] = args.tabfile
+        config["storage"] = storage
+
+    # Host name for sharded execution (e.g. several instances on one machine)
+    if args.host_name:
+        config["sharding"] = {**(config.get("sharding") or {}), "host": args.host_name}
+
     # Initialize JobManager instance with logger
-    manager = JobManager(logger=logger)
+    manager = JobManager(logger=logger, config=config)
 
     try:
         # Add a new cron job
         if args.add:
-            if not args.schedule or not args.command:
-                logger.error("Missing required --schedule or --command for adding a job")
+            if not (args.schedule or args.after) or not args.command:
+                logger.error("Missing required --schedule (or --after) or --command for adding a job")
                 sys.exit(1)
 
             logger.info(f"Adding new cron job: '{args.command}' with schedule '{args.schedule}'")
@@ -50,7 +80,13 @@ def main():
                 command=args.command,
                 dry_run=args.dry_run,
                 interactive=args.interactive,
-                tag=args.tag
+                tag=args.tag,
+                capture=args.capture,
+                profile=args.profile,
+                timeout=args.timeout,
+                retries=args.retries,
+                after=args.after,
+                catch_up_policy=args.catch_up_policy
             )
             logger.info("Cron job added successfully.")
 
@@ -80,15 +116,103 @@ def main():
                 logger.info("No cron jobs found")
                 print("No cron jobs found.")
 
+        # Run a job through the capturing runner
+        elif args.run:
+            if not args.id or not args.command:
+                logger.error("Missing required --id or --command for running a job")
+                sys.exit(1)
+
+            sys.exit(manager.run_job(
+                job_id=args.id,
+                command=args.command,
+                profile=args.profile,
+                tag=args.tag,
+                timeout=args.timeout,
+                retries=args.retries
+            ))
+
+        # Show captured output of a job
+        elif args.logs:
+            if not args.id:
+                logger.error("Missing required --id for showing job logs")
+                sys.exit(1)
+
+            if not manager.show_logs(job_id=args.id):
+                sys.exit(1)
+
+        # Run jobs that missed fire times while the host was down
+        elif args.catch_up:
+            manager.catch_up(dry_run=args.dry_run, max_parallel=args.max_parallel)
+
+        # Report (and with --apply remove) duplicate jobs
+        elif args.dedupe:
+            manager.dedupe(apply=args.apply)
+
+        # Show the crontab version history
+        elif args.history:
+            manager.show_history()
+
+        # Restore an earlier crontab version
+        elif args.rollback is not None:
+            if not manager.rollback(args.rollback, dry_run=args.dry_run):
+                sys.exit(1)
+
+        # Simulate the job load, optionally with candidate batches
+        elif args.simulate:
+            estimates = {}
+            for estimate in args.estimate:
+                job_id, _, seconds = estimate.partition("=")
+                estimates[job_id] = float(seconds)
+            manager.simulate_load(
+                horizon=args.simulate,
+                cores=args.cores,
+                estimates=estimates,
+                candidates=args.candidate
+            )
+
+        # Export all jobs to a binary file
+        elif args.export:
+            if not manager.export_jobs(args.export):
+                sys.exit(1)
+
+        # Import jobs from a binary export file
+        elif args.import_file:
+            if not manager.import_jobs(args.import_file, dry_run=args.dry_run):
+                sys.exit(1)
+
+        # Show how jobs are spread over the sharding hosts
+        elif args.shards:
+            manager.show_shards()
+
+        # List jobs that fire in a time window
+        elif args.window:
+            start, end = args.window
+            try:
+                jobs = manager.jobs_in_window(start, end)
+            except ValueError as e:
+                logger.error("Invalid --window: %s", e)
+                sys.exit(1)
+            print(f"\n{len(jobs)} job(s) fire between {start.isoformat()} and {end.isoformat()}:")
+            for job in jobs:
+                print(f"[{job['id']}] {job['schedule']} -> {job['command']}")
+
+        # Send pending notifications regardless of the batch window
+        elif args.notify_flush:
+            manager.close(flush_notifications=True)
+
         # Handle unknown operation
         else:
-            logger.error("Unknown operation. Use --add, --remove, or --list.")
+            logger.error("Unknown operation. Use --add, --remove, --list, --run or --logs.")
             sys.exit(1)
 
     except Exception as e:
         logger.exception(f"Error executing operation: {e}")
         sys.exit(1)
 
+    finally:
+        # Deliver queued notifications (also runs on sys.exit)
+        manager.close()
+
 
 # Entry point check
 if __name__ == "__main__":
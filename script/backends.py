@@ -0,0 +1,339 @@
+"""
+Purpose: Pluggable storage backends for managed cron entries.
+
+Responsibilities:
+- Provide the crontab table(s) CronExecutor reads and edits
+- Persist only the tables a change touched
+- Render and restore the whole stored state (used by the version history)
+- Select a backend by name from the configuration or CLI
+"""
+
+import getpass
+import glob
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from crontab import CronTab
+
+STORAGE_DEFAULTS = {
+    "backend": "user",
+    "tabfile": None,
+    "cron_d": {
+        "dir": "/etc/cron.d",
+        "prefix": "cron-job-manager",
+        "user": "root",
+    },
+}
+
+# Marks the start of one drop-in file in the combined rendering of a cron.d backend
+SECTION_MARKER = "#=> "
+
+
+def storage_settings(config: Optional[dict] = None) -> dict:
+    """
+    Merge the `storage` section of the configuration with defaults.
+
+    Args:
+        config (dict, optional): Full configuration dictionary
+
+    Returns:
+        dict: Storage settings
+    """
+    settings = (config or {}).get("storage") or {}
+    return {
+        **STORAGE_DEFAULTS,
+        **settings,
+        "cron_d": {**STORAGE_DEFAULTS["cron_d"], **(settings.get("cron_d") or {})},
+    }
+
+
+def _replace_content(table: CronTab, content: str):
+    """Re-parse `content` into a loaded table, keeping where it writes to."""
+    source = table.intab
+    table.intab = content
+    table.read()
+    table.intab = source
+
+
+class CronBackend(ABC):
+    """
+    Interface of storage backends.
+
+    Backends storing a single table derive from SingleTableBackend and only
+    implement `_load()` and `write()`.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def tables(self) -> List[CronTab]:
+        """Return every loaded table."""
+
+    @abstractmethod
+    def table_for(self, tag: Optional[str] = None) -> CronTab:
+        """
+        Return the table a new job with this tag belongs in.
+
+        Args:
+            tag (str, optional): Job tag
+
+        Returns:
+            CronTab: Table to add the job to
+        """
+
+    @abstractmethod
+    def target(self) -> str:
+        """Return what the backend stores to (user, file or directory), e.g. to key its history."""
+
+    def cli_options(self) -> Dict[str, str]:
+        """
+        Return the command-line options that reopen this backend (e.g. in a `--run` line).
+
+        Returns:
+            dict: Options by flag (empty if the backend cannot be reopened by another process)
+        """
+        return {"--backend": self.name}
+
+    def new_job(self, table: CronTab, command: str, comment: str):
+        """Create a job in a table."""
+        return table.new(command=command, comment=comment)
+
+    @abstractmethod
+    def write(self, table: CronTab):
+        """Persist one table."""
+
+    @abstractmethod
+    def render(self) -> str:
+        """Return the whole stored state as text."""
+
+    @abstractmethod
+    def restore(self, content: str) -> List[CronTab]:
+        """
+        Replace the loaded state with a rendering produced by `render()`.
+
+        Args:
+            content (str): Rendered state
+
+        Returns:
+            list[CronTab]: Tables that must be written
+        """
+
+
+class SingleTableBackend(CronBackend):
+    """Base class of backends that store all jobs in one table."""
+
+    def __init__(self):
+        self.table = self._load()
+
+    @abstractmethod
+    def _load(self) -> CronTab:
+        """Load the backend's table."""
+
+    def tables(self) -> List[CronTab]:
+        return [self.table]
+
+    def table_for(self, tag: Optional[str] = None) -> CronTab:
+        return self.table
+
+    def render(self) -> str:
+        return self.table.render()
+
+    def restore(self, content: str) -> List[CronTab]:
+        _replace_content(self.table, content)
+        return [self.table]
+
+
+class UserBackend(SingleTableBackend):
+    """The current user's crontab (via the `crontab` program)."""
+
+    name = "user"
+
+    def _load(self) -> CronTab:
+        return CronTab(user=True)
+
+    def target(self) -> str:
+        return getpass.getuser()
+
+    def write(self, table: CronTab):
+        table.write()
+
+
+class TabfileBackend(SingleTableBackend):
+    """An arbitrary crontab file (user crontab format)."""
+
+    name = "tabfile"
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Path of the tabfile (created on the first write)
+        """
+        if not path:
+            raise ValueError("The tabfile backend needs a path (storage.tabfile or --tabfile)")
+        self.path = path
+        super().__init__()
+
+    def target(self) -> str:
+        return os.path.abspath(self.path)
+
+    def cli_options(self) -> Dict[str, str]:
+        return {"--backend": self.name, "--tabfile": os.path.abspath(self.path)}
+
+    def _load(self) -> CronTab:
+        if os.path.exists(self.path):
+            return CronTab(tabfile=self.path)
+        return CronTab(tab="")
+
+    def write(self, table: CronTab):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        table.write(self.path)
+
+
+class MemoryBackend(SingleTableBackend):
+    """A crontab that only lives in memory (tests, simulations, dry runs)."""
+
+    name = "memory"
+
+    def __init__(self, content: str = ""):
+        """
+        Args:
+            content (str): Initial crontab content
+        """
+        self.content = content
+        super().__init__()
+
+    def _load(self) -> CronTab:
+        return CronTab(tab=self.content)
+
+    def target(self) -> str:
+        return "memory"
+
+    def cli_options(self) -> Dict[str, str]:
+        return {}
+
+    def write(self, table: CronTab):
+        table.write()
+        self.content = table.render()
+
+
+class DropInBackend(CronBackend):
+    """
+    One system-format file per tag in /etc/cron.d.
+
+    Jobs tagged `etl` live in `<prefix>-etl`, untagged jobs in `<prefix>`, so
+    adding or removing a job rewrites one small file instead of the whole table.
+    """
+
+    name = "cron_d"
+
+    def __init__(self, directory: str, prefix: str, user: str):
+        """
+        Args:
+            directory (str): Drop-in directory (normally /etc/cron.d)
+            prefix (str): File name prefix of the managed drop-ins
+            user (str): User the jobs run as (the extra field of system crontabs)
+        """
+        self.directory = directory
+        self.prefix = prefix
+        self.user = user
+        self.files: Dict[str, CronTab] = {}
+        for path in sorted(glob.glob(os.path.join(directory, prefix)) +
+                           glob.glob(os.path.join(directory, f"{prefix}-*"))):
+            self.files[os.path.basename(path)] = CronTab(tabfile=path, user=False)
+
+    def target(self) -> str:
+        return os.path.join(os.path.abspath(self.directory), self.prefix)
+
+    def file_name(self, tag: Optional[str] = None) -> str:
+        """Return the drop-in file name for a tag (cron ignores names with dots)."""
+        if not tag:
+            return self.prefix
+        return f"{self.prefix}-{re.sub(r'[^A-Za-z0-9_-]', '_', tag)}"
+
+    def tables(self) -> List[CronTab]:
+        return list(self.files.values())
+
+    def table_for(self, tag: Optional[str] = None) -> CronTab:
+        name = self.file_name(tag)
+        if name not in self.files:
+            table = CronTab(tab="", user=False)
+            table.filen = os.path.join(self.directory, name)
+            self.files[name] = table
+        return self.files[name]
+
+    def new_job(self, table: CronTab, command: str, comment: str):
+        return table.new(command=command, comment=comment, user=self.user)
+
+    def write(self, table: CronTab):
+        """Replace the drop-in atomically (cron may read it at any time); drop it once empty."""
+        path = table.filen
+        if not table.render().strip():
+            if os.path.exists(path):
+                os.remove(path)
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = os.path.join(self.directory, f".{os.path.basename(path)}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(table.render())
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+
+    def render(self) -> str:
+        return "".join(f"{SECTION_MARKER}{name}\n{table.render()}" for name, table in sorted(self.files.items()))
+
+    def restore(self, content: str) -> List[CronTab]:
+        if content.strip() and not content.startswith(SECTION_MARKER):
+            # Restoring anything else would delete every managed drop-in
+            raise ValueError("Not a cron.d backend rendering; refusing to restore it")
+        sections: Dict[str, List[str]] = {}
+        current = None
+        for line in content.splitlines(keepends=True):
+            if line.startswith(SECTION_MARKER):
+                current = line[len(SECTION_MARKER):].strip()
+                sections[current] = []
+            elif current is not None:
+                sections[current].append(line)
+
+        changed = []
+        for name in sorted(set(self.files) | set(sections)):
+            text = "".join(sections.get(name, []))
+            table = self.files.get(name)
+            if table is None:
+                table = self.files[name] = CronTab(tab="", user=False)
+                table.filen = os.path.join(self.directory, name)
+            if table.render() != text:
+                _replace_content(table, text)
+                changed.append(table)
+        return changed
+
+
+BACKENDS = ("user", "tabfile", "cron_d", "memory")
+
+
+def create_backend(config: Optional[dict] = None) -> CronBackend:
+    """
+    Build the storage backend selected in the configuration.
+
+    Args:
+        config (dict, optional): Full configuration dictionary (`storage` section)
+
+    Returns:
+        CronBackend: Backend instance
+
+    Raises:
+        ValueError: if the backend name is unknown or its settings are incomplete
+    """
+    settings = storage_settings(config)
+    name = settings["backend"]
+    if name == "user":
+        return UserBackend()
+    if name == "tabfile":
+        return TabfileBackend(settings["tabfile"])
+    if name == "cron_d":
+        cron_d = settings["cron_d"]
+        return DropInBackend(cron_d["dir"], cron_d["prefix"], cron_d["user"])
+    if name == "memory":
+        return MemoryBackend()
+    raise ValueError(f"Unknown storage backend: {name} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,424 @@
+"""
+Purpose: Calendar index answering "which jobs fire between T1 and T2".
+
+Responsibilities:
+- Keep a minute-of-week bitmask per job and an inverted index of job bitsets
+  per minute and per hour of the week
+- Update the index incrementally when jobs are added or removed
+- Translate query windows into local wall-clock time, honouring time zones and DST
+- Persist the masks and the inverted bitsets in SQLite, so opening the index
+  reads only the job table and an update writes only the rows it touched
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from script.schedule import CronSchedule
+from script.state import state_settings
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover - Python < 3.9
+    ZoneInfo = None
+
+MINUTES_PER_WEEK = 7 * 24 * 60
+HOURS_PER_WEEK = 7 * 24
+INDEX_FILE = "calendar.db"
+
+
+def index_timezone(config: Optional[dict] = None) -> tzinfo:
+    """
+    Return the time zone cron evaluates schedules in.
+
+    Args:
+        config (dict, optional): Full configuration dictionary (`calendar.timezone`)
+
+    Returns:
+        tzinfo: Configured IANA zone, or the host's local zone
+    """
+    name = ((config or {}).get("calendar") or {}).get("timezone")
+    if name:
+        if ZoneInfo is None:
+            raise ValueError("Named time zones require Python 3.9+ (zoneinfo)")
+        return ZoneInfo(name)
+    return datetime.now().astimezone().tzinfo
+
+
+def week_minute(moment: datetime) -> int:
+    """Return the minute of the week of a naive local time (Sunday 00:00 = 0)."""
+    return ((moment.weekday() + 1) % 7) * 1440 + moment.hour * 60 + moment.minute
+
+
+def weekly_mask(schedule: CronSchedule) -> Tuple[int, bool]:
+    """
+    Compute the minute-of-week bitmask of a schedule.
+
+    Args:
+        schedule (CronSchedule): Parsed schedule
+
+    Returns:
+        tuple[int, bool]: (mask, exact). When `exact` is False the schedule also
+        depends on the day of month or month, and the mask is a superset that
+        must be confirmed against the calendar.
+    """
+    if schedule.reboot:
+        return 0, True
+    full_days = len(schedule.days) == 31
+    if schedule.day_star or schedule.weekday_star:
+        # Both day fields must match: the weekday set bounds the days
+        weekdays = schedule.weekdays
+        day_exact = full_days
+    else:
+        # Either day field may match: a day-of-month can fall on any weekday
+        weekdays = frozenset(range(7))
+        day_exact = full_days or len(schedule.weekdays) == 7
+    exact = day_exact and len(schedule.months) == 12
+
+    day_mask = 0
+    for hour in schedule.hours:
+        for minute in schedule.minutes:
+            day_mask |= 1 << (hour * 60 + minute)
+    mask = 0
+    for weekday in weekdays:
+        mask |= day_mask << (weekday * 1440)
+    return mask, exact
+
+
+def _bits(value: int) -> Iterable[int]:
+    # Scanning the binary text is far cheaper than big-int arithmetic per bit
+    text = format(value, "b")[::-1]
+    position = text.find("1")
+    while position >= 0:
+        yield position
+        position = text.find("1", position + 1)
+
+
+class CalendarIndex:
+    """
+    Minute-of-week index over the managed job set, persisted in SQLite.
+
+    Each job gets a slot number. For every minute `m` and hour `h` of the week
+    the index keeps the bitset of slots firing then; adding or removing a job
+    sets or clears its slot bit in just the rows its schedule touches, and a
+    query loads and ORs at most two partial hours of minute rows plus whole
+    hour rows. Opening the index only reads the job table.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        """
+        Initialize CalendarIndex and load the job table from `<state dir>/calendar.db`.
+
+        Args:
+            config (dict, optional): Full configuration dictionary
+        """
+        self.path = os.path.join(state_settings(config)["dir"], INDEX_FILE)
+        self.tz = index_timezone(config)
+        self.jobs: Dict[str, Dict] = {}
+        self.slots: List[Optional[str]] = []
+        self.free_slots: List[int] = []
+        # Loaded rows of the inverted index, by kind ("minute" / "hour") and position
+        self._rows: Dict[str, Dict[int, bytearray]] = {"minute": {}, "hour": {}}
+        self._dirty_rows: Dict[str, set] = {"minute": set(), "hour": set()}
+        self._dirty_jobs: set = set()
+        self._schedules: Dict[str, CronSchedule] = {}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, schedule TEXT NOT NULL,"
+                " mask TEXT NOT NULL, exact INTEGER NOT NULL, slot INTEGER NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS bits (kind TEXT NOT NULL, position INTEGER NOT NULL,"
+                " bits BLOB NOT NULL, PRIMARY KEY (kind, position))"
+            )
+            rows = conn.execute("SELECT job_id, schedule, exact, slot FROM jobs").fetchall()
+        finally:
+            conn.close()
+        for job_id, schedule, exact, slot in rows:
+            # Masks are only needed to remove a job; they are read when that happens
+            self.jobs[job_id] = {"schedule": schedule, "mask": None, "exact": bool(exact), "slot": slot}
+            if slot >= len(self.slots):
+                self.slots.extend([None] * (slot + 1 - len(self.slots)))
+            self.slots[slot] = job_id
+        self.free_slots = [slot for slot in range(len(self.slots) - 1, -1, -1) if self.slots[slot] is None]
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+
+    def save(self):
+        """Write the changed jobs and index rows in one transaction."""
+        if not self._dirty_jobs and not any(self._dirty_rows.values()):
+            return
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job_id in self._dirty_jobs:
+                entry = self.jobs.get(job_id)
+                if entry is None:
+                    conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+                else:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO jobs (job_id, schedule, mask, exact, slot) VALUES (?, ?, ?, ?, ?)",
+                        (job_id, entry["schedule"], format(entry["mask"], "x"), int(entry["exact"]), entry["slot"]),
+                    )
+            for kind, positions in self._dirty_rows.items():
+                conn.executemany(
+                    "INSERT OR REPLACE INTO bits (kind, position, bits) VALUES (?, ?, ?)",
+                    ((kind, position, bytes(self._rows[kind][position])) for position in positions),
+                )
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        self._dirty_jobs.clear()
+        for positions in self._dirty_rows.values():
+            positions.clear()
+
+    def add(self, job_id: str, schedule: str, parsed: Optional[CronSchedule] = None):
+        """
+        Index a job (replacing any previous entry for the same ID).
+
+        Args:
+            job_id (str): UUID of the job
+            schedule (str): Cron schedule of the job
+            parsed (CronSchedule, optional): Already parsed schedule (e.g. loaded from an export file)
+
+        Raises:
+            ValueError: if the schedule is invalid
+        """
+        parsed = parsed or CronSchedule(schedule)
+        mask, exact = weekly_mask(parsed)
+        self.remove(job_id)
+        self._insert(job_id, schedule, mask, exact)
+        self._schedules[job_id] = parsed
+
+    def remove(self, job_id: str) -> bool:
+        """
+        Drop a job from the index.
+
+        Args:
+            job_id (str): UUID of the job
+
+        Returns:
+            bool: True if the job was indexed
+        """
+        entry = self.jobs.pop(job_id, None)
+        if entry is None:
+            return False
+        mask = entry["mask"]
+        if mask is None:
+            conn = self._connect()
+            try:
+                row = conn.execute("SELECT mask FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            finally:
+                conn.close()
+            mask = int(row[0], 16) if row else 0
+        self._set_slot(entry["slot"], mask, False)
+        self._dirty_jobs.add(job_id)
+        self.slots[entry["slot"]] = None
+        self.free_slots.append(entry["slot"])
+        self._schedules.pop(job_id, None)
+        return True
+
+    def sync(self, jobs: List[Dict]) -> bool:
+        """
+        Bring the index in line with the managed jobs, touching only the differences.
+
+        Disabled entries (e.g. downstream jobs fired by their upstreams) and
+        @reboot jobs are not indexed.
+
+        Args:
+            jobs (list[dict]): Managed jobs as returned by CronExecutor.list_all()
+
+        Returns:
+            bool: True if the index changed
+        """
+        wanted = {
+            job["id"]: job["schedule"] for job in jobs
+            if job.get("enabled", True) and job.get("id") and job["schedule"].strip().lower() != "@reboot"
+        }
+        changed = False
+        for job_id in [job_id for job_id in self.jobs if job_id not in wanted]:
+            changed |= self.remove(job_id)
+        for job_id, schedule in wanted.items():
+            if self.jobs.get(job_id, {}).get("schedule") != schedule:
+                try:
+                    self.add(job_id, schedule)
+                    changed = True
+                except ValueError:
+                    continue
+        return changed
+
+    def _insert(self, job_id: str, schedule: str, mask: int, exact: bool):
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.slots[slot] = job_id
+        else:
+            slot = len(self.slots)
+            self.slots.append(job_id)
+        self.jobs[job_id] = {"schedule": schedule, "mask": mask, "exact": exact, "slot": slot}
+        self._dirty_jobs.add(job_id)
+        self._set_slot(slot, mask, True)
+
+    def _load_rows(self, kind: str, positions: Iterable[int]) -> Dict[int, bytearray]:
+        """Return the index rows at `positions`, reading the ones not loaded yet."""
+        rows = self._rows[kind]
+        missing = [position for position in positions if position not in rows]
+        if missing:
+            conn = self._connect()
+            try:
+                # Stay below SQLite's limit on bound parameters
+                for chunk in range(0, len(missing), 500):
+                    part = missing[chunk:chunk + 500]
+                    for position, bits in conn.execute(
+                        f"SELECT position, bits FROM bits WHERE kind = ? AND position IN ({','.join('?' * len(part))})",
+                        [kind, *part],
+                    ):
+                        rows[position] = bytearray(bits)
+            finally:
+                conn.close()
+            for position in missing:
+                rows.setdefault(position, bytearray())
+        return rows
+
+    def _set_slot(self, slot: int, mask: int, value: bool):
+        """Set or clear one slot's bit in the minute and hour rows of a weekly mask."""
+        minutes = list(_bits(mask))
+        index, bit = slot >> 3, 1 << (slot & 7)
+        for kind, positions in (("minute", minutes), ("hour", sorted({minute // 60 for minute in minutes}))):
+            rows = self._load_rows(kind, positions)
+            for position in positions:
+                row = rows[position]
+                if len(row) <= index:
+                    row.extend(bytes(index + 1 - len(row)))
+                if value:
+                    row[index] |= bit
+                else:
+                    row[index] &= ~bit
+            self._dirty_rows[kind].update(positions)
+
+    def minute_bits(self, minute: int) -> int:
+        """Return the bitset of slots firing in a minute of the week."""
+        return int.from_bytes(self._load_rows("minute", [minute])[minute], "little")
+
+    def hour_bits(self, hour: int) -> int:
+        """Return the bitset of slots firing in an hour of the week."""
+        return int.from_bytes(self._load_rows("hour", [hour])[hour], "little")
+
+    def _schedule(self, job_id: str) -> CronSchedule:
+        if job_id not in self._schedules:
+            self._schedules[job_id] = CronSchedule(self.jobs[job_id]["schedule"])
+        return self._schedules[job_id]
+
+    def _local_ranges(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        """
+        Split an absolute window into naive local wall-clock ranges with a constant UTC offset.
+
+        After a forward DST jump the skipped wall-clock minutes are attributed to the
+        moment of the jump, because cron runs jobs scheduled in the gap right after it.
+        """
+        ranges = []
+        cursor = start
+        previous_offset = (start - timedelta(microseconds=1)).astimezone(self.tz).utcoffset()
+        while cursor < end:
+            offset = cursor.astimezone(self.tz).utcoffset()
+            # Find the next offset change (probing a day at a time, then bisecting)
+            probe = cursor
+            segment_end = end
+            while probe < end:
+                step = min(probe + timedelta(days=1), end)
+                if (step - timedelta(microseconds=1)).astimezone(self.tz).utcoffset() != offset:
+                    low, high = probe, step
+                    while high - low > timedelta(minutes=1):
+                        middle = low + (high - low) / 2
+                        if middle.astimezone(self.tz).utcoffset() == offset:
+                            low = middle
+                        else:
+                            high = middle
+                    segment_end = high.replace(second=0, microsecond=0)
+                    if segment_end <= cursor:
+                        segment_end = high
+                    break
+                probe = step
+
+            local_start = cursor.astimezone(self.tz).replace(tzinfo=None)
+            local_end = local_start + (segment_end - cursor)
+            if offset > previous_offset:
+                local_start -= offset - previous_offset
+            ranges.append((local_start, local_end))
+            previous_offset = offset
+            cursor = segment_end
+        return ranges
+
+    def _slots_in_range(self, local_start: datetime, local_end: datetime) -> int:
+        """Return the bitset of slots whose weekly mask hits the wall-clock range."""
+        first = local_start.replace(second=0, microsecond=0)
+        if first < local_start:
+            first += timedelta(minutes=1)
+        count = int((local_end - first).total_seconds() // 60)
+        if (local_end - first).total_seconds() % 60:
+            count += 1
+        if count <= 0:
+            return 0
+        if count >= MINUTES_PER_WEEK:
+            return sum(1 << slot for slot, job_id in enumerate(self.slots) if job_id)
+
+        minutes, hours = [], []
+        position = week_minute(first)
+        remaining = count
+        while remaining > 0:
+            position %= MINUTES_PER_WEEK
+            if position % 60 == 0 and remaining >= 60:
+                hours.append(position // 60)
+                position += 60
+                remaining -= 60
+            else:
+                minutes.append(position)
+                position += 1
+                remaining -= 1
+        result = 0
+        for kind, positions in (("minute", minutes), ("hour", hours)):
+            rows = self._load_rows(kind, positions)
+            for position in positions:
+                result |= int.from_bytes(rows[position], "little")
+        return result
+
+    def query(self, start: datetime, end: datetime) -> List[str]:
+        """
+        Return the IDs of jobs that fire in the half-open window [start, end).
+
+        Args:
+            start (datetime): Window start; naive values are taken as index-local time
+            end (datetime): Window end; naive values are taken as index-local time
+
+        Returns:
+            list[str]: Sorted job IDs
+        """
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=self.tz)
+        if end.tzinfo is None:
+            end = end.replace(tzinfo=self.tz)
+        start, end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+        found = set()
+        for local_start, local_end in self._local_ranges(start, end):
+            for slot in _bits(self._slots_in_range(local_start, local_end)):
+                job_id = self.slots[slot]
+                if job_id is None or job_id in found:
+                    continue
+                if self.jobs[job_id]["exact"]:
+                    found.add(job_id)
+                    continue
+                # Day-of-month / month restricted: confirm against the real calendar
+                schedule = self._schedule(job_id)
+                if next(schedule.iter_between(local_start - timedelta(microseconds=1), local_end), None):
+                    found.add(job_id)
+        return sorted(found)
@@ -0,0 +1,158 @@
+"""
+Purpose: Anacron-style catch-up of runs missed while the host was down.
+
+Responsibilities:
+- Compute the fire times each runner-managed job missed since its last recorded run
+- Apply the per-job catch-up policy (run once, run all, skip)
+- Run the catch-up burst with a concurrency cap
+"""
+
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from script.runner import parse_runner_command
+from script.schedule import CronSchedule
+from script.state import RunStore
+
+POLICIES = ("once", "all", "skip")
+
+CATCHUP_DEFAULTS = {
+    "default_policy": "once",
+    "max_parallel": 2,
+    "max_runs": 24,
+}
+
+
+def catchup_settings(config: Optional[dict] = None) -> dict:
+    """
+    Merge the `catchup` section of the configuration with defaults.
+
+    Args:
+        config (dict, optional): Full configuration dictionary
+
+    Returns:
+        dict: Catch-up settings
+    """
+    return {**CATCHUP_DEFAULTS, **((config or {}).get("catchup") or {})}
+
+
+def validate_policy(policy: str) -> str:
+    """
+    Ensure a catch-up policy is known.
+
+    Raises:
+        ValueError: if the policy is not one of 'once', 'all' or 'skip'
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Invalid catch-up policy: {policy} (expected one of {', '.join(POLICIES)})")
+    return policy
+
+
+class CatchUp:
+    """
+    Plans and runs missed job executions.
+    """
+
+    def __init__(self, logger: logging.Logger, config: Optional[dict] = None, store: Optional[RunStore] = None):
+        """
+        Initialize CatchUp.
+
+        Args:
+            logger (logging.Logger): Logger instance
+            config (dict, optional): Full configuration dictionary
+            store (RunStore, optional): Run records (created from config if omitted)
+        """
+        self.logger = logger
+        self.settings = catchup_settings(config)
+        self.store = store or RunStore(config)
+
+    def plan(self, jobs: List[Dict], now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Work out which jobs missed runs and how often to run them now.
+
+        Only enabled runner-managed jobs that have at least one recorded run
+        are considered. Fire times are counted between the minute of the last
+        recorded start and the current minute (which cron fires itself).
+
+        Args:
+            jobs (list[dict]): Managed jobs as returned by CronExecutor.list_all()
+            now (datetime, optional): Current local time (defaults to now)
+
+        Returns:
+            list[dict]: One entry per job with missed runs (id, schedule, policy, missed, runs,
+            last_missed, and fire_times: the missed fire times the runs stand for)
+        """
+        now = (now or datetime.now()).replace(second=0, microsecond=0)
+        max_runs = int(self.settings["max_runs"])
+        plan = []
+        for job in jobs:
+            options = parse_runner_command(job["command"])
+            if options is None or not job.get("enabled", True):
+                continue
+            try:
+                schedule = CronSchedule(job["schedule"])
+            except ValueError:
+                self.logger.warning("Skipping job %s with unsupported schedule %r", job["id"], job["schedule"])
+                continue
+            last = self.store.last_run(job["id"])
+            if schedule.reboot or last is None or "started_at" not in last:
+                continue
+
+            last_fire = datetime.fromtimestamp(last["started_at"]).replace(second=0, microsecond=0)
+            # Both bounds are exclusive: the last run and the current minute (which cron fires itself)
+            missed = schedule.count_between(last_fire, now)
+            if not missed:
+                continue
+            policy = validate_policy(options.catch_up_policy or self.settings["default_policy"])
+            runs = {"once": 1, "all": min(missed, max_runs), "skip": 0}[policy]
+            last_missed = schedule.last_before(now, last_fire)
+            if policy == "all":
+                fire_times = list(deque(schedule.iter_between(last_fire, now), maxlen=runs))
+            else:
+                fire_times = [last_missed] * runs
+            plan.append({
+                "id": job["id"],
+                "schedule": job["schedule"],
+                "policy": policy,
+                "missed": missed,
+                "runs": runs,
+                "last_missed": last_missed,
+                "fire_times": fire_times,
+            })
+        return plan
+
+    def run(self, plan: List[Dict], launch: Callable[[str, datetime], Optional[int]],
+            max_parallel: Optional[int] = None) -> Dict[str, List[Optional[int]]]:
+        """
+        Execute a catch-up plan with at most `max_parallel` jobs running at once.
+
+        Repeated runs of one job (policy 'all') run one after another.
+
+        Args:
+            plan (list[dict]): Output of `plan()`
+            launch (callable): Runs a job by ID for one missed fire time and returns its
+                exit code (None if another host already ran that fire time)
+            max_parallel (int, optional): Concurrency cap (defaults to `catchup.max_parallel`)
+
+        Returns:
+            dict: Exit codes of the catch-up runs, by job ID
+        """
+        workers = max(1, int(max_parallel or self.settings["max_parallel"]))
+
+        def run_job(entry: Dict) -> List[Optional[int]]:
+            codes = []
+            for attempt, fire_time in enumerate(entry["fire_times"]):
+                self.logger.info("Catch-up run %s/%s of job %s for %s (%s missed)", attempt + 1, entry["runs"],
+                                 entry["id"], fire_time.strftime("%Y-%m-%d %H:%M"), entry["missed"])
+                codes.append(launch(entry["id"], fire_time))
+            return codes
+
+        pending = [entry for entry in plan if entry["runs"] > 0]
+        for entry in plan:
+            if entry["runs"] == 0:
+                self.logger.info("Skipping %s missed run(s) of job %s (policy: skip)", entry["missed"], entry["id"])
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return dict(zip((entry["id"] for entry in pending), pool.map(run_job, pending)))
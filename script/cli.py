@@ -10,6 +10,7 @@ Responsibilities:
 
 import argparse
 import sys
+from datetime import datetime
 
 def parse_args(args=None):
     """
@@ -34,10 +35,30 @@ def parse_args(args=None):
         "  python main.py --add --schedule '0 5 * * *' --command '/path/to/script.sh' --tag 'backup'\n"
         "  python main.py --list\n"
         "  python main.py --remove --id <JOB_UUID>\n"
+        "  python main.py --logs --id <JOB_UUID>\n"
         "\n"
         "Additional options:\n"
         "  --dry-run       Simulate the operation without applying changes\n"
-        "  --interactive   Run in interactive step-by-step input mode"
+        "  --interactive   Run in interactive step-by-step input mode\n"
+        "  --capture       Capture job output into per-job rotating log files\n"
+        "  --profile NAME  Apply a resource profile from config.yaml (implies --capture)\n"
+        "  --timeout SEC   Kill the job's process group after SEC seconds (implies --capture)\n"
+        "  --retries N     Retry a failed job N times with exponential backoff (implies --capture)\n"
+        "  --after IDS     Run the job when all listed jobs (comma-separated UUIDs) succeed\n"
+        "  --catch-up      Run jobs that missed fire times while the host was down\n"
+        "  --dedupe        Report duplicate jobs (same canonical schedule and command)\n"
+        "  --apply         With --dedupe: remove the duplicates in one crontab write\n"
+        "  --history       Show the crontab version history\n"
+        "  --rollback VER  Restore the crontab of version VER in one write\n"
+        "  --backend NAME  Crontab storage: user, tabfile, cron_d or memory\n"
+        "  --simulate [day|week]\n"
+        "                  Simulate the job load (--cores, --estimate ID=SEC, --candidate 'SCHED[=SEC];...')\n"
+        "  --export FILE   Write all jobs to a compact, checksummed binary file\n"
+        "  --import FILE   Add the jobs of an export file in one crontab write\n"
+        "  --shards        Show which host each job is assigned to when sharding is enabled\n"
+        "  --host-name H   Act as host H of the sharding.hosts ring (default: this host's name)\n"
+        "  --window START END\n"
+        "                  List jobs firing in [START, END) (ISO 8601, e.g. 2024-06-01T01:00Z)"
     )
 
     # Main parser with description and epilog for better CLI UX
@@ -47,7 +68,7 @@ def parse_args(args=None):
         formatter_class=argparse.RawTextHelpFormatter
     )
 
-    # User must choose exactly one action: add, list, or remove
+    # User must choose exactly one action
     group = parser.add_mutually_exclusive_group(required=True)
     group.add_argument(
         "--add",
@@ -64,6 +85,72 @@ def parse_args(args=None):
         action="store_true",
         help="Remove a cron job by its UUID"
     )
+    group.add_argument(
+        "--run",
+        action="store_true",
+        help="Run a job through the output-capturing runner (used in crontab entries)"
+    )
+    group.add_argument(
+        "--logs",
+        action="store_true",
+        help="Show captured output of a job by its UUID"
+    )
+    group.add_argument(
+        "--catch-up",
+        action="store_true",
+        help="Run jobs that missed fire times since their last recorded run (e.g. after a reboot)"
+    )
+    group.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Report jobs duplicating an earlier job (canonical schedule and normalized command)"
+    )
+    group.add_argument(
+        "--history",
+        action="store_true",
+        help="Show the recorded crontab versions"
+    )
+    group.add_argument(
+        "--rollback",
+        type=int,
+        metavar="VERSION",
+        help="Restore the crontab as it was at VERSION (see --history)"
+    )
+    group.add_argument(
+        "--simulate",
+        nargs="?",
+        const="day",
+        choices=["day", "week"],
+        help="Simulate a day (default) or week of job runs and report peak load and queueing"
+    )
+    group.add_argument(
+        "--export",
+        metavar="FILE",
+        help="Export all managed jobs to a binary file"
+    )
+    group.add_argument(
+        "--import",
+        dest="import_file",
+        metavar="FILE",
+        help="Import jobs from a binary export file (replaces jobs with the same UUID)"
+    )
+    group.add_argument(
+        "--shards",
+        action="store_true",
+        help="Show the host each job is assigned to by consistent hashing"
+    )
+    group.add_argument(
+        "--window",
+        nargs=2,
+        type=datetime.fromisoformat,
+        metavar=("START", "END"),
+        help="List jobs that fire between two ISO 8601 times (no offset: local time)"
+    )
+    group.add_argument(
+        "--notify-flush",
+        action="store_true",
+        help="Send pending notifications now instead of waiting for the batch window"
+    )
 
     # Extra arguments (only required for specific actions)
     parser.add_argument(
@@ -79,13 +166,18 @@ def parse_args(args=None):
     parser.add_argument(
         "--id",
         type=str,
-        help="UUID of the job to remove [Required for --remove]"
+        help="UUID of the job [Required for --remove, --run and --logs]"
     )
     parser.add_argument(
         "--tag",
         type=str,
         help="Optional tag/comment for the job"
     )
+    parser.add_argument(
+        "--host-name",
+        type=str,
+        help="Host name used for sharding (overrides sharding.host)"
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -96,6 +188,77 @@ def parse_args(args=None):
         action="store_true",
         help="Interactive mode for step-by-step input"
     )
+    parser.add_argument(
+        "--capture",
+        action="store_true",
+        help="Run the job through the runner, capturing output into per-job logs [Used with --add]"
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        help="Resource profile (rlimits, nice, I/O class, timeout) defined in config.yaml"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Wall-clock timeout per attempt in seconds; kills the job's process group"
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        help="Number of retries with exponential backoff and jitter after a failure"
+    )
+    parser.add_argument(
+        "--after",
+        type=lambda value: [job_id.strip() for job_id in value.split(",") if job_id.strip()],
+        help="Comma-separated upstream job UUIDs; run when all of them succeed [Used with --add]"
+    )
+    parser.add_argument(
+        "--catch-up-policy",
+        choices=["once", "all", "skip"],
+        help="What --catch-up does with this job's missed runs [Used with --add]"
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        help="Maximum number of jobs run at once [Used with --catch-up]"
+    )
+
+    parser.add_argument(
+        "--cores",
+        type=int,
+        help="Cores of the simulated host (defaults to this host's) [Used with --simulate]"
+    )
+    parser.add_argument(
+        "--estimate",
+        action="append",
+        default=[],
+        metavar="ID=SECONDS",
+        help="Duration estimate for a job without recorded runs; repeatable [Used with --simulate]"
+    )
+    parser.add_argument(
+        "--candidate",
+        action="append",
+        default=[],
+        metavar="'SCHEDULE[=SECONDS];...'",
+        help="Candidate batch of new jobs compared against the current set; repeatable [Used with --simulate]"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["user", "tabfile", "cron_d", "memory"],
+        help="Crontab storage backend (overrides storage.backend in config.yaml)"
+    )
+    parser.add_argument(
+        "--tabfile",
+        type=str,
+        help="Crontab file for the tabfile backend (implies --backend tabfile)"
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Remove the reported duplicates in a single crontab write [Used with --dedupe]"
+    )
 
     # Parse the arguments and return them to the caller (main.py)
     parsed_args = parser.parse_args(args if args is not None else sys.argv[1:])
@@ -0,0 +1,353 @@
+"""
+Purpose: Sharded execution of one crontab across several redundant hosts.
+
+Responsibilities:
+- Assign jobs to hosts by consistent hashing of the job UUID
+- Grant a lease per (job, fire time) so each run happens on exactly one host
+- Store leases in SQLite on a shared filesystem, or in memory for tests
+- Let other hosts take over a run when its owner does not claim it in time
+- Restrict catch-up to missed runs no host has claimed
+"""
+
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from script.state import state_settings
+
+SHARDING_DEFAULTS = {
+    "enabled": False,
+    "hosts": [],
+    "host": None,
+    "store": None,
+    "replicas": 64,
+    "lease_ttl": 3600,
+    "failover_after": 60,
+    "keep_days": 7,
+}
+
+LEASE_FILE = "leases.db"
+
+
+def sharding_settings(config: Optional[dict] = None) -> dict:
+    """
+    Merge the `sharding` section of the configuration with defaults.
+
+    Args:
+        config (dict, optional): Full configuration dictionary
+
+    Returns:
+        dict: Sharding settings (`host` defaults to this host's name)
+    """
+    settings = {**SHARDING_DEFAULTS, **((config or {}).get("sharding") or {})}
+    settings["host"] = settings["host"] or socket.gethostname()
+    return settings
+
+
+def lease_key(fire_time: datetime) -> str:
+    """Return the lease store key of a fire time (its minute)."""
+    return fire_time.strftime("%Y-%m-%dT%H:%M")
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent-hash ring with virtual nodes.
+
+    Adding or removing a host only moves the jobs that hash next to its points,
+    about 1/N of them.
+    """
+
+    def __init__(self, hosts: List[str], replicas: int = 64):
+        """
+        Args:
+            hosts (list[str]): Host names sharing the crontab
+            replicas (int): Virtual nodes per host (more = more even spread)
+        """
+        self.hosts = sorted(set(hosts))
+        points = sorted((_hash(f"{host}#{replica}"), host) for host in self.hosts for replica in range(replicas))
+        self._keys = [point for point, _ in points]
+        self._hosts = [host for _, host in points]
+
+    def owner(self, job_id: str) -> Optional[str]:
+        """
+        Return the host a job is assigned to.
+
+        Args:
+            job_id (str): UUID of the job
+
+        Returns:
+            str or None: Host name, or None if the ring is empty
+        """
+        if not self._keys:
+            return None
+        position = bisect.bisect(self._keys, _hash(job_id)) % len(self._keys)
+        return self._hosts[position]
+
+
+class MemoryLeaseStore:
+    """In-process lease store (a stand-in for the shared store in tests)."""
+
+    def __init__(self):
+        self._leases: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, job_id: str, fire_time: str, host: str, ttl: float) -> bool:
+        """
+        Take the lease of one run unless another host holds it or finished it.
+
+        Args:
+            job_id (str): UUID of the job
+            fire_time (str): Scheduled fire time the run belongs to
+            host (str): Host asking for the lease
+            ttl (float): Seconds after which an unfinished lease can be taken over
+
+        Returns:
+            bool: True if `host` now holds the lease
+        """
+        now = time.time()
+        with self._lock:
+            lease = self._leases.get((job_id, fire_time))
+            if lease is None or (not lease["done"] and lease["expires_at"] < now):
+                self._leases[(job_id, fire_time)] = {"host": host, "expires_at": now + ttl, "done": False}
+                return True
+            return lease["host"] == host and not lease["done"]
+
+    def complete(self, job_id: str, fire_time: str, host: str, returncode: int):
+        """Mark a run as finished so its lease is never granted again."""
+        with self._lock:
+            lease = self._leases.get((job_id, fire_time))
+            if lease and lease["host"] == host:
+                lease.update(done=True, returncode=returncode)
+
+    def prune(self, before: float):
+        """Forget leases that expired before a timestamp."""
+        with self._lock:
+            for key in [key for key, lease in self._leases.items() if lease["expires_at"] < before]:
+                del self._leases[key]
+
+    def holder(self, job_id: str, fire_time: str) -> Optional[str]:
+        """Return the host holding (or having finished) a run."""
+        with self._lock:
+            lease = self._leases.get((job_id, fire_time))
+            return lease["host"] if lease else None
+
+
+class SQLiteLeaseStore:
+    """
+    Lease store in an SQLite database on a filesystem shared by all hosts.
+
+    Every acquisition runs in an immediate (write-locking) transaction, so two
+    hosts can never both take the same lease.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Database file (created if missing)
+        """
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                " job_id TEXT NOT NULL, fire_time TEXT NOT NULL, host TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, done INTEGER NOT NULL DEFAULT 0, returncode INTEGER,"
+                " PRIMARY KEY (job_id, fire_time))"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA busy_timeout = 30000")
+        return conn
+
+    def acquire(self, job_id: str, fire_time: str, host: str, ttl: float) -> bool:
+        """See MemoryLeaseStore.acquire()."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT host, expires_at, done FROM leases WHERE job_id = ? AND fire_time = ?", (job_id, fire_time)
+            ).fetchone()
+            if row is None or (not row[2] and row[1] < now):
+                conn.execute(
+                    "INSERT OR REPLACE INTO leases (job_id, fire_time, host, expires_at, done) VALUES (?, ?, ?, ?, 0)",
+                    (job_id, fire_time, host, now + ttl),
+                )
+                acquired = True
+            else:
+                acquired = row[0] == host and not row[2]
+            conn.execute("COMMIT")
+            return acquired
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def complete(self, job_id: str, fire_time: str, host: str, returncode: int):
+        """See MemoryLeaseStore.complete()."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "UPDATE leases SET done = 1, returncode = ? WHERE job_id = ? AND fire_time = ? AND host = ?",
+                (returncode, job_id, fire_time, host),
+            )
+        finally:
+            conn.close()
+
+    def prune(self, before: float):
+        """See MemoryLeaseStore.prune()."""
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM leases WHERE expires_at < ?", (before,))
+        finally:
+            conn.close()
+
+    def holder(self, job_id: str, fire_time: str) -> Optional[str]:
+        """See MemoryLeaseStore.holder()."""
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT host FROM leases WHERE job_id = ? AND fire_time = ?", (job_id, fire_time)
+            ).fetchone()
+            return row[0] if row else None
+        finally:
+            conn.close()
+
+
+class Coordinator:
+    """
+    Decides whether this host runs a job's current fire time.
+
+    The job's owner on the hash ring claims the lease right away; other hosts
+    wait `failover_after` seconds and then try, so a run is only lost if every
+    host is down.
+    """
+
+    def __init__(self, logger: logging.Logger, config: Optional[dict] = None, store=None):
+        """
+        Initialize Coordinator.
+
+        Args:
+            logger (logging.Logger): Logger instance
+            config (dict, optional): Full configuration dictionary (`sharding` section)
+            store (optional): Lease store (SQLite at `sharding.store` or `<state dir>/leases.db` if omitted)
+        """
+        self.logger = logger
+        self.settings = sharding_settings(config)
+        self.host = self.settings["host"]
+        self.ring = HashRing(self.settings["hosts"] or [self.host], int(self.settings["replicas"]))
+        self.store = store or SQLiteLeaseStore(
+            self.settings["store"] or os.path.join(state_settings(config)["dir"], LEASE_FILE)
+        )
+
+    def owner(self, job_id: str) -> Optional[str]:
+        """Return the host a job is assigned to."""
+        return self.ring.owner(job_id)
+
+    def claim(self, job_id: str, fire_time: datetime, sleep=time.sleep, immediate: bool = False) -> bool:
+        """
+        Take the lease for one fire time of a job.
+
+        Args:
+            job_id (str): UUID of the job
+            fire_time (datetime): Scheduled fire time (the minute cron started the run)
+            sleep (callable): Used to wait before a failover attempt
+            immediate (bool): Take the lease right away whoever owns the job, because the
+                run was triggered on this host (e.g. by its upstream finishing here) or the
+                owner already had its head start (see `filter_catch_up()`)
+
+        Returns:
+            bool: True if this host should run the job
+        """
+        key = lease_key(fire_time)
+        owner = self.owner(job_id)
+        if owner != self.host and not immediate:
+            if self.settings["failover_after"] is None:
+                self.logger.info("Job %s belongs to %s; not running it here", job_id, owner)
+                return False
+            # Give the owner a head start; only take over if it did not claim the run
+            sleep(float(self.settings["failover_after"]))
+        acquired = self.store.acquire(job_id, key, self.host, float(self.settings["lease_ttl"]))
+        if acquired and owner != self.host and not immediate:
+            self.logger.warning("Owner %s did not claim job %s at %s; running it on %s", owner, job_id, key, self.host)
+        elif not acquired:
+            self.logger.info("Job %s at %s already claimed by %s", job_id, key, self.store.holder(job_id, key))
+        self.store.prune(time.time() - float(self.settings["keep_days"]) * 86400)
+        return acquired
+
+    def complete(self, job_id: str, fire_time: datetime, returncode: int):
+        """
+        Record that this host finished a claimed run.
+
+        Args:
+            job_id (str): UUID of the job
+            fire_time (datetime): Fire time passed to `claim()`
+            returncode (int): Exit code of the run
+        """
+        self.store.complete(job_id, lease_key(fire_time), self.host, returncode)
+
+    def filter_catch_up(self, plan: List[Dict], now: Optional[datetime] = None, sleep=time.sleep) -> List[Dict]:
+        """
+        Restrict a catch-up plan to the fire times this host should replay.
+
+        A host's run records do not see runs made elsewhere, so every fire time
+        that already has a lease is dropped, and so is every fire time older
+        than `keep_days` (its lease may have been pruned). Fire times of jobs
+        owned by other hosts are left to their owners for one `failover_after`
+        wait for the whole plan; those still unclaimed afterwards are kept, to
+        be claimed with `immediate=True`.
+
+        Args:
+            plan (list[dict]): Output of CatchUp.plan()
+            now (datetime, optional): Current local time (defaults to now)
+            sleep (callable): Used for the failover wait
+
+        Returns:
+            list[dict]: Plan entries with the remaining fire times (entries left
+            without any are dropped, except those of policy 'skip')
+        """
+        cutoff = (now or datetime.now()) - timedelta(days=float(self.settings["keep_days"]))
+
+        def unclaimed(entry: Dict) -> List[datetime]:
+            return [fire_time for fire_time in entry["fire_times"]
+                    if fire_time > cutoff and self.store.holder(entry["id"], lease_key(fire_time)) is None]
+
+        remaining = [{**entry, "fire_times": unclaimed(entry)} for entry in plan]
+        foreign = [entry for entry in remaining if entry["fire_times"] and self.owner(entry["id"]) != self.host]
+        if foreign:
+            if self.settings["failover_after"] is None:
+                for entry in foreign:
+                    entry["fire_times"] = []
+            else:
+                self.logger.info("Giving the owners of %s job(s) %ss to catch them up",
+                                 len(foreign), self.settings["failover_after"])
+                sleep(float(self.settings["failover_after"]))
+                for entry in foreign:
+                    entry["fire_times"] = unclaimed(entry)
+
+        filtered = []
+        for before, entry in zip(plan, remaining):
+            dropped = len(before["fire_times"]) - len(entry["fire_times"])
+            if dropped:
+                self.logger.info("Job %s: %s missed run(s) already run elsewhere, too old or left to %s",
+                                 entry["id"], dropped, self.owner(entry["id"]))
+            if entry["fire_times"] or entry["policy"] == "skip":
+                filtered.append({**entry, "runs": len(entry["fire_times"])})
+        return filtered
@@ -0,0 +1,206 @@
+"""
+Purpose: Job dependency chains (DAG) triggered on completion.
+
+Responsibilities:
+- Persist the dependency graph of managed jobs alongside the run records
+- Reject unknown upstreams and cycles when dependencies are added
+- Decide when a downstream job is ready (all upstreams succeeded since its last run)
+- Run ready downstream jobs, with independent branches in parallel
+"""
+
+import fcntl
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from script.state import RunStore, state_settings
+from script.utils import validate_job_id
+
+DAG_DEFAULTS = {
+    "max_parallel": 4,
+}
+
+DAG_FILE = "dag.json"
+
+
+class JobGraph:
+    """
+    Dependency graph of managed jobs, stored as `{job_id: [upstream ids]}`.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        """
+        Initialize JobGraph and load it from `<state dir>/dag.json`.
+
+        Args:
+            config (dict, optional): Full configuration dictionary
+        """
+        self.path = os.path.join(state_settings(config)["dir"], DAG_FILE)
+        self.upstreams: Dict[str, List[str]] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.upstreams = json.load(f).get("upstreams", {})
+
+    def save(self):
+        """Write the graph atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"upstreams": self.upstreams}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def parents(self, job_id: str) -> List[str]:
+        """Return the upstream jobs of a job."""
+        return list(self.upstreams.get(job_id, []))
+
+    def children(self, job_id: str) -> List[str]:
+        """Return the jobs that directly depend on a job."""
+        return sorted(child for child, parents in self.upstreams.items() if job_id in parents)
+
+    def ancestors(self, job_id: str) -> Set[str]:
+        """Return every job that a job transitively depends on."""
+        seen: Set[str] = set()
+        stack = self.parents(job_id)
+        while stack:
+            current = stack.pop()
+            if current not in seen:
+                seen.add(current)
+                stack.extend(self.parents(current))
+        return seen
+
+    def add(self, job_id: str, upstreams: Iterable[str], known_jobs: Optional[Iterable[str]] = None):
+        """
+        Make a job depend on the given upstream jobs.
+
+        Args:
+            job_id (str): UUID of the downstream job
+            upstreams (iterable[str]): UUIDs of the upstream jobs
+            known_jobs (iterable[str], optional): IDs of existing managed jobs, used to reject unknown upstreams
+
+        Raises:
+            ValueError: if an upstream is unknown or the dependency would create a cycle
+        """
+        upstreams = list(dict.fromkeys(validate_job_id(upstream) for upstream in upstreams))
+        if known_jobs is not None:
+            missing = [upstream for upstream in upstreams if upstream not in set(known_jobs)]
+            if missing:
+                raise ValueError(f"Unknown upstream job(s): {', '.join(missing)}")
+        for upstream in upstreams:
+            if upstream == job_id or job_id in self.ancestors(upstream):
+                raise ValueError(f"Dependency {upstream} -> {job_id} would create a cycle")
+        self.upstreams[job_id] = sorted(set(self.parents(job_id)) | set(upstreams))
+
+    def remove(self, job_id: str) -> List[str]:
+        """
+        Remove a job and every dependency on it.
+
+        Args:
+            job_id (str): UUID of the job to remove
+
+        Returns:
+            list[str]: Downstream jobs that are left without any upstream
+        """
+        self.upstreams.pop(job_id, None)
+        orphaned = []
+        for child in self.children(job_id):
+            self.upstreams[child] = [parent for parent in self.upstreams[child] if parent != job_id]
+            if not self.upstreams[child]:
+                del self.upstreams[child]
+                orphaned.append(child)
+        return orphaned
+
+
+class DownstreamRunner:
+    """
+    Fires downstream jobs as soon as all of their upstreams have succeeded.
+    """
+
+    def __init__(self, logger: logging.Logger, config: Optional[dict] = None, graph: Optional[JobGraph] = None,
+                 store: Optional[RunStore] = None):
+        """
+        Initialize DownstreamRunner.
+
+        Args:
+            logger (logging.Logger): Logger instance
+            config (dict, optional): Full configuration dictionary
+            graph (JobGraph, optional): Dependency graph (loaded from state if omitted)
+            store (RunStore, optional): Run records (created from config if omitted)
+        """
+        self.logger = logger
+        self.settings = {**DAG_DEFAULTS, **((config or {}).get("dag") or {})}
+        self.graph = graph or JobGraph(config)
+        self.store = store or RunStore(config)
+        self.lock_dir = os.path.join(state_settings(config)["dir"], "locks")
+
+    def is_ready(self, job_id: str) -> bool:
+        """
+        Check whether every upstream of a job succeeded after the job last started.
+
+        Args:
+            job_id (str): UUID of the downstream job
+
+        Returns:
+            bool: True if the job should run now
+        """
+        last = self.store.last_run(job_id)
+        last_started = last.get("started_at", 0.0) if last else 0.0
+        for parent in self.graph.parents(job_id):
+            success = self.store.last_success(parent)
+            if not success or success.get("finished_at", 0.0) <= last_started:
+                return False
+        return True
+
+    def run_after(self, job_id: str, launch: Callable[[str], Optional[int]]) -> Dict[str, int]:
+        """
+        Run every downstream job that becomes ready after `job_id` succeeded.
+
+        Independent branches run in parallel (up to `dag.max_parallel`); each
+        finished job immediately releases its own ready children.
+
+        Args:
+            job_id (str): UUID of the upstream job that just succeeded
+            launch (callable): Runs a job by ID and returns its exit code (None if it did not run)
+
+        Returns:
+            dict: Exit code of every downstream job that was run, by job ID
+        """
+        results: Dict[str, int] = {}
+        with ThreadPoolExecutor(max_workers=int(self.settings["max_parallel"])) as pool:
+            running: Dict[Future, str] = {}
+
+            def release(finished: str):
+                for child in self.graph.children(finished):
+                    if child not in running.values() and self.is_ready(child):
+                        running[pool.submit(self._launch_locked, child, launch)] = child
+
+            release(job_id)
+            while running:
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    child = running.pop(future)
+                    returncode = future.result()
+                    if returncode is None:
+                        continue
+                    results[child] = returncode
+                    if returncode == 0:
+                        release(child)
+                    else:
+                        self.logger.error("Downstream job %s failed; its dependents will not run", child)
+        return results
+
+    def _launch_locked(self, job_id: str, launch: Callable[[str], Optional[int]]) -> Optional[int]:
+        """Run a job unless another process is already running it for this trigger."""
+        os.makedirs(self.lock_dir, exist_ok=True)
+        with open(os.path.join(self.lock_dir, f"{job_id}.lock"), "w") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.logger.info("Downstream job %s is already running elsewhere", job_id)
+                return None
+            # Re-check under the lock: another upstream may have triggered it meanwhile
+            if not self.is_ready(job_id):
+                return None
+            self.logger.info("Triggering downstream job %s", job_id)
+            return launch(job_id)
@@ -0,0 +1,153 @@
+"""
+Purpose: Detect duplicate and redundant managed jobs.
+
+Responsibilities:
+- Normalize commands (runner wrapper, quoting, whitespace) without changing their meaning
+- Build a hashable key from the canonical schedule, command and run options
+- Group equivalent jobs in a single pass over the crontab
+"""
+
+import re
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from script.runner import parse_runner_command, unwrap_command
+from script.schedule import CronSchedule
+
+# Unquoted characters that stand for themselves. Anything else (operators,
+# globs, expansions, '=' of assignments, '~', '#', backslashes, cron's '%')
+# makes a word keep its exact spelling.
+LITERAL_CHARS = re.compile(r"[\w@+:,./-]")
+LITERAL_VALUE = re.compile(r"[\w@+:,./-]+")
+# Quoting one of these turns a keyword into a plain word
+RESERVED_WORDS = {
+    "!", "case", "do", "done", "elif", "else", "esac", "fi", "for", "function",
+    "if", "in", "select", "then", "time", "until", "while",
+}
+
+
+def _split_words(command: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Split a command at unquoted whitespace, keeping quote context.
+
+    Returns:
+        list[tuple]: (spelling, literal value) per word; the literal value is None
+        when the word contains anything the shell interprets (unquoted operators,
+        globs or expansions, escapes, '$' or '`' inside double quotes, unbalanced quotes)
+    """
+    words = []
+    spelling: List[str] = []
+    value: List[str] = []
+    literal = True
+    quote = None
+    escaped = False
+    for char in command:
+        if escaped:
+            # The escaped character (even whitespace or a quote) belongs to the word as written
+            spelling.append(char)
+            escaped = False
+        elif char == "\\" and quote != "'":
+            spelling.append(char)
+            literal = False
+            escaped = True
+        elif quote:
+            spelling.append(char)
+            if char == quote:
+                quote = None
+            else:
+                literal &= not (quote == '"' and char in "$`")
+                value.append(char)
+        elif char.isspace():
+            if spelling:
+                words.append(("".join(spelling), "".join(value) if literal else None))
+                spelling, value, literal = [], [], True
+        elif char in "'\"":
+            quote = char
+            spelling.append(char)
+        else:
+            spelling.append(char)
+            value.append(char)
+            literal &= bool(LITERAL_CHARS.match(char))
+    if spelling:
+        words.append(("".join(spelling), "".join(value) if literal and not (quote or escaped) else None))
+    return words
+
+
+def _render_word(spelling: str, value: Optional[str]) -> str:
+    if value is None or value in RESERVED_WORDS:
+        return spelling
+    if LITERAL_VALUE.fullmatch(value):
+        return value
+    # Always quoted, so it cannot collide with an unquoted spelling
+    return "'" + value.replace("'", "'\"'\"'") + "'"
+
+
+def normalize_command(command: str) -> str:
+    """
+    Normalize a command for comparison.
+
+    The runner wrapper is stripped, runs of unquoted whitespace collapse to one
+    space, and words that are plain strings are rendered in one quoting style,
+    so `/bin/echo  'hi'` and `/bin/echo hi` compare equal. Words the shell
+    interprets keep their exact spelling, so `echo a;b` and `echo 'a;b'`,
+    `echo "$HOME"` and `echo '$HOME'`, or `ls > out` and `ls '>' out` differ.
+
+    Args:
+        command (str): Command as stored in the crontab
+
+    Returns:
+        str: Normalized command
+    """
+    command = unwrap_command(command).strip()
+    if "%" in command:
+        # cron turns unescaped '%' into newlines before the shell sees the quotes
+        return command
+    return " ".join(_render_word(spelling, value) for spelling, value in _split_words(command))
+
+
+def dedupe_key(job: Dict, parents: Tuple[str, ...] = ()) -> Optional[Hashable]:
+    """
+    Return the key under which equivalent jobs collide.
+
+    Jobs are equivalent when they run the same normalized command on the same
+    canonical schedule, with the same runner options (tag, profile, timeout,
+    retries, catch-up policy), enabled state and upstream jobs. The tag counts
+    for runner jobs because it selects a resource profile (`resources.tags`).
+
+    Args:
+        job (dict): Managed job as returned by CronExecutor.list_all()
+        parents (tuple[str], optional): Upstream job IDs of the job
+
+    Returns:
+        tuple or None: Key, or None if the schedule cannot be parsed
+    """
+    try:
+        schedule = CronSchedule(job["schedule"]).canonical()
+    except ValueError:
+        return None
+    options = parse_runner_command(job["command"])
+    run_options = (
+        (options.tag, options.profile, options.timeout, options.retries, options.catch_up_policy)
+        if options else None
+    )
+    return schedule, normalize_command(job["command"]), run_options, job.get("enabled", True), tuple(sorted(parents))
+
+
+def find_duplicates(jobs: List[Dict], parents: Optional[Dict[str, List[str]]] = None) -> List[List[Dict]]:
+    """
+    Group equivalent jobs in one hash-based pass.
+
+    Args:
+        jobs (list[dict]): Managed jobs in crontab order
+        parents (dict, optional): Upstream job IDs by job ID (the dependency graph)
+
+    Returns:
+        list[list[dict]]: Groups of two or more equivalent jobs; the first job of
+        each group is the one to keep (the earliest in the crontab)
+    """
+    parents = parents or {}
+    groups: Dict[Hashable, List[Dict]] = {}
+    for job in jobs:
+        key = dedupe_key(job, tuple(parents.get(job["id"], ())))
+        if key is not None:
+            groups.setdefault(key, []).append(job)
+    return [group for group in groups.values() if len(group) > 1]
@@ -3,16 +3,23 @@ Purpose: Manage cron jobs safely using python-crontab.
 
 Responsibilities:
 - Add, remove, and list cron jobs safely
+- Store jobs through a pluggable backend (user crontab, tabfile, /etc/cron.d drop-ins, memory)
 - Handle permission and subprocess errors gracefully
 - Use UUID for unique job identification
+- Record every crontab write in the version history and roll back to earlier versions
 - Log all operations with detailed messages
 """
 
 import logging
+import re
 import uuid
 from typing import Optional, List, Dict
-from crontab import CronTab
 from pathlib import Path
+from script.backends import CronBackend, create_backend
+from script.history import CrontabHistory, history_settings
+
+COMMENT_PREFIX = "cron_job_script_"
+COMMENT_PATTERN = re.compile(rf"{COMMENT_PREFIX}(?P<id>[A-Za-z0-9-]+)(?:\s+(?P<tag>.*))?")
 
 
 class CronExecutor:
@@ -20,29 +27,76 @@ class CronExecutor:
     Handles direct interaction with system cron using python-crontab.
     """
 
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, config: Optional[dict] = None, backend: Optional[CronBackend] = None):
         """
         Initialize CronExecutor with a logger.
 
         Args:
             logger (logging.Logger): Logger instance for detailed logging
+            config (dict, optional): Configuration dictionary (`storage`, `state` and `history` sections)
+            backend (CronBackend, optional): Storage backend (built from `storage.backend` if omitted)
         """
         self.logger = logger
         try:
-            self.cron = CronTab(user=True)  # current user
-            
+            self.backend = backend or create_backend(config)
+
         except PermissionError:
-            self.logger.error("Permission denied: Cannot access user crontab. Try running with sudo.")
+            self.logger.error("Permission denied: Cannot access crontab storage. Try running with sudo.")
             raise
+        self.history = (
+            CrontabHistory(config, self.backend.name, self.backend.target())
+            if history_settings(config)["enabled"] else None
+        )
+        self._written = self.backend.render()
 
-    def add(self, schedule: str, command: str, comment: Optional[str] = None) -> str:
+    def _write(self, action: str, tables: List):
+        """
+        Write the changed tables and record the change in the version history.
+
+        Args:
+            action (str): Short description of the change
+            tables (list[CronTab]): Tables the change touched
+        """
+        before = self._written
+        for table in tables:
+            self.backend.write(table)
+        self._written = self.backend.render()
+        if self.history is None:
+            return
+        try:
+            version = self.history.record(before, self._written, action)
+            if version is not None:
+                self.logger.info("Recorded crontab version %s: %s", version, action)
+        except (OSError, ValueError) as e:
+            # History is best effort: the crontab itself was written
+            self.logger.warning("Failed to record crontab history: %s", e)
+
+    def _jobs(self):
+        """Iterate over the jobs of every table of the backend."""
+        for table in self.backend.tables():
+            yield from table
+
+    @staticmethod
+    def _remove_jobs(jobs) -> List:
+        """Remove jobs from their tables and return the tables that changed."""
+        tables = []
+        for job in jobs:
+            job.cron.remove(job)
+            if all(table is not job.cron for table in tables):
+                tables.append(job.cron)
+        return tables
+
+    def add(self, schedule: str, command: str, comment: Optional[str] = None, job_id: Optional[str] = None,
+            enabled: bool = True) -> str:
         """
         Add a new cron job with UUID comment.
 
         Args:
             schedule (str): Cron schedule string
             command (str): Command to execute
-            comment (str): Optional custom comment/tag
+            comment (str): Optional custom tag, stored after the UUID in the job comment
+            job_id (str): Optional pre-generated UUID (generated if omitted)
+            enabled (bool): If False, the entry is written commented out (never fired by cron)
 
         Returns:
             str: UUID of the job added
@@ -50,13 +104,15 @@ class CronExecutor:
         Raises:
             ValueError: if schedule or command invalid
         """
-        job_id = str(uuid.uuid4())
-        job_comment = comment or f"cron_job_script_{job_id}"
+        job_id = job_id or str(uuid.uuid4())
+        job_comment = f"{COMMENT_PREFIX}{job_id}" + (f" {comment}" if comment else "")
 
         try:
-            job = self.cron.new(command=command, comment=job_comment)
+            table = self.backend.table_for(comment)
+            job = self.backend.new_job(table, command, job_comment)
             job.setall(schedule)
-            self.cron.write()
+            job.enable(enabled)
+            self._write(f"add {job_id}", [table])
             self.logger.info("Cron job added successfully: %s -> %s", schedule, command)
             return job_id
         
@@ -70,21 +126,63 @@ class CronExecutor:
             self.logger.exception("Unexpected error while adding cron job: %s", e)
             raise
 
+    def add_many(self, jobs: List[Dict]) -> int:
+        """
+        Add several cron jobs with a single write, replacing jobs with the same UUID.
+
+        Args:
+            jobs (list[dict]): Jobs with id, schedule, command and optional tag and enabled
+
+        Returns:
+            int: Number of jobs written
+        """
+        try:
+            ids = {job["id"] for job in jobs}
+            replaced = []
+            for entry in self._jobs():
+                match = COMMENT_PATTERN.search(entry.comment or "")
+                if match and match.group("id") in ids:
+                    replaced.append(entry)
+            tables = self._remove_jobs(replaced)
+            for job in jobs:
+                tag = job.get("tag") or None
+                table = self.backend.table_for(tag)
+                comment = f"{COMMENT_PREFIX}{job['id']}" + (f" {tag}" if tag else "")
+                entry = self.backend.new_job(table, job["command"], comment)
+                entry.setall(job["schedule"])
+                entry.enable(job.get("enabled", True))
+                if all(known is not table for known in tables):
+                    tables.append(table)
+            if tables:
+                self._write(f"import {len(jobs)} job(s)", tables)
+            self.logger.info("Added %s cron job(s) in one write (%s replaced).", len(jobs), len(replaced))
+            return len(jobs)
+        except PermissionError:
+            self.logger.error("Failed to add jobs: You do not have permission to modify crontab.")
+            raise
+        except Exception as e:
+            self.logger.exception("Unexpected error while adding cron jobs: %s", e)
+            raise
+
     def list_all(self) -> List[Dict[str, str]] :
         """
         List all cron jobs added by this script.
 
         Returns:
-            list[dict]: List of job details (schedule, command, comment)
+            list[dict]: List of job details (id, tag, schedule, command, comment, enabled)
         """
         jobs = []
         try:
-            for job in self.cron:
+            for job in self._jobs():
                 if job.comment and "cron_job_script" in job.comment:
+                    match = COMMENT_PATTERN.search(job.comment)
                     jobs.append({
+                        "id": match.group("id") if match else "",
+                        "tag": (match.group("tag") or "") if match else "",
                         "schedule": job.slices.render(),
                         "command": job.command,
-                        "comment": job.comment
+                        "comment": job.comment,
+                        "enabled": job.is_enabled()
                     })
         
         except Exception as e:
@@ -102,14 +200,12 @@ class CronExecutor:
             ValueError: if job_id not found
         """
         try:
-            jobs_to_remove = [job for job in self.cron if job.comment and job_id in job.comment]
+            jobs_to_remove = [job for job in self._jobs() if job.comment and job_id in job.comment]
             if not jobs_to_remove:
                 msg = f"No job found with ID {job_id}"
                 self.logger.error(msg)
                 raise ValueError(msg)
-            for job in jobs_to_remove:
-                self.cron.remove(job)
-            self.cron.write()
+            self._write(f"remove {job_id}", self._remove_jobs(jobs_to_remove))
             self.logger.info("Cron job(s) with ID %s removed successfully.", job_id)
         except PermissionError:
             self.logger.error("Failed to remove job: Permission denied.")
@@ -117,4 +213,61 @@ class CronExecutor:
         except Exception as e:
             self.logger.exception("Unexpected error while removing cron job: %s", e)
             raise
-        
\ No newline at end of file
+        
+
+    def remove_many(self, job_ids: List[str]) -> int:
+        """
+        Remove several cron jobs by UUID with a single crontab write.
+
+        Args:
+            job_ids (list[str]): UUIDs of the jobs to remove
+
+        Returns:
+            int: Number of crontab entries removed
+        """
+        wanted = set(job_ids)
+        try:
+            jobs_to_remove = []
+            for job in self._jobs():
+                match = COMMENT_PATTERN.search(job.comment or "")
+                if match and match.group("id") in wanted:
+                    jobs_to_remove.append(job)
+            if jobs_to_remove:
+                self._write(f"remove {len(jobs_to_remove)} job(s)", self._remove_jobs(jobs_to_remove))
+            self.logger.info("Removed %s cron job(s) in one write.", len(jobs_to_remove))
+            return len(jobs_to_remove)
+        except PermissionError:
+            self.logger.error("Failed to remove jobs: Permission denied.")
+            raise
+        except Exception as e:
+            self.logger.exception("Unexpected error while removing cron jobs: %s", e)
+            raise
+
+    def rollback(self, version: int) -> str:
+        """
+        Restore the crontab content of an earlier version in a single write.
+
+        The rollback itself is recorded as a new version, so it can be undone.
+
+        Args:
+            version (int): Version number (see `history.versions()`)
+
+        Returns:
+            str: Restored crontab content
+
+        Raises:
+            ValueError: if history is disabled or the version is unknown
+        """
+        if self.history is None:
+            raise ValueError("Crontab history is disabled (history.enabled: false)")
+        content = self.history.content(version)
+        try:
+            self._write(f"rollback to version {version}", self.backend.restore(content))
+            self.logger.info("Crontab rolled back to version %s", version)
+            return content
+        except PermissionError:
+            self.logger.error("Failed to roll back crontab: Permission denied.")
+            raise
+        except Exception as e:
+            self.logger.exception("Unexpected error while rolling back crontab: %s", e)
+            raise
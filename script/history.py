@@ -0,0 +1,276 @@
+"""
+Purpose: Version history of the crontab with delta storage and rollback.
+
+Responsibilities:
+- Record every crontab write as a line delta against the previous version
+- Store periodic full snapshots content-addressed (zlib-compressed, by SHA-256)
+- Reconstruct any retained version from its nearest snapshot plus deltas
+- Compact old history so storage stays bounded after many changes
+- Keep a separate history per storage backend and target, and never restore
+  a version recorded for another one
+"""
+
+import difflib
+import fcntl
+import hashlib
+import json
+import os
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from script.state import state_settings
+
+HISTORY_DEFAULTS = {
+    "enabled": True,
+    "checkpoint_every": 50,
+    "max_versions": 1000,
+}
+
+HISTORY_DIR = "history"
+
+
+def history_settings(config: Optional[dict] = None) -> dict:
+    """
+    Merge the `history` section of the configuration with defaults.
+
+    Args:
+        config (dict, optional): Full configuration dictionary
+
+    Returns:
+        dict: History settings
+    """
+    return {**HISTORY_DEFAULTS, **((config or {}).get("history") or {})}
+
+
+def content_hash(content: str) -> str:
+    """Return the SHA-256 hex digest of crontab content."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def make_delta(old: str, new: str) -> List[list]:
+    """
+    Compute a line delta turning `old` into `new`.
+
+    Args:
+        old (str): Previous content
+        new (str): New content
+
+    Returns:
+        list: `[start, end, lines]` replacements of `old[start:end]` (line indices)
+    """
+    old_lines, new_lines = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    return [
+        [i1, i2, new_lines[j1:j2]]
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes() if tag != "equal"
+    ]
+
+
+def apply_delta(old: str, delta: List[list]) -> str:
+    """Apply a delta produced by `make_delta()`."""
+    old_lines = old.splitlines(keepends=True)
+    result: List[str] = []
+    cursor = 0
+    for start, end, lines in delta:
+        result.extend(old_lines[cursor:start])
+        result.extend(lines)
+        cursor = end
+    result.extend(old_lines[cursor:])
+    return "".join(result)
+
+
+def history_key(backend: str, target: str) -> str:
+    """Return the history directory name of a backend and its target."""
+    return f"{backend}-{hashlib.sha256(target.encode('utf-8')).hexdigest()[:16]}"
+
+
+class CrontabHistory:
+    """
+    Crontab versions stored under `<state dir>/history/<backend>-<target hash>`.
+
+    `log.jsonl` holds one record per version; a record either references a
+    snapshot in `objects/` or carries a delta against the previous version,
+    and names the backend and target it was recorded for.
+    """
+
+    def __init__(self, config: Optional[dict] = None, backend: str = "memory", target: str = "memory"):
+        """
+        Initialize CrontabHistory.
+
+        Args:
+            config (dict, optional): Full configuration dictionary
+            backend (str): Name of the storage backend (see CronBackend.name)
+            target (str): What the backend stores to (see CronBackend.target())
+        """
+        self.settings = history_settings(config)
+        self.backend = backend
+        self.target = target
+        self.dir = os.path.join(state_settings(config)["dir"], HISTORY_DIR, history_key(backend, target))
+        self.log_path = os.path.join(self.dir, "log.jsonl")
+        self.objects_dir = os.path.join(self.dir, "objects")
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        os.makedirs(self.dir, exist_ok=True)
+        with open(os.path.join(self.dir, "lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _read_log(self) -> List[Dict]:
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _store_object(self, content: str) -> str:
+        digest = content_hash(content)
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(zlib.compress(content.encode("utf-8"), 9))
+            os.replace(tmp_path, path)
+        return digest
+
+    def _load_object(self, digest: str) -> str:
+        with open(self._object_path(digest), "rb") as f:
+            return zlib.decompress(f.read()).decode("utf-8")
+
+    def _content_at(self, records: List[Dict], index: int) -> str:
+        """Rebuild the content of `records[index]` from the nearest snapshot before it."""
+        base = index
+        while "delta" in records[base]:
+            base -= 1
+            if base < 0:
+                raise ValueError("History is corrupt: no snapshot before version "
+                                 f"{records[index]['version']}")
+        content = self._load_object(records[base]["hash"])
+        for record in records[base + 1:index + 1]:
+            content = apply_delta(content, record["delta"])
+        if content_hash(content) != records[index]["hash"]:
+            raise ValueError(f"History is corrupt: version {records[index]['version']} does not match its hash")
+        return content
+
+    def _new_record(self, records: List[Dict], previous: Optional[str], content: str, action: str) -> Dict:
+        since_snapshot = 0
+        for record in reversed(records):
+            if "delta" not in record:
+                break
+            since_snapshot += 1
+        record = {
+            "version": records[-1]["version"] + 1 if records else 1,
+            "time": time.time(),
+            "action": action,
+            "hash": content_hash(content),
+            "backend": self.backend,
+            "target": self.target,
+        }
+        if previous is not None:
+            delta = make_delta(previous, content)
+            record["added"] = sum(len(lines) for _, _, lines in delta)
+            record["removed"] = sum(end - start for start, end, _ in delta)
+        if previous is None or since_snapshot + 1 >= int(self.settings["checkpoint_every"]):
+            self._store_object(content)
+        else:
+            record["delta"] = delta
+        return record
+
+    def record(self, before: str, after: str, action: str) -> Optional[int]:
+        """
+        Record a crontab write.
+
+        The first write also records the content it replaced, and content that
+        changed outside of this tool since the last record is recorded as an
+        external edit first.
+
+        Args:
+            before (str): Crontab content before the write
+            after (str): Crontab content written
+            action (str): Short description of the change
+
+        Returns:
+            int or None: New version number, or None if nothing changed
+        """
+        with self._locked():
+            records = self._read_log()
+            new_records = []
+            head = self._content_at(records, len(records) - 1) if records else None
+            if head is None:
+                new_records.append(self._new_record(records, None, before, "initial crontab"))
+            elif head != before:
+                new_records.append(self._new_record(records, head, before, "external edit"))
+            current = before
+            if after != before:
+                new_records.append(self._new_record(records + new_records, current, after, action))
+            if not new_records:
+                return None
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                for record in new_records:
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            records.extend(new_records)
+            if len(records) > int(self.settings["max_versions"]) + int(self.settings["checkpoint_every"]):
+                self._compact(records)
+            return records[-1]["version"]
+
+    def _compact(self, records: List[Dict]):
+        """Drop versions beyond `max_versions`, re-basing the oldest kept one on a snapshot."""
+        keep = records[-int(self.settings["max_versions"]):]
+        first = dict(keep[0])
+        if "delta" in first:
+            self._store_object(self._content_at(records, len(records) - len(keep)))
+            del first["delta"]
+        keep[0] = first
+        tmp_path = f"{self.log_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in keep:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        os.replace(tmp_path, self.log_path)
+
+        referenced = {record["hash"] for record in keep if "delta" not in record}
+        for prefix in os.listdir(self.objects_dir):
+            for digest in os.listdir(os.path.join(self.objects_dir, prefix)):
+                if digest not in referenced:
+                    os.remove(os.path.join(self.objects_dir, prefix, digest))
+
+    def versions(self) -> List[Dict]:
+        """
+        Return the retained versions, oldest first.
+
+        Returns:
+            list[dict]: version, time, action, added, removed
+        """
+        return [
+            {key: record.get(key) for key in ("version", "time", "action", "added", "removed")}
+            for record in self._read_log()
+        ]
+
+    def content(self, version: int) -> str:
+        """
+        Return the crontab content of a version.
+
+        Args:
+            version (int): Version number
+
+        Returns:
+            str: Crontab content
+
+        Raises:
+            ValueError: if the version is unknown (or was compacted away) or was
+                recorded for another backend or target
+        """
+        records = self._read_log()
+        for index, record in enumerate(records):
+            if record["version"] == version:
+                if (record.get("backend"), record.get("target")) != (self.backend, self.target):
+                    raise ValueError(
+                        f"Crontab version {version} was recorded for the {record.get('backend')} backend "
+                        f"({record.get('target')}), not {self.backend} ({self.target})"
+                    )
+                return self._content_at(records, index)
+        raise ValueError(f"Unknown crontab version: {version}")
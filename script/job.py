@@ -6,32 +6,75 @@ Responsibilities:
 - Provide robust validation for schedule and command
 - Support dry-run mode
 - Provide interactive mode for user input
+- Run jobs through the output-capturing runner and read their logs back
+- Attach resource profiles (per job or per tag) to runner-managed jobs
+- Attach timeout and retry settings to runner-managed jobs
+- Send job and operation events through the batched notification pipeline
+- Chain jobs with dependencies (--after) and fire downstream jobs on success
+- Catch up on runs missed during host downtime
+- Answer "what runs between T1 and T2" from an incrementally updated calendar index
+- Detect and remove duplicate jobs (equivalent schedule and command)
+- Show the crontab version history and roll back to earlier versions
+- Simulate the load of the job set (and candidate schedules) for capacity planning
+- Export and import job sets in a compact binary format
+- Run each job on exactly one of several hosts sharing the crontab (sharding)
 - Maintain recruiter-standard logging and docstrings
 """
 
+import copy
+import difflib
 import logging
 import os
+import sqlite3
+import sys
+import threading
+import uuid
+from datetime import datetime, timedelta
 from typing import Optional, List, Dict
+from script.calendar_index import CalendarIndex
+from script.catchup import CatchUp, validate_policy
+from script.coordinator import Coordinator, sharding_settings
+from script.dag import DownstreamRunner, JobGraph
+from script.dedupe import find_duplicates
 from script.executor import CronExecutor
+from script.notifier import Notifier
+from script.resources import resolve_profile
+from script.runner import JobRunner, notify_flush_command, parse_runner_command, read_job_logs, wrap_command
+from script.schedule import CronSchedule
+from script.simulator import HORIZONS, build_workload, host_cores, parse_candidate, simulate, simulation_settings
+from script.state import RunStore
+from script.transfer import crontab_command, export_jobs, import_jobs
 from script.utils import validate_cron_expression, command_exists
 
+# Placeholder schedule of downstream jobs; their crontab entry is disabled
+DEPENDENT_SCHEDULE = "@reboot"
+
+# Crontab entry that sends due notification digests (see _ensure_notify_flush())
+NOTIFY_FLUSH_ID = "notify-flush"
+
 
 class JobManager:
     """
     High-level interface to manage cron jobs safely.
     """
 
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, config: Optional[dict] = None):
         """
         Initialize JobManager with a logger and CronExecutor.
 
         Args:
             logger (logging.Logger): Logger instance
+            config (dict, optional): Configuration dictionary (see config/config.yaml)
         """
         self.logger = logger
-        self.executor = CronExecutor(logger)
+        self.config = config or {}
+        self.executor = CronExecutor(logger, self.config)
+        self.notifier = Notifier(logger, self.config)
+        self.graph = JobGraph(self.config)
 
-    def add_job(self, schedule: str, command: str, dry_run: bool = False, interactive: bool = False, tag: Optional[str] = None):
+    def add_job(self, schedule: str, command: str, dry_run: bool = False, interactive: bool = False, tag: Optional[str] = None,
+                capture: bool = False, profile: Optional[str] = None, timeout: Optional[float] = None,
+                retries: int = 0, after: Optional[List[str]] = None, catch_up_policy: Optional[str] = None):
         """
         Add a new cron job with validation and optional dry-run mode.
 
@@ -41,6 +84,15 @@ class JobManager:
             dry_run (bool): If True, only simulate addition
             interactive (bool): If True, ask user for input step by step
             tag (str): Optional tag/comment for the job
+            capture (bool): If True, run the job through the output-capturing runner
+            profile (str): Optional resource profile name (see `resources` in config.yaml);
+                when omitted, the profile assigned to `tag` is applied at run time
+            timeout (float): Optional wall-clock timeout per attempt, in seconds
+            retries (int): Number of retries with exponential backoff after a failure
+            after (list[str]): Optional upstream job UUIDs; the job then runs as soon as all of
+                them succeed instead of on its own schedule
+            catch_up_policy (str): What --catch-up does with missed runs: 'once', 'all' or 'skip'
+                (defaults to `catchup.default_policy`)
         """
         try:
             if interactive:
@@ -48,24 +100,81 @@ class JobManager:
                 command = input("Enter command to execute: ") or command
                 tag = input("Enter optional tag/comment: ") or tag
 
+            if after:
+                # Downstream jobs are fired by their upstreams, never by cron itself
+                schedule = schedule or DEPENDENT_SCHEDULE
+                capture = True
+                self._check_upstreams(after)
+
             # Validate schedule and command
             if not validate_cron_expression(schedule):
                 raise ValueError(f"Invalid cron schedule: {schedule}")
             if not command_exists(command):
                 raise ValueError(f"Command does not exist or is not executable: {command}")
+            if timeout is not None and timeout <= 0:
+                raise ValueError(f"Timeout must be positive: {timeout}")
+            if retries < 0:
+                raise ValueError(f"Retries must not be negative: {retries}")
+            if catch_up_policy is not None:
+                validate_policy(catch_up_policy)
+            # Raises ValueError for unknown or invalid profiles
+            if resolve_profile(self.config, profile, tag) or timeout or retries or catch_up_policy:
+                capture = True
+
+            job_id = str(uuid.uuid4())
+            if after:
+                # Raises ValueError on cycles before anything is written
+                self.graph.add(job_id, after)
 
             if dry_run:
                 self.logger.info("[Dry-Run] Would add job: %s -> %s", schedule, command)
                 print(f"[Dry-Run] Job not actually added: {schedule} -> {command}")
                 return
 
-            job_id = self.executor.add(schedule=schedule, command=command, comment=tag)
+            add_kwargs = {"schedule": schedule, "command": command, "comment": tag}
+            if after:
+                add_kwargs["enabled"] = False
+            if capture:
+                options = {"--tag": tag, "--profile": profile, "--timeout": timeout, "--retries": retries or None,
+                           "--catch-up-policy": catch_up_policy}
+                # The run must reopen this backend even if it was only chosen on the command line
+                options.update(self.executor.backend.cli_options())
+                add_kwargs.update(command=wrap_command(job_id, command, options), job_id=job_id)
+
+            job_id = self.executor.add(**add_kwargs)
+            if after:
+                self.graph.save()
+                self.logger.info("Job %s runs after: %s", job_id, ", ".join(after))
+            elif schedule.strip().lower() != "@reboot":
+                self._update_calendar(job_id, schedule)
             self.logger.info("Job added successfully with ID: %s", job_id)
             print(f"Job added successfully with ID: {job_id}")
+            self._ensure_notify_flush()
+            self.notifier.notify("added", job_id, f"added: {schedule} -> {command}")
 
         except Exception as e:
             self.logger.exception("Failed to add job: %s", e)
             print(f"Error adding job: {e}")
+            self.notifier.notify("error", "-", f"failed to add job '{command}': {e}")
+
+    def _ensure_notify_flush(self):
+        """
+        Install the crontab entry that sends spooled notifications once per batch window.
+
+        Digests otherwise only go out when a later process closes its notifier,
+        so the last failure of the day would wait for the next job run.
+        """
+        if not self.notifier.enabled:
+            return
+        try:
+            if any(job["id"] == NOTIFY_FLUSH_ID for job in self.executor.list_all()):
+                return
+            minutes = min(59, max(1, int(float(self.notifier.settings["batch_window"]) // 60)))
+            command = notify_flush_command(self.executor.backend.cli_options())
+            self.executor.add(f"*/{minutes} * * * *", command, job_id=NOTIFY_FLUSH_ID)
+            self.logger.info("Installed notification flush entry (every %s minute(s))", minutes)
+        except (OSError, ValueError) as e:
+            self.logger.warning("Failed to install notification flush entry: %s", e)
 
     def list_jobs(self) ->  List[Dict[str, str]] :
         """
@@ -99,10 +208,527 @@ class JobManager:
                 return
 
             self.executor.remove(job_id=job_id)
+            self._update_calendar(job_id)
+            orphaned = self.graph.remove(job_id)
+            self.graph.save()
+            for child in orphaned:
+                self.logger.warning("Job %s no longer has any upstream and will not be triggered", child)
             self.logger.info("Job removed successfully: %s", job_id)
             print(f"Job removed successfully: {job_id}")
+            self.notifier.notify("removed", job_id, "removed")
 
         except Exception as e:
             self.logger.exception("Failed to remove job: %s", e)
             print(f"Error removing job: {e}")
-            
\ No newline at end of file
+            self.notifier.notify("error", job_id, f"failed to remove job: {e}")
+
+    def run_job(self, job_id: str, command: str, profile: Optional[str] = None, tag: Optional[str] = None,
+                timeout: Optional[float] = None, retries: int = 0) -> int:
+        """
+        Run a job through the output-capturing runner (invoked from the crontab).
+
+        Args:
+            job_id (str): UUID of the managed job
+            command (str): Command to execute
+            profile (str): Optional resource profile name
+            tag (str): Optional job tag, used to look up a profile when none is given
+            timeout (float): Optional wall-clock timeout per attempt, in seconds
+            retries (int): Number of retries after a failed attempt
+
+        When sharding is enabled the run only happens if this host wins the
+        lease for the job's scheduled fire time; otherwise 0 is returned.
+
+        Returns:
+            int: Exit code of the last attempt
+        """
+        fire_time = self._fire_time(job_id) if sharding_settings(self.config)["enabled"] else None
+
+        def run() -> int:
+            resources = resolve_profile(self.config, profile, tag)
+            return JobRunner(self.logger, self.config, self.notifier).execute(
+                job_id, command, profile=resources, timeout=timeout, retries=retries
+            )["returncode"]
+
+        returncode = self._claimed_run(job_id, fire_time, run)
+        if returncode is None:
+            return 0
+        if returncode == 0:
+            self._trigger_downstream(job_id, fire_time)
+        return returncode
+
+    def catch_up(self, dry_run: bool = False, max_parallel: Optional[int] = None) -> List[Dict]:
+        """
+        Run jobs that missed fire times since their last recorded run (e.g. after downtime).
+
+        Args:
+            dry_run (bool): If True, only print the catch-up plan
+            max_parallel (int): Maximum number of jobs caught up at once
+                (defaults to `catchup.max_parallel`)
+
+        Returns:
+            list[dict]: Catch-up plan (id, schedule, policy, missed, runs, last_missed, fire_times);
+            with sharding, only the fire times no host has claimed
+        """
+        catchup = CatchUp(self.logger, self.config)
+        plan = catchup.plan(self.executor.list_all())
+        if not plan:
+            print("No missed runs.")
+            return plan
+
+        for entry in plan:
+            print(f"[{entry['id']}] {entry['schedule']}: {entry['missed']} missed "
+                  f"(last {entry['last_missed']:%Y-%m-%d %H:%M}), policy '{entry['policy']}' -> {entry['runs']} run(s)")
+        if dry_run:
+            self.logger.info("[Dry-Run] Would catch up %s job(s)", len(plan))
+            return plan
+
+        sharded = sharding_settings(self.config)["enabled"]
+        if sharded:
+            # Other hosts' runs are not in this host's records: keep only unclaimed fire times
+            plan = Coordinator(self.logger, self.config).filter_catch_up(plan)
+
+        # Downstream jobs released by catch-up runs share the same cap: a run holds a
+        # slot only while it executes, never while it waits for its downstream jobs
+        slots = threading.BoundedSemaphore(max(1, int(max_parallel or catchup.settings["max_parallel"])))
+
+        def launch(job_id: str, fire_time: datetime) -> Optional[int]:
+            # Keyed on the missed fire time, so only one host of a shard ring replays it; the
+            # owners already had their head start in filter_catch_up()
+            with slots:
+                returncode = self.run_managed_job(job_id, fire_time, immediate=sharded)
+            if returncode == 0:
+                self._trigger_downstream(job_id, fire_time, slots)
+            return returncode
+
+        results = catchup.run(plan, launch, max_parallel)
+        failed = [job_id for job_id, codes in results.items() if any(codes)]
+        self.logger.info("Catch-up finished: %s job(s) run, %s with failures", len(results), len(failed))
+        return plan
+
+    def dedupe(self, apply: bool = False) -> List[List[Dict]]:
+        """
+        Report (and optionally remove) jobs that duplicate an earlier job.
+
+        Schedules are compared in canonical form ('*/15' equals '0,15,30,45',
+        '@daily' equals '0 0 * * *') and commands after normalization. The
+        earliest job of each group is kept; dependencies on removed duplicates
+        are moved to it.
+
+        Args:
+            apply (bool): If True, remove the redundant jobs in a single crontab write
+
+        Returns:
+            list[list[dict]]: Groups of equivalent jobs, kept job first
+        """
+        try:
+            groups = find_duplicates(self.executor.list_all(), self.graph.upstreams)
+            if not groups:
+                print("No duplicate jobs found.")
+                return groups
+
+            redundant = {}
+            for group in groups:
+                keeper = group[0]
+                print(f"[{keeper['id']}] {keeper['schedule']} -> {keeper['command']}")
+                for job in group[1:]:
+                    redundant[job["id"]] = keeper["id"]
+                    print(f"    duplicate [{job['id']}] {job['schedule']}")
+            print(f"{len(redundant)} redundant job(s) in {len(groups)} group(s).")
+            if not apply:
+                self.logger.info("[Dry-Run] Would remove %s duplicate job(s)", len(redundant))
+                return groups
+
+            self.executor.remove_many(list(redundant))
+            # One index load and save for all removals, like the single crontab write
+            self._update_calendar_many(dict.fromkeys(redundant))
+            for job_id, keeper in redundant.items():
+                for child in self.graph.children(job_id):
+                    self.graph.add(child, [keeper])
+                self.graph.remove(job_id)
+                self.notifier.notify("removed", job_id, f"removed as duplicate of {keeper}")
+            self.graph.save()
+            self.logger.info("Removed %s duplicate job(s)", len(redundant))
+            print(f"Removed {len(redundant)} duplicate job(s).")
+            return groups
+
+        except Exception as e:
+            self.logger.exception("Failed to dedupe jobs: %s", e)
+            print(f"Error removing duplicate jobs: {e}")
+            self.notifier.notify("error", "-", f"failed to dedupe jobs: {e}")
+            return []
+
+    def show_history(self) -> List[Dict]:
+        """
+        Print the retained crontab versions, oldest first.
+
+        Returns:
+            list[dict]: Versions (version, time, action, added, removed)
+        """
+        if self.executor.history is None:
+            print("Crontab history is disabled.")
+            return []
+        versions = self.executor.history.versions()
+        if not versions:
+            print("No crontab history recorded yet.")
+        for entry in versions:
+            changes = f" (+{entry['added']}/-{entry['removed']} lines)" if entry["added"] is not None else ""
+            print(f"v{entry['version']:<6} {datetime.fromtimestamp(entry['time']):%Y-%m-%d %H:%M:%S}  "
+                  f"{entry['action']}{changes}")
+        return versions
+
+    def rollback(self, version: int, dry_run: bool = False) -> bool:
+        """
+        Restore the crontab as it was at an earlier version, in one write.
+
+        Args:
+            version (int): Version number shown by --history
+            dry_run (bool): If True, only print the diff the rollback would apply
+
+        Returns:
+            bool: True if the rollback succeeded (or would succeed)
+        """
+        try:
+            if dry_run:
+                if self.executor.history is None:
+                    raise ValueError("Crontab history is disabled (history.enabled: false)")
+                target = self.executor.history.content(version)
+                diff = difflib.unified_diff(
+                    self.executor.backend.render().splitlines(keepends=True), target.splitlines(keepends=True),
+                    fromfile="current", tofile=f"version {version}",
+                )
+                sys.stdout.writelines(diff)
+                self.logger.info("[Dry-Run] Would roll back crontab to version %s", version)
+                return True
+
+            self.executor.rollback(version)
+            print(f"Crontab rolled back to version {version}")
+            self.notifier.notify("rollback", "-", f"crontab rolled back to version {version}")
+            return True
+
+        except Exception as e:
+            self.logger.exception("Failed to roll back crontab: %s", e)
+            print(f"Error rolling back crontab: {e}")
+            self.notifier.notify("error", "-", f"failed to roll back crontab to version {version}: {e}")
+            return False
+
+    def simulate_load(self, horizon: str = "day", cores: Optional[int] = None,
+                      estimates: Optional[Dict[str, float]] = None, candidates: Optional[List[str]] = None,
+                      start: Optional[datetime] = None) -> Dict[str, Dict]:
+        """
+        Simulate a day or week of the current jobs, alone and with each candidate batch.
+
+        Args:
+            horizon (str): 'day' or 'week'
+            cores (int): Cores of the host (defaults to the cores available here)
+            estimates (dict): Duration estimates in seconds by job ID, overriding recorded averages
+            candidates (list[str]): Candidate batches, each 'SCHEDULE[=SECONDS];...'
+            start (datetime): Start of the simulated period (defaults to the next midnight)
+
+        Returns:
+            dict: Simulation report per scenario ('current' and each candidate)
+        """
+        settings = simulation_settings(self.config)
+        cores = cores or host_cores()
+        start = start or datetime.combine(datetime.now().date() + timedelta(days=1), datetime.min.time())
+        end = start + HORIZONS[horizon]
+        workload = build_workload(self.executor.list_all(), RunStore(self.config), estimates,
+                                  settings["default_duration"], settings["history_runs"])
+
+        scenarios = {"current": workload}
+        for candidate in candidates or []:
+            scenarios[candidate] = workload + parse_candidate(candidate, settings["default_duration"])
+
+        reports = {}
+        print(f"Simulating {len(workload)} job(s) on {cores} core(s), {start:%Y-%m-%d %H:%M} + 1 {horizon}:")
+        print(f"{'scenario':<32} {'runs':>7} {'peak':>5} {'saturated min':>14} {'mean delay s':>13} {'max delay s':>12}")
+        for name, jobs in scenarios.items():
+            report = reports[name] = simulate(jobs, cores, start, end)
+            print(f"{name[:32]:<32} {report['runs']:>7} {report['peak_concurrent']:>5} "
+                  f"{report['saturation_minutes']:>14} {report['mean_delay']:>13} {report['max_delay']:>12}")
+        self.logger.info("Simulated %s scenario(s) over one %s", len(reports), horizon)
+        return reports
+
+    def show_shards(self) -> Dict[str, List[str]]:
+        """
+        Print which host each managed job is assigned to.
+
+        Returns:
+            dict: Job IDs by host
+        """
+        coordinator = Coordinator(self.logger, self.config)
+        assignment: Dict[str, List[str]] = {host: [] for host in coordinator.ring.hosts}
+        for job in self.executor.list_all():
+            assignment[coordinator.owner(job["id"])].append(job["id"])
+        if not sharding_settings(self.config)["enabled"]:
+            print("Sharding is disabled (sharding.enabled); every host runs every job.")
+        for host, job_ids in assignment.items():
+            marker = " (this host)" if host == coordinator.host else ""
+            print(f"{host}{marker}: {len(job_ids)} job(s)")
+            for job_id in job_ids:
+                print(f"    {job_id}")
+        return assignment
+
+    def export_jobs(self, path: str) -> bool:
+        """
+        Write every managed job (and their dependencies) to a binary export file.
+
+        Args:
+            path (str): Destination file
+
+        Returns:
+            bool: True on success
+        """
+        try:
+            jobs = self.executor.list_all()
+            size = export_jobs(path, jobs, self.graph.upstreams)
+            self.logger.info("Exported %s job(s) to %s (%s bytes)", len(jobs), path, size)
+            print(f"Exported {len(jobs)} job(s) to {path} ({size} bytes)")
+            return True
+        except Exception as e:
+            self.logger.exception("Failed to export jobs: %s", e)
+            print(f"Error exporting jobs: {e}")
+            return False
+
+    def import_jobs(self, path: str, dry_run: bool = False) -> bool:
+        """
+        Add the jobs of an export file in a single crontab write.
+
+        Jobs whose UUID already exists are replaced; runner jobs are re-wrapped
+        for this host.
+
+        Args:
+            path (str): Export file
+            dry_run (bool): If True, only verify the file and report its jobs
+
+        Returns:
+            bool: True on success
+        """
+        try:
+            jobs, upstreams = import_jobs(path)
+            if dry_run:
+                self.logger.info("[Dry-Run] Would import %s job(s) from %s", len(jobs), path)
+                print(f"[Dry-Run] {path} is valid: {len(jobs)} job(s), {len(upstreams)} with dependencies")
+                return True
+
+            # Validate everything before the crontab is touched, so a bad file changes nothing
+            storage = self.executor.backend.cli_options()
+            entries = [
+                {"id": job["id"], "schedule": job["schedule"], "command": crontab_command(job, storage),
+                 "tag": job["tag"], "enabled": job["enabled"]}
+                for job in jobs
+            ]
+            known = {job["id"] for job in self.executor.list_all()} | {job["id"] for job in jobs}
+            graph = copy.deepcopy(self.graph)
+            for child, parents in upstreams.items():
+                graph.add(child, parents, known_jobs=known)
+
+            self.executor.add_many(entries)
+            self.graph = graph
+            self.graph.save()
+
+            index = CalendarIndex(self.config)
+            for job in jobs:
+                if job["enabled"] and not job["parsed"].reboot:
+                    index.add(job["id"], job["schedule"], job["parsed"])
+            index.save()
+
+            self.logger.info("Imported %s job(s) from %s", len(jobs), path)
+            print(f"Imported {len(jobs)} job(s) from {path}")
+            self.notifier.notify("added", "-", f"imported {len(jobs)} job(s) from {path}")
+            return True
+        except Exception as e:
+            self.logger.exception("Failed to import jobs: %s", e)
+            print(f"Error importing jobs: {e}")
+            self.notifier.notify("error", "-", f"failed to import jobs from {path}: {e}")
+            return False
+
+    def jobs_in_window(self, start: datetime, end: datetime) -> List[Dict]:
+        """
+        Return the jobs that fire at least once in the window [start, end).
+
+        The calendar index is brought in line with the crontab first, touching
+        only jobs that were added, removed or rescheduled since it was saved.
+
+        Args:
+            start (datetime): Window start; naive values are in the index time zone
+            end (datetime): Window end; naive values are in the index time zone
+
+        Returns:
+            list[dict]: Matching jobs, as returned by list_jobs()
+
+        Raises:
+            ValueError: if the window is empty
+        """
+        index = CalendarIndex(self.config)
+        # Naive and offset-aware bounds may be mixed: compare both in the index time zone
+        start, end = (
+            moment.replace(tzinfo=index.tz) if moment.tzinfo is None else moment.astimezone(index.tz)
+            for moment in (start, end)
+        )
+        if end <= start:
+            raise ValueError(f"Window end must be after its start: {start.isoformat()} .. {end.isoformat()}")
+        jobs = self.executor.list_all()
+        if index.sync(jobs):
+            index.save()
+        found = set(index.query(start, end))
+        return [job for job in jobs if job["id"] in found]
+
+    def _update_calendar(self, job_id: str, schedule: Optional[str] = None):
+        """Add (or, without a schedule, drop) one job in the persisted calendar index."""
+        self._update_calendar_many({job_id: schedule})
+
+    def _update_calendar_many(self, changes: Dict[str, Optional[str]]):
+        """Add or drop several jobs in the persisted calendar index ({job_id: schedule or None})."""
+        try:
+            index = CalendarIndex(self.config)
+            for job_id, schedule in changes.items():
+                if schedule is None:
+                    index.remove(job_id)
+                else:
+                    index.add(job_id, schedule)
+            index.save()
+        except (OSError, ValueError, sqlite3.Error) as e:
+            # The index resyncs from the crontab on the next query
+            self.logger.warning("Failed to update calendar index for job(s) %s: %s", ", ".join(changes), e)
+
+    def _fire_time(self, job_id: str, now: Optional[datetime] = None) -> datetime:
+        """
+        Return the scheduled fire time a run started at `now` belongs to.
+
+        The time comes from the job's schedule rather than the clock, so hosts
+        whose interpreters started on either side of a minute boundary still
+        agree on the lease key. @reboot and unknown jobs use the current minute.
+        """
+        minute = (now or datetime.now()).replace(second=0, microsecond=0)
+        job = next((job for job in self.executor.list_all() if job["id"] == job_id), None)
+        try:
+            schedule = CronSchedule(job["schedule"]) if job else None
+        except ValueError:
+            schedule = None
+        if schedule is None or schedule.reboot:
+            return minute
+        return schedule.last_before(minute + timedelta(minutes=1), minute - timedelta(days=366)) or minute
+
+    def _claimed_run(self, job_id: str, fire_time: Optional[datetime], run, immediate: bool = False) -> Optional[int]:
+        """
+        Run a job unless another host of the shard ring has this fire time.
+
+        With sharding enabled `run` is only called if this host wins the lease
+        for (`job_id`, `fire_time`), which is marked complete afterwards.
+
+        Args:
+            job_id (str): UUID of the job
+            fire_time (datetime): Fire time the run belongs to (ignored without sharding)
+            run (callable): Runs the job and returns its exit code
+            immediate (bool): Claim the lease without the owner's head start (see Coordinator.claim)
+
+        Returns:
+            int or None: Exit code, or None if the run belongs to another host
+        """
+        if not sharding_settings(self.config)["enabled"]:
+            return run()
+        coordinator = Coordinator(self.logger, self.config)
+        if not coordinator.claim(job_id, fire_time, immediate=immediate):
+            return None
+        returncode = run()
+        coordinator.complete(job_id, fire_time, returncode)
+        return returncode
+
+    def _trigger_downstream(self, job_id: str, fire_time: Optional[datetime] = None,
+                            slots: Optional[threading.Semaphore] = None):
+        """
+        Run the downstream jobs released by a successful run of `job_id` (at `fire_time`).
+
+        Args:
+            job_id (str): UUID of the upstream job
+            fire_time (datetime, optional): Fire time of the upstream run (the downstream lease key)
+            slots (threading.Semaphore, optional): Concurrency cap shared with other runs
+                (e.g. a catch-up burst); each downstream run holds one slot while it executes
+        """
+        if not self.graph.children(job_id):
+            return
+
+        def launch(child: str) -> Optional[int]:
+            if slots is None:
+                return self.run_managed_job(child, fire_time, immediate=True)
+            with slots:
+                return self.run_managed_job(child, fire_time, immediate=True)
+
+        DownstreamRunner(self.logger, self.config, self.graph).run_after(job_id, launch)
+
+    def run_managed_job(self, job_id: str, fire_time: Optional[datetime] = None,
+                        immediate: bool = False) -> Optional[int]:
+        """
+        Run a runner-managed job with the options stored in its crontab entry.
+
+        When sharding is enabled the run goes through the same lease as
+        `run_job`, keyed on `fire_time`.
+
+        Args:
+            job_id (str): UUID of the managed job
+            fire_time (datetime, optional): Fire time the run stands for, e.g. a missed one
+                or the upstream's (defaults to the job's scheduled fire time)
+            immediate (bool): Claim the lease without the owner's head start (downstream and
+                catch-up runs)
+
+        Returns:
+            int or None: Exit code of the last attempt, or None if another host has the run
+
+        Raises:
+            ValueError: if the job does not exist or does not run through the runner
+        """
+        options = self._runner_options(job_id)
+        if fire_time is None and sharding_settings(self.config)["enabled"]:
+            fire_time = self._fire_time(job_id)
+
+        def run() -> int:
+            resources = resolve_profile(self.config, options.profile, options.tag)
+            return JobRunner(self.logger, self.config, self.notifier).execute(
+                job_id, options.command, profile=resources, timeout=options.timeout, retries=options.retries
+            )["returncode"]
+
+        return self._claimed_run(job_id, fire_time, run, immediate=immediate)
+
+    def _runner_options(self, job_id: str):
+        """Return the parsed runner options of a managed job."""
+        for job in self.executor.list_all():
+            if job["id"] == job_id:
+                options = parse_runner_command(job["command"])
+                if options is None:
+                    raise ValueError(f"Job {job_id} does not run through the runner (add it with --capture)")
+                return options
+        raise ValueError(f"No job found with ID {job_id}")
+
+    def _check_upstreams(self, upstreams: List[str]):
+        """Ensure every upstream exists and runs through the runner (so it can trigger downstreams)."""
+        for upstream in upstreams:
+            self._runner_options(upstream)
+
+    def show_logs(self, job_id: str) -> bool:
+        """
+        Print the captured output of a job to stdout.
+
+        Args:
+            job_id (str): UUID of the managed job
+
+        Returns:
+            bool: True if logs were found and printed, False otherwise
+        """
+        try:
+            for chunk in read_job_logs(job_id, self.config):
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.flush()
+            return True
+        except (FileNotFoundError, ValueError) as e:
+            self.logger.error("Failed to read logs: %s", e)
+            print(f"Error reading logs: {e}")
+            return False
+
+    def close(self, flush_notifications: bool = False):
+        """
+        Hand queued notifications to the spool and send a digest if one is due.
+
+        Args:
+            flush_notifications (bool): Send pending notifications regardless of the batch window
+        """
+        self.notifier.close(force_flush=flush_notifications)
@@ -0,0 +1,308 @@
+"""
+Purpose: Batched, asynchronous e-mail notifications for job runs and manager operations.
+
+Responsibilities:
+- Accept notification events without blocking the caller
+- Spool events to a shared file so separate runner processes are batched together
+- Deduplicate repeated events and send one digest e-mail per time window
+- Reuse a single SMTP connection for all deliveries of a process
+"""
+
+import fcntl
+import json
+import logging
+import os
+import queue
+import smtplib
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Callable, Dict, Iterator, List, Optional
+
+from script.state import state_settings
+
+NOTIFICATION_DEFAULTS = {
+    "enabled": False,
+    "email": None,
+    "sender": None,
+    "smtp_server": "localhost",
+    "smtp_port": 25,
+    "starttls": False,
+    "username": None,
+    "password": None,
+    "batch_window": 300,
+    "notify_on": ["failure"],
+    "max_lines": 200,
+}
+
+SPOOL_FILE = "notifications.spool"
+
+
+class SMTPPool:
+    """
+    Keeps one SMTP connection open and reuses it for successive messages.
+    """
+
+    def __init__(self, settings: dict, smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP,
+                 idle_check: float = 30.0):
+        """
+        Args:
+            settings (dict): Notification settings (server, port, credentials)
+            smtp_factory (callable): Factory creating SMTP connections (replaceable in tests)
+            idle_check (float): Verify the connection with NOOP if idle for this many seconds
+        """
+        self.settings = settings
+        self.smtp_factory = smtp_factory
+        self.idle_check = idle_check
+        self._connection: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = self.smtp_factory(self.settings["smtp_server"], int(self.settings["smtp_port"]), timeout=30)
+        if self.settings.get("starttls"):
+            connection.starttls()
+        if self.settings.get("username"):
+            connection.login(self.settings["username"], self.settings.get("password") or "")
+        return connection
+
+    def _get(self) -> smtplib.SMTP:
+        if self._connection is not None and time.monotonic() - self._last_used > self.idle_check:
+            try:
+                if self._connection.noop()[0] != 250:
+                    raise smtplib.SMTPServerDisconnected("NOOP failed")
+            except (smtplib.SMTPException, OSError):
+                self._discard()
+        if self._connection is None:
+            self._connection = self._connect()
+        return self._connection
+
+    def _discard(self):
+        try:
+            if self._connection is not None:
+                self._connection.close()
+        finally:
+            self._connection = None
+
+    def send(self, message: EmailMessage):
+        """
+        Send a message, reconnecting once if the pooled connection was dropped.
+
+        Raises:
+            smtplib.SMTPException, OSError: if delivery fails after reconnecting
+        """
+        with self._lock:
+            try:
+                self._get().send_message(message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self._discard()
+                self._get().send_message(message)
+            self._last_used = time.monotonic()
+
+    def close(self):
+        """Close the pooled connection politely."""
+        with self._lock:
+            if self._connection is None:
+                return
+            try:
+                self._connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._connection = None
+
+
+class Notifier:
+    """
+    Non-blocking notification pipeline.
+
+    `notify()` only enqueues the event. A background thread appends events to a
+    spool file shared by all processes; whichever process finds that the batch
+    window has elapsed claims the spool and sends a single deduplicated digest.
+    """
+
+    def __init__(self, logger: logging.Logger, config: Optional[dict] = None,
+                 smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP):
+        """
+        Initialize Notifier.
+
+        Args:
+            logger (logging.Logger): Logger instance
+            config (dict, optional): Full configuration dictionary
+            smtp_factory (callable): Factory creating SMTP connections
+        """
+        self.logger = logger
+        self.settings = {**NOTIFICATION_DEFAULTS, **((config or {}).get("notification") or {})}
+        self.enabled = bool(self.settings["enabled"] and self.settings["email"])
+        self.spool_path = os.path.join(state_settings(config)["dir"], SPOOL_FILE)
+        self.pool = SMTPPool(self.settings, smtp_factory)
+        self._queue: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def notify(self, event: str, job_id: str, message: str, details: str = ""):
+        """
+        Queue a notification event without blocking.
+
+        Args:
+            event (str): Event kind (e.g. 'failure', 'success', 'added', 'removed', 'rollback')
+            job_id (str): UUID of the job concerned
+            message (str): One-line summary
+            details (str): Optional extra text (e.g. the tail of the job output)
+        """
+        if not self.enabled or event not in self.settings["notify_on"]:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work_loop, daemon=True)
+                self._worker.start()
+        self._queue.put({
+            "event": event,
+            "job_id": job_id,
+            "message": message,
+            "details": details[-2000:],
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "host": socket.gethostname(),
+        })
+
+    def close(self, force_flush: bool = False):
+        """
+        Spool queued events and send a digest if the batch window has elapsed.
+
+        Args:
+            force_flush (bool): Send pending events regardless of the batch window
+        """
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+        if self.enabled and (force_flush or self._window_elapsed()):
+            self.flush()
+        self.pool.close()
+
+    def _work_loop(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                item = False
+            batch = [] if item is False else [item]
+            # Drain whatever else is queued so it is spooled in one write
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            events = [event for event in batch if event]
+            if events:
+                self._spool(events)
+            if stop:
+                return
+            if self._window_elapsed():
+                self.flush()
+
+    @contextmanager
+    def _spool_lock(self) -> Iterator[None]:
+        # Held by writers while appending and by flush() while claiming and reading,
+        # so no event can be appended to a spool that has already been read
+        os.makedirs(os.path.dirname(self.spool_path) or ".", exist_ok=True)
+        with open(self.spool_path + ".lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _spool(self, events: List[Dict]):
+        with self._spool_lock(), open(self.spool_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(event) + "\n" for event in events))
+            f.flush()
+
+    def _stamp_path(self) -> str:
+        return self.spool_path + ".sent"
+
+    def _window_elapsed(self) -> bool:
+        if not os.path.exists(self.spool_path):
+            return False
+        try:
+            last_sent = os.path.getmtime(self._stamp_path())
+        except FileNotFoundError:
+            return True
+        return time.time() - last_sent >= float(self.settings["batch_window"])
+
+    def flush(self) -> int:
+        """
+        Claim the spool and send its events as one digest e-mail.
+
+        Returns:
+            int: Number of events delivered (0 if nothing was pending or delivery failed)
+        """
+        claimed = f"{self.spool_path}.{os.getpid()}.{threading.get_ident()}"
+        events = []
+        with self._spool_lock():
+            try:
+                os.replace(self.spool_path, claimed)
+            except FileNotFoundError:
+                return 0
+            with open(claimed, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+        with open(self._stamp_path(), "a"):
+            os.utime(self._stamp_path())
+
+        try:
+            if events:
+                self.pool.send(self.build_digest(events))
+                self.logger.info("Sent notification digest with %s event(s)", len(events))
+            os.remove(claimed)
+            return len(events)
+        except (smtplib.SMTPException, OSError) as e:
+            self.logger.error("Failed to send notification digest: %s", e)
+            # Put the events back so the next flush retries them
+            self._spool(events)
+            os.remove(claimed)
+            return 0
+
+    def build_digest(self, events: List[Dict]) -> EmailMessage:
+        """
+        Build a digest e-mail, collapsing repeated events for the same job.
+
+        Args:
+            events (list[dict]): Spooled events
+
+        Returns:
+            EmailMessage: Digest message
+        """
+        groups: Dict[tuple, Dict] = {}
+        for event in events:
+            key = (event["event"], event["job_id"], event.get("host"))
+            group = groups.setdefault(key, {**event, "count": 0, "first": event["time"]})
+            group.update(message=event["message"], details=event.get("details", ""), time=event["time"])
+            group["count"] += 1
+
+        counts: Dict[str, int] = {}
+        for event in events:
+            counts[event["event"]] = counts.get(event["event"], 0) + 1
+        summary = ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items()))
+
+        lines = [f"Cron Job Manager: {len(events)} event(s) ({summary})", ""]
+        ordered = sorted(groups.values(), key=lambda g: (g["event"] != "failure", g["event"], g["first"]))
+        max_lines = int(self.settings["max_lines"])
+        for group in ordered[:max_lines]:
+            repeat = f" (x{group['count']}, first {group['first']})" if group["count"] > 1 else ""
+            lines.append(f"[{group['event']}] {group['time']} {group['host']} {group['job_id']}: "
+                         f"{group['message']}{repeat}")
+            if group["event"] == "failure" and group["details"]:
+                lines.extend("    " + line for line in group["details"].splitlines()[-10:])
+        if len(ordered) > max_lines:
+            lines.append(f"... and {len(ordered) - max_lines} more")
+
+        message = EmailMessage()
+        message["Subject"] = f"[cron-job-manager] {summary}"
+        message["From"] = self.settings["sender"] or f"cron-job-manager@{socket.getfqdn()}"
+        message["To"] = self.settings["email"]
+        message.set_content("\n".join(lines) + "\n")
+        return message
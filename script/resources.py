@@ -0,0 +1,175 @@
+"""
+Purpose: Resource isolation profiles for managed cron jobs.
+
+Responsibilities:
+- Resolve named resource profiles from configuration (per job or per tag)
+- Validate profile settings before they are stored with a job
+- Apply rlimits, nice level and I/O priority in the child process before exec
+"""
+
+import ctypes
+import os
+import platform
+import resource
+from typing import Callable, Dict, Optional
+
+PROFILE_KEYS = {"cpu_seconds", "address_space_mb", "open_files", "nice", "io_class", "io_priority", "timeout"}
+
+# Linux I/O scheduling classes (see ioprio_set(2))
+IO_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_SET_SYSCALLS = {"x86_64": 251, "aarch64": 30, "i386": 289, "i686": 289, "armv7l": 314}
+
+
+def validate_profile(name: str, profile: dict) -> dict:
+    """
+    Validate the settings of a resource profile.
+
+    Args:
+        name (str): Profile name (used in error messages)
+        profile (dict): Profile settings
+
+    Returns:
+        dict: The profile unchanged
+
+    Raises:
+        ValueError: if the profile contains unknown keys or invalid values
+    """
+    unknown = set(profile) - PROFILE_KEYS
+    if unknown:
+        raise ValueError(f"Unknown settings in resource profile '{name}': {', '.join(sorted(unknown))}")
+    for key in ("cpu_seconds", "address_space_mb", "open_files", "timeout"):
+        if key in profile and (not isinstance(profile[key], (int, float)) or profile[key] <= 0):
+            raise ValueError(f"Resource profile '{name}': {key} must be a positive number")
+    if "nice" in profile and not (isinstance(profile["nice"], int) and -20 <= profile["nice"] <= 19):
+        raise ValueError(f"Resource profile '{name}': nice must be an integer between -20 and 19")
+    if "io_class" in profile and profile["io_class"] not in IO_CLASSES:
+        raise ValueError(f"Resource profile '{name}': io_class must be one of {', '.join(IO_CLASSES)}")
+    if "io_priority" in profile and not (isinstance(profile["io_priority"], int) and 0 <= profile["io_priority"] <= 7):
+        raise ValueError(f"Resource profile '{name}': io_priority must be an integer between 0 and 7")
+    return profile
+
+
+def resolve_profile(config: Optional[dict], profile: Optional[str] = None, tag: Optional[str] = None) -> Dict:
+    """
+    Resolve the resource profile for a job.
+
+    An explicit profile name wins; otherwise the profile assigned to the
+    job's tag under `resources.tags` is used.
+
+    Args:
+        config (dict, optional): Full configuration dictionary
+        profile (str, optional): Explicit profile name
+        tag (str, optional): Job tag
+
+    Returns:
+        dict: Profile settings (empty if no profile applies)
+
+    Raises:
+        ValueError: if the profile is not defined or invalid
+    """
+    resources = (config or {}).get("resources") or {}
+    profiles = resources.get("profiles") or {}
+    name = profile or (resources.get("tags") or {}).get(tag)
+    if not name:
+        return {}
+    if name not in profiles:
+        raise ValueError(f"Unknown resource profile: {name}")
+    return validate_profile(name, dict(profiles[name] or {}))
+
+
+def io_priority_setter(io_class: str, level: int = 0) -> Callable[[], None]:
+    """
+    Resolve ioprio_set(2) and return a function that applies it to the calling process (Linux only).
+
+    libc is loaded here, in the parent, so the returned function only makes the
+    syscall and is safe to call between fork and exec.
+
+    Args:
+        io_class (str): One of 'realtime', 'best-effort' or 'idle'
+        level (int): Priority within the class (0 highest - 7 lowest)
+
+    Returns:
+        callable: Function setting the I/O priority; raises OSError if the syscall fails
+
+    Raises:
+        OSError: if the platform is unsupported
+    """
+    syscall_nr = IOPRIO_SET_SYSCALLS.get(platform.machine())
+    if platform.system() != "Linux" or syscall_nr is None:
+        raise OSError("I/O priority is only supported on Linux")
+    value = (IO_CLASSES[io_class] << IOPRIO_CLASS_SHIFT) | (0 if io_class == "idle" else level)
+    syscall = ctypes.CDLL(None, use_errno=True).syscall
+
+    def apply_io_priority():
+        if syscall(syscall_nr, IOPRIO_WHO_PROCESS, 0, value) != 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    return apply_io_priority
+
+
+def set_io_priority(io_class: str, level: int = 0):
+    """
+    Set the I/O scheduling class and priority of the calling process (Linux only).
+
+    Args:
+        io_class (str): One of 'realtime', 'best-effort' or 'idle'
+        level (int): Priority within the class (0 highest - 7 lowest)
+
+    Raises:
+        OSError: if the platform is unsupported or the syscall fails
+    """
+    io_priority_setter(io_class, level)()
+
+
+def _limit_value(limit: int, value: int) -> int:
+    # Lower both soft and hard limits so the job cannot raise them again
+    _, hard = resource.getrlimit(limit)
+    if hard != resource.RLIM_INFINITY:
+        value = min(value, hard)
+    return value
+
+
+def build_preexec(profile: Optional[dict]) -> Optional[Callable[[], None]]:
+    """
+    Build a function that applies a resource profile in the child before exec.
+
+    Everything that needs more than a plain system call (limit values, the nice
+    level, the ioprio_set syscall) is resolved here in the parent: the child runs
+    between fork and exec of a multi-threaded process and must not load libraries
+    or take locks.
+
+    Args:
+        profile (dict, optional): Resolved profile settings
+
+    Returns:
+        callable or None: Function suitable for subprocess `preexec_fn`
+    """
+    if not profile or not (set(profile) - {"timeout"}):
+        return None
+
+    limits = [
+        (limit, _limit_value(limit, int(profile[key]) * scale))
+        for key, limit, scale in (
+            ("cpu_seconds", resource.RLIMIT_CPU, 1),
+            ("address_space_mb", resource.RLIMIT_AS, 1024 * 1024),
+            ("open_files", resource.RLIMIT_NOFILE, 1),
+        )
+        if key in profile
+    ]
+    priority = os.getpriority(os.PRIO_PROCESS, 0) + int(profile["nice"]) if "nice" in profile else None
+    apply_io_priority = (
+        io_priority_setter(profile["io_class"], int(profile.get("io_priority", 4))) if "io_class" in profile else None
+    )
+
+    def apply_profile():
+        for limit, value in limits:
+            resource.setrlimit(limit, (value, value))
+        if priority is not None:
+            os.setpriority(os.PRIO_PROCESS, 0, priority)
+        if apply_io_priority is not None:
+            apply_io_priority()
+
+    return apply_profile
@@ -0,0 +1,562 @@
+"""
+Purpose: Run managed cron jobs through an output-capturing wrapper.
+
+Responsibilities:
+- Build and recognise the crontab line that routes a job through the runner
+- Stream job stdout/stderr into per-job rotating log files via a fixed-size buffer
+- Compress rotated log files on a background thread
+- Keep a bounded in-memory tail of recent output for failure reports
+- Apply resource profiles (rlimits, nice, I/O priority, wall-clock timeout)
+- Kill the job's process group on timeout and retry failures with backoff
+- Read captured logs back for the --logs command
+"""
+
+import gzip
+import logging
+import os
+import queue
+import random
+import shlex
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from argparse import Namespace
+from typing import Dict, Iterator, List, Optional
+
+from script.cli import parse_args
+from script.notifier import Notifier
+from script.resources import build_preexec
+from script.state import RunStore
+from script.utils import PROJECT_ROOT, project_path, validate_job_id
+
+RUNNER_DEFAULTS = {
+    "log_dir": "logs/jobs",
+    "max_bytes": 10485760,
+    "backup_count": 5,
+    "buffer_size": 65536,
+    "tail_kb": 64,
+    "kill_grace": 10,
+}
+
+RETRY_DEFAULTS = {
+    "backoff_base": 30,
+    "backoff_max": 600,
+    "jitter": 0.5,
+    "max_total": 3600,
+}
+
+RUN_MARKER = " main.py --run "
+
+
+def format_options(options: Optional[Dict[str, str]] = None) -> str:
+    """
+    Render runner options as they appear in a wrapped crontab command.
+
+    Args:
+        options (dict, optional): Runner options (e.g. {"--profile": "heavy"}); None values are left out
+
+    Returns:
+        str: Rendered options, each preceded by a space
+    """
+    return "".join(
+        f" {option} {shlex.quote(str(value))}" for option, value in (options or {}).items() if value is not None
+    )
+
+
+def runner_options(options: Namespace) -> Dict[str, Optional[str]]:
+    """
+    Return the job options of a parsed runner command in the form `wrap_command()` takes.
+
+    Args:
+        options (argparse.Namespace): Output of `parse_runner_command()`
+
+    Returns:
+        dict: Runner options by flag
+    """
+    return {
+        "--tag": options.tag,
+        "--profile": options.profile,
+        "--timeout": options.timeout,
+        "--retries": options.retries or None,
+        "--catch-up-policy": options.catch_up_policy,
+    }
+
+
+def parse_options(rendered: str) -> Dict[str, Optional[str]]:
+    """
+    Parse options rendered by `format_options()` back into values.
+
+    Args:
+        rendered (str): Rendered runner options (e.g. read from an export file)
+
+    Returns:
+        dict: Runner options by flag, as `runner_options()` returns them
+
+    Raises:
+        ValueError: if the text is not a valid set of runner options
+    """
+    try:
+        parsed = parse_args(["--run", "--id", "-", "--command", "-"] + shlex.split(rendered))
+    except (ValueError, SystemExit):
+        raise ValueError(f"Invalid runner options: {rendered!r}") from None
+    return runner_options(parsed)
+
+
+def wrap_command(job_id: str, command: str, options: Optional[Dict[str, str]] = None) -> str:
+    """
+    Build the crontab command that runs `command` through the job runner.
+
+    Args:
+        job_id (str): UUID of the managed job
+        command (str): Original command to execute
+        options (dict, optional): Extra runner options stored with the job (e.g. {"--profile": "heavy"})
+
+    Returns:
+        str: Shell command line suitable for a crontab entry
+
+    Raises:
+        ValueError: if the job ID contains characters other than letters, digits, '-' or '_'
+    """
+    return (
+        f"cd {shlex.quote(PROJECT_ROOT)} && {shlex.quote(sys.executable)} main.py --run "
+        f"--id {validate_job_id(job_id)}{format_options(options)} --command {shlex.quote(command)}"
+    )
+
+
+def notify_flush_command(options: Optional[Dict[str, str]] = None) -> str:
+    """
+    Build the crontab command that sends pending notification digests.
+
+    Args:
+        options (dict, optional): Extra options (e.g. the storage backend selection)
+
+    Returns:
+        str: Shell command line suitable for a crontab entry
+    """
+    return (
+        f"cd {shlex.quote(PROJECT_ROOT)} && {shlex.quote(sys.executable)} main.py --notify-flush"
+        f"{format_options(options)}"
+    )
+
+
+def unwrap_command(command: str) -> str:
+    """
+    Return the original command of a runner-wrapped crontab command.
+
+    Args:
+        command (str): Command as stored in the crontab
+
+    Returns:
+        str: Original command, or `command` unchanged if it is not wrapped
+    """
+    if RUN_MARKER not in command:
+        return command
+    try:
+        tokens = shlex.split(command.split(RUN_MARKER, 1)[1])
+    except ValueError:
+        return command
+    if "--command" in tokens and tokens.index("--command") + 1 < len(tokens):
+        return tokens[tokens.index("--command") + 1]
+    return command
+
+
+def parse_runner_command(command: str) -> Optional[Namespace]:
+    """
+    Parse the runner options stored in a runner-wrapped crontab command.
+
+    Args:
+        command (str): Command as stored in the crontab
+
+    Returns:
+        argparse.Namespace or None: Parsed options (id, command, profile, ...), or None if not wrapped
+    """
+    if RUN_MARKER not in command:
+        return None
+    try:
+        return parse_args(["--run"] + shlex.split(command.split(RUN_MARKER, 1)[1]))
+    except (ValueError, SystemExit):
+        return None
+
+
+def runner_settings(config: Optional[dict] = None) -> dict:
+    """
+    Merge the `runner` section of the configuration with defaults.
+
+    Args:
+        config (dict, optional): Full configuration dictionary
+
+    Returns:
+        dict: Runner settings (`log_dir` resolved against the project root)
+    """
+    settings = {**RUNNER_DEFAULTS, **((config or {}).get("runner") or {})}
+    settings["log_dir"] = project_path(settings["log_dir"])
+    return settings
+
+
+def job_log_path(job_id: str, config: Optional[dict] = None) -> str:
+    """
+    Return the path of the active log file for a job.
+
+    Args:
+        job_id (str): UUID of the managed job
+        config (dict, optional): Full configuration dictionary
+
+    Returns:
+        str: Path to `<log_dir>/<job_id>.log`
+    """
+    log_dir = runner_settings(config)["log_dir"]
+    return os.path.join(log_dir, f"{validate_job_id(job_id)}.log")
+
+
+class TailBuffer:
+    """
+    Fixed-capacity byte buffer that keeps only the most recent output.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity (int): Maximum number of bytes retained
+        """
+        self.capacity = max(0, capacity)
+        self._data = bytearray()
+
+    def write(self, chunk: bytes):
+        """Append a chunk, discarding the oldest bytes beyond capacity."""
+        if self.capacity == 0:
+            return
+        if len(chunk) >= self.capacity:
+            self._data[:] = chunk[-self.capacity:]
+            return
+        self._data += chunk
+        overflow = len(self._data) - self.capacity
+        if overflow > 0:
+            del self._data[:overflow]
+
+    def getvalue(self) -> bytes:
+        """Return the retained bytes."""
+        return bytes(self._data)
+
+    def text(self) -> str:
+        """Return the retained bytes decoded as UTF-8 (invalid bytes replaced)."""
+        return self.getvalue().decode("utf-8", errors="replace")
+
+
+class CompressingLogWriter:
+    """
+    Size-rotating log file whose rotated segments are gzipped in the background.
+
+    Rotated files are first renamed to `<path>.pending.<n>`; a single worker
+    thread shifts the existing `<path>.<i>.gz` backups and compresses the
+    pending file into `<path>.1.gz`, so rotations are applied in order.
+    """
+
+    def __init__(self, path: str, max_bytes: int, backup_count: int):
+        """
+        Args:
+            path (str): Path of the active log file
+            max_bytes (int): Rotate once the active file reaches this size (0 disables)
+            backup_count (int): Number of compressed backups to keep
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+        self._pending_seq = 0
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._compress_loop, daemon=True)
+        self._worker.start()
+
+    def write(self, data: bytes):
+        """Write bytes, rotating the file whenever it reaches `max_bytes`."""
+        view = memoryview(data)
+        while view:
+            if self.max_bytes > 0:
+                room = self.max_bytes - self._size
+                if room <= 0:
+                    self._rotate()
+                    room = self.max_bytes
+                piece = view[:room]
+            else:
+                piece = view
+            self._file.write(piece)
+            self._size += len(piece)
+            view = view[len(piece):]
+
+    def close(self):
+        """Close the active file and wait for pending compression to finish."""
+        self._file.close()
+        self._queue.put(None)
+        self._worker.join()
+
+    def _rotate(self):
+        self._file.close()
+        self._pending_seq += 1
+        pending = f"{self.path}.pending.{os.getpid()}.{self._pending_seq}"
+        os.replace(self.path, pending)
+        self._queue.put(pending)
+        self._file = open(self.path, "ab")
+        self._size = 0
+
+    def _compress_loop(self):
+        while True:
+            pending = self._queue.get()
+            if pending is None:
+                return
+            self._shift_backups()
+            if self.backup_count > 0:
+                with open(pending, "rb") as src, gzip.open(f"{self.path}.1.gz", "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+            os.remove(pending)
+
+    def _shift_backups(self):
+        oldest = f"{self.path}.{self.backup_count}.gz"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}.gz"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}.gz")
+
+
+def read_job_logs(job_id: str, config: Optional[dict] = None, chunk_size: int = 65536) -> Iterator[bytes]:
+    """
+    Stream a job's captured output, oldest segment first.
+
+    Args:
+        job_id (str): UUID of the managed job
+        config (dict, optional): Full configuration dictionary
+        chunk_size (int): Size of the chunks yielded
+
+    Yields:
+        bytes: Successive chunks of captured output
+
+    Raises:
+        FileNotFoundError: if no logs exist for the job
+    """
+    path = job_log_path(job_id, config)
+    backups: List[str] = []
+    for index in range(runner_settings(config)["backup_count"], 0, -1):
+        if os.path.exists(f"{path}.{index}.gz"):
+            backups.append(f"{path}.{index}.gz")
+    directory = os.path.dirname(path) or "."
+    prefix = os.path.basename(path) + ".pending."
+    pending = sorted(
+        (os.path.join(directory, name) for name in os.listdir(directory) if name.startswith(prefix)),
+        key=os.path.getmtime,
+    ) if os.path.isdir(directory) else []
+
+    segments = backups + pending + ([path] if os.path.exists(path) else [])
+    if not segments:
+        raise FileNotFoundError(f"No logs found for job {job_id}")
+
+    for segment in segments:
+        opener = gzip.open if segment.endswith(".gz") else open
+        try:
+            with opener(segment, "rb") as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        except FileNotFoundError:
+            # Segment was compressed or rotated away while reading
+            continue
+
+
+class JobRunner:
+    """
+    Executes a managed job and captures its output with bounded memory.
+    """
+
+    def __init__(self, logger: logging.Logger, config: Optional[dict] = None, notifier: Optional[Notifier] = None):
+        """
+        Initialize JobRunner.
+
+        Args:
+            logger (logging.Logger): Logger instance
+            config (dict, optional): Full configuration dictionary
+            notifier (Notifier, optional): Receives success/failure events of finished jobs
+        """
+        self.logger = logger
+        self.config = config or {}
+        self.notifier = notifier
+        self.settings = runner_settings(self.config)
+        self.retry_settings = {**RETRY_DEFAULTS, **(self.settings.get("retry") or {})}
+        self.store = RunStore(self.config)
+
+    def execute(self, job_id: str, command: str, profile: Optional[dict] = None, timeout: Optional[float] = None,
+                retries: int = 0) -> Dict:
+        """
+        Run a job, retrying failed attempts with exponential backoff and jitter.
+
+        Every attempt is recorded in the RunStore. Retrying stops once an attempt
+        succeeds, `retries` is exhausted, or the next attempt would start after
+        `retry.max_total` seconds since the first one (attempts are also cut off
+        at that point).
+
+        Args:
+            job_id (str): UUID of the managed job
+            command (str): Shell command to execute
+            profile (dict, optional): Resolved resource profile to apply to the job
+            timeout (float, optional): Per-attempt timeout; overrides the profile timeout
+            retries (int): Number of retries after a failed attempt
+
+        Returns:
+            dict: Result of the last attempt (see `run`), including `attempt`
+        """
+        base = float(self.retry_settings["backoff_base"])
+        max_delay = float(self.retry_settings["backoff_max"])
+        jitter = float(self.retry_settings["jitter"])
+        max_total = float(self.retry_settings["max_total"])
+        deadline = time.monotonic() + max_total if max_total > 0 and retries > 0 else None
+
+        attempt = 1
+        while True:
+            attempt_timeout = timeout
+            if deadline is not None:
+                remaining = max(deadline - time.monotonic(), 0.001)
+                attempt_timeout = min(attempt_timeout or remaining, remaining)
+            result = self.run(job_id, command, profile=profile, timeout=attempt_timeout)
+            result["attempt"] = attempt
+            self.store.record({key: value for key, value in result.items() if key != "tail"})
+
+            if result["returncode"] == 0 or attempt > retries:
+                return self._finish(result)
+
+            delay = min(max_delay, base * 2 ** (attempt - 1))
+            delay *= 1 - jitter * random.random()
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                self.logger.error("Job %s: giving up after %s attempt(s), retry time budget exhausted",
+                                  job_id, attempt)
+                return self._finish(result)
+
+            self.logger.warning("Job %s: attempt %s failed, retrying in %.1fs", job_id, attempt, delay)
+            time.sleep(delay)
+            attempt += 1
+
+    def _finish(self, result: Dict) -> Dict:
+        """Report the final outcome of a job to the notifier."""
+        if self.notifier is not None:
+            attempts = f"{result['attempt']} attempt(s)"
+            if result["returncode"] == 0:
+                self.notifier.notify("success", result["job_id"], f"succeeded in {result['duration']}s after {attempts}")
+            else:
+                reason = "timed out" if result["timed_out"] else f"failed with exit code {result['returncode']}"
+                self.notifier.notify("failure", result["job_id"], f"{reason} after {attempts}", result["tail"])
+        return result
+
+    def run(self, job_id: str, command: str, profile: Optional[dict] = None, timeout: Optional[float] = None) -> Dict:
+        """
+        Run a command once, streaming its output into the job's log files.
+
+        The job runs in its own process group so that a timeout kills the
+        whole group (SIGTERM, then SIGKILL after `kill_grace` seconds).
+
+        Args:
+            job_id (str): UUID of the managed job
+            command (str): Shell command to execute
+            profile (dict, optional): Resolved resource profile to apply to the job
+            timeout (float, optional): Wall-clock timeout; overrides the profile timeout
+
+        Returns:
+            dict: Run result (job_id, command, returncode, started, finished, started_at,
+            finished_at, duration, timed_out, tail)
+        """
+        profile = profile or {}
+        timeout = timeout or profile.get("timeout")
+        writer = CompressingLogWriter(
+            job_log_path(job_id, self.config),
+            max_bytes=int(self.settings["max_bytes"]),
+            backup_count=int(self.settings["backup_count"]),
+        )
+        tail = TailBuffer(int(self.settings["tail_kb"]) * 1024)
+        buffer_size = int(self.settings["buffer_size"])
+        started = datetime.now()
+        started_at = time.time()
+        clock = time.monotonic()
+        watchdog = None
+        timed_out = threading.Event()
+
+        try:
+            writer.write(f"=== {started.isoformat(timespec='seconds')} started: {command}\n".encode("utf-8"))
+            process = subprocess.Popen(
+                command,
+                shell=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                bufsize=0,
+                preexec_fn=build_preexec(profile),
+                start_new_session=True,
+            )
+            if timeout:
+                watchdog = threading.Thread(
+                    target=self._watchdog, args=(process, float(timeout), timed_out), daemon=True
+                )
+                watchdog.start()
+            while True:
+                chunk = process.stdout.read(buffer_size)
+                if not chunk:
+                    break
+                writer.write(chunk)
+                tail.write(chunk)
+            process.stdout.close()
+            returncode = process.wait()
+            finished = datetime.now()
+            status = "timed out" if timed_out.is_set() else "finished"
+            writer.write(
+                f"=== {finished.isoformat(timespec='seconds')} {status}: exit code {returncode}\n".encode("utf-8")
+            )
+        finally:
+            writer.close()
+
+        result = {
+            "job_id": job_id,
+            "command": command,
+            "returncode": returncode,
+            "started": started.isoformat(timespec="seconds"),
+            "finished": finished.isoformat(timespec="seconds"),
+            "started_at": started_at,
+            "finished_at": time.time(),
+            "duration": round(time.monotonic() - clock, 3),
+            "timed_out": timed_out.is_set(),
+            "tail": tail.text(),
+        }
+        if timed_out.is_set():
+            self.logger.error("Job %s killed after exceeding its %ss timeout. Last output:\n%s",
+                              job_id, timeout, result["tail"])
+        elif returncode == 0:
+            self.logger.info("Job %s finished successfully", job_id)
+        else:
+            self.logger.error("Job %s failed with exit code %s. Last output:\n%s", job_id, returncode, result["tail"])
+        return result
+
+    def _watchdog(self, process: subprocess.Popen, timeout: float, timed_out: threading.Event):
+        """Kill the job's process group once it exceeds its wall-clock timeout."""
+        try:
+            process.wait(timeout=timeout)
+            return
+        except subprocess.TimeoutExpired:
+            timed_out.set()
+
+        self._signal_group(process, signal.SIGTERM)
+        try:
+            process.wait(timeout=float(self.settings["kill_grace"]))
+        except subprocess.TimeoutExpired:
+            pass
+        # Also reap stragglers that ignored SIGTERM or outlived the group leader
+        self._signal_group(process, signal.SIGKILL)
+
+    @staticmethod
+    def _signal_group(process: subprocess.Popen, sig: int):
+        try:
+            os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
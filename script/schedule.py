@@ -0,0 +1,328 @@
+"""
+Purpose: Parse cron schedules and compute their fire times arithmetically.
+
+Responsibilities:
+- Parse 5-field cron expressions and @macros into per-field value sets
+- Apply Vixie cron day-of-month / day-of-week semantics
+- Enumerate or count fire times in a range day by day (no minute-by-minute scan)
+- Render a canonical form of a schedule
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import FrozenSet, Iterator, List, Optional, Tuple
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# (name, lowest value, highest value, symbolic names)
+FIELDS = [
+    ("minute", 0, 59, {}),
+    ("hour", 0, 23, {}),
+    ("day", 1, 31, {}),
+    ("month", 1, 12, {name: i + 1 for i, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"])}),
+    ("weekday", 0, 7, {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}),
+]
+
+
+def _parse_value(token: str, names: dict, field: str) -> int:
+    token = token.lower()
+    if token in names:
+        return names[token]
+    if not token.isdigit():
+        raise ValueError(f"Invalid {field} value: {token}")
+    return int(token)
+
+
+def _parse_field(text: str, field: str, low: int, high: int, names: dict) -> FrozenSet[int]:
+    values = set()
+    for part in text.split(","):
+        if not part:
+            raise ValueError(f"Empty {field} list entry")
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            if not step_text.isdigit() or int(step_text) == 0:
+                raise ValueError(f"Invalid {field} step: {step_text}")
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = _parse_value(start_text, names, field), _parse_value(end_text, names, field)
+        else:
+            start = _parse_value(part, names, field)
+            # "5/15" means "5-<max>/15"
+            end = high if step > 1 else start
+        if not (low <= start <= high and low <= end <= high) or start > end:
+            raise ValueError(f"{field} value out of range: {part}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+def _render_field(values: FrozenSet[int], low: int, high: int, allow_star: bool = True) -> str:
+    """Render a value set compactly: '*', '*/n', or a list of 'a-b' ranges and values."""
+    ordered = sorted(values)
+    if allow_star:
+        if ordered == list(range(low, high + 1)):
+            return "*"
+        for step in range(2, high - low + 1):
+            if ordered == list(range(low, high + 1, step)):
+                return f"*/{step}"
+    parts: List[str] = []
+    i = 0
+    while i < len(ordered):
+        j = i
+        while j + 1 < len(ordered) and ordered[j + 1] == ordered[j] + 1:
+            j += 1
+        if j - i >= 2:
+            parts.append(f"{ordered[i]}-{ordered[j]}")
+        else:
+            parts.extend(str(value) for value in ordered[i:j + 1])
+        i = j + 1
+    return ",".join(parts)
+
+
+def _render_starred(values: FrozenSet[int], low: int, high: int) -> str:
+    """
+    Render a day field that was written with a leading '*', keeping the '*'.
+
+    Vixie cron ANDs the day fields when either starts with '*', so dropping
+    the star (e.g. '*/31' -> '1') would change the fire times. A starred field
+    always contains `low`, which '*/<size>' selects on its own.
+    """
+    rendered = _render_field(values, low, high)
+    if rendered.startswith("*"):
+        return rendered
+    rest = values - {low}
+    star = f"*/{high - low + 1}"
+    return f"{star},{_render_field(rest, low, high, allow_star=False)}" if rest else star
+
+
+class CronSchedule:
+    """
+    A parsed cron schedule.
+
+    Fire times are naive local datetimes, the way cron itself interprets
+    the crontab.
+    """
+
+    def __init__(self, expression: str):
+        """
+        Parse a cron expression.
+
+        Args:
+            expression (str): 5-field cron expression or macro (e.g. '@daily')
+
+        Raises:
+            ValueError: if the expression is invalid
+        """
+        self.expression = expression
+        text = expression.strip()
+        self.reboot = text.lower() == "@reboot"
+        if self.reboot:
+            text = "0 0 1 1 *"
+        text = MACROS.get(text.lower(), text)
+        parts = text.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron schedule must have 5 fields: {expression!r}")
+
+        minutes, hours, days, months, weekdays = (
+            _parse_field(part, name, low, high, names) for part, (name, low, high, names) in zip(parts, FIELDS)
+        )
+        self.minutes: Tuple[int, ...] = tuple(sorted(minutes))
+        self.hours: Tuple[int, ...] = tuple(sorted(hours))
+        self.days: FrozenSet[int] = days
+        self.months: FrozenSet[int] = months
+        # Both 0 and 7 mean Sunday
+        self.weekdays: FrozenSet[int] = frozenset(day % 7 for day in weekdays)
+        # Vixie cron: if either day field starts with '*', both must match; otherwise either may
+        self.day_star = parts[2].startswith("*")
+        self.weekday_star = parts[4].startswith("*")
+
+    @classmethod
+    def from_masks(cls, expression: str, masks: Tuple[int, int, int, int, int], day_star: bool,
+                   weekday_star: bool, reboot: bool = False) -> "CronSchedule":
+        """
+        Rebuild a schedule from the bitmasks returned by `masks()`, without parsing.
+
+        Args:
+            expression (str): Original expression (kept for display)
+            masks (tuple[int]): Minute, hour, day, month and weekday bitmasks (bit n = value n)
+            day_star (bool): Whether the day-of-month field started with '*'
+            weekday_star (bool): Whether the day-of-week field started with '*'
+            reboot (bool): Whether this is an @reboot schedule
+
+        Returns:
+            CronSchedule: Equivalent schedule
+        """
+        minutes, hours, days, months, weekdays = (
+            [value for value in range(low, high + 1) if mask >> value & 1]
+            for mask, (_, low, high, _) in zip(masks, FIELDS)
+        )
+        schedule = cls.__new__(cls)
+        schedule.expression = expression
+        schedule.reboot = reboot
+        schedule.minutes = tuple(minutes)
+        schedule.hours = tuple(hours)
+        schedule.days = frozenset(days)
+        schedule.months = frozenset(months)
+        schedule.weekdays = frozenset(day % 7 for day in weekdays)
+        schedule.day_star = day_star
+        schedule.weekday_star = weekday_star
+        return schedule
+
+    def masks(self) -> Tuple[int, int, int, int, int]:
+        """
+        Return the field value sets as bitmasks (bit n set if value n matches).
+
+        Returns:
+            tuple[int]: Minute, hour, day, month and weekday bitmasks
+        """
+        return tuple(
+            sum(1 << value for value in values)
+            for values in (self.minutes, self.hours, self.days, self.months, self.weekdays)
+        )
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CronSchedule) and self.canonical() == other.canonical()
+
+    def __hash__(self) -> int:
+        return hash(self.canonical())
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
+
+    @property
+    def fires_per_day(self) -> int:
+        """Number of fire times on a matching day."""
+        return len(self.hours) * len(self.minutes)
+
+    def matches_day(self, day: date) -> bool:
+        """
+        Check whether the schedule fires on a given date.
+
+        Args:
+            day (date): Calendar date
+
+        Returns:
+            bool: True if at least one fire time falls on `day`
+        """
+        if self.reboot or day.month not in self.months:
+            return False
+        day_match = day.day in self.days
+        # date.weekday(): Monday=0 .. Sunday=6; cron: Sunday=0 .. Saturday=6
+        weekday_match = (day.weekday() + 1) % 7 in self.weekdays
+        if self.day_star or self.weekday_star:
+            return day_match and weekday_match
+        return day_match or weekday_match
+
+    def _times_on(self, day: date, after: Optional[datetime], before: Optional[datetime]) -> Iterator[datetime]:
+        for hour in self.hours:
+            for minute in self.minutes:
+                moment = datetime.combine(day, time(hour, minute))
+                if after is not None and moment <= after:
+                    continue
+                if before is not None and moment >= before:
+                    return
+                yield moment
+
+    def iter_between(self, after: datetime, before: datetime) -> Iterator[datetime]:
+        """
+        Yield fire times strictly between `after` and `before`, in order.
+
+        Args:
+            after (datetime): Exclusive lower bound (naive local time)
+            before (datetime): Exclusive upper bound (naive local time)
+
+        Yields:
+            datetime: Fire times
+        """
+        day = after.date()
+        while day <= before.date():
+            if self.matches_day(day):
+                edge = day in (after.date(), before.date())
+                yield from self._times_on(day, after if edge else None, before if edge else None)
+            day += timedelta(days=1)
+
+    def count_between(self, after: datetime, before: datetime) -> int:
+        """
+        Count fire times strictly between `after` and `before` without enumerating them.
+
+        Args:
+            after (datetime): Exclusive lower bound (naive local time)
+            before (datetime): Exclusive upper bound (naive local time)
+
+        Returns:
+            int: Number of fire times
+        """
+        if before <= after:
+            return 0
+        count = 0
+        day = after.date()
+        while day <= before.date():
+            if self.matches_day(day):
+                if day in (after.date(), before.date()):
+                    count += sum(1 for _ in self._times_on(day, after, before))
+                else:
+                    count += self.fires_per_day
+            day += timedelta(days=1)
+        return count
+
+    def last_before(self, before: datetime, after: datetime) -> Optional[datetime]:
+        """
+        Return the latest fire time strictly between `after` and `before`.
+
+        Args:
+            before (datetime): Exclusive upper bound (naive local time)
+            after (datetime): Exclusive lower bound (naive local time)
+
+        Returns:
+            datetime or None: Latest fire time, or None if there is none
+        """
+        day = before.date()
+        while day >= after.date():
+            if self.matches_day(day):
+                times = list(self._times_on(day, after, before))
+                if times:
+                    return times[-1]
+            day -= timedelta(days=1)
+        return None
+
+    def canonical(self) -> str:
+        """
+        Return a canonical 5-field rendering of the schedule.
+
+        Equivalent expressions ('*/15' and '0,15,30,45', '@daily' and
+        '0 0 * * *', 'mon-fri' and '1-5') render identically.
+
+        Returns:
+            str: Canonical expression ('@reboot' for reboot jobs)
+        """
+        if self.reboot:
+            return "@reboot"
+        if self.day_star or self.weekday_star:
+            # Both day fields must match; '*'-led fields must stay '*'-led
+            day = (_render_starred if self.day_star else _render_field)(self.days, 1, 31)
+            weekday = (_render_starred if self.weekday_star else _render_field)(self.weekdays, 0, 6)
+        elif len(self.days) == 31 or len(self.weekdays) == 7:
+            # Either day field may match and one of them matches every day
+            day = weekday = "*"
+        else:
+            # Either day field may match; neither may be rendered with a leading '*'
+            day = _render_field(self.days, 1, 31, allow_star=False)
+            weekday = _render_field(self.weekdays, 0, 6, allow_star=False)
+        return " ".join([
+            _render_field(frozenset(self.minutes), 0, 59),
+            _render_field(frozenset(self.hours), 0, 23),
+            day,
+            _render_field(self.months, 1, 12),
+            weekday,
+        ])
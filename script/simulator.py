@@ -0,0 +1,194 @@
+"""
+Purpose: Load simulation and capacity planning for scheduled jobs.
+
+Responsibilities:
+- Build a workload from managed jobs, recorded average durations and estimates
+- Replay a day or week of fire times as a discrete-event simulation on N cores
+- Report peak concurrency, queueing delay and CPU-saturation minutes
+- Compare candidate schedules against the current job set
+"""
+
+import heapq
+import os
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from script.schedule import CronSchedule
+from script.state import RunStore
+
+SIMULATION_DEFAULTS = {
+    "default_duration": 60,
+    "history_runs": 20,
+}
+
+HORIZONS = {"day": timedelta(days=1), "week": timedelta(days=7)}
+
+
+def simulation_settings(config: Optional[dict] = None) -> dict:
+    """
+    Merge the `simulation` section of the configuration with defaults.
+
+    Args:
+        config (dict, optional): Full configuration dictionary
+
+    Returns:
+        dict: Simulation settings
+    """
+    return {**SIMULATION_DEFAULTS, **((config or {}).get("simulation") or {})}
+
+
+def parse_candidate(text: str, default_duration: float) -> List[Dict]:
+    """
+    Parse a candidate batch: `SCHEDULE[=SECONDS]` entries separated by ';'.
+
+    Args:
+        text (str): Candidate specification, e.g. '0 2 * * *=600;30 2 * * *'
+        default_duration (float): Duration of entries without '=SECONDS'
+
+    Returns:
+        list[dict]: Candidate jobs (id, schedule, duration)
+
+    Raises:
+        ValueError: if a schedule or duration is invalid
+    """
+    jobs = []
+    for number, entry in enumerate(part.strip() for part in text.split(";") if part.strip()):
+        expression, _, seconds = entry.partition("=")
+        duration = float(seconds) if seconds else float(default_duration)
+        if duration <= 0:
+            raise ValueError(f"Candidate duration must be positive: {entry}")
+        jobs.append({
+            "id": f"candidate-{number + 1}",
+            "schedule": CronSchedule(expression.strip()),
+            "duration": duration,
+        })
+    if not jobs:
+        raise ValueError("Empty candidate")
+    return jobs
+
+
+def build_workload(jobs: List[Dict], store: RunStore, estimates: Optional[Dict[str, float]] = None,
+                   default_duration: float = 60, history_runs: int = 20) -> List[Dict]:
+    """
+    Turn managed jobs into a simulated workload.
+
+    Durations come from `estimates` first, then the average of the recorded
+    runs, then `default_duration`. Disabled entries (downstream jobs fired by
+    their upstreams) and @reboot jobs are left out.
+
+    Args:
+        jobs (list[dict]): Managed jobs as returned by CronExecutor.list_all()
+        store (RunStore): Run records
+        estimates (dict, optional): Duration estimates in seconds, by job ID
+        default_duration (float): Duration of jobs without records or estimates
+        history_runs (int): Number of recent runs averaged per job
+
+    Returns:
+        list[dict]: Workload entries (id, schedule, duration)
+    """
+    estimates = estimates or {}
+    workload = []
+    for job in jobs:
+        if not job.get("enabled", True):
+            continue
+        try:
+            schedule = CronSchedule(job["schedule"])
+        except ValueError:
+            continue
+        if schedule.reboot:
+            continue
+        duration = estimates.get(job["id"])
+        if duration is None:
+            duration = store.average_duration(job["id"], history_runs)
+        workload.append({"id": job["id"], "schedule": schedule, "duration": float(duration or default_duration)})
+    return workload
+
+
+def simulate(workload: List[Dict], cores: int, start: datetime, end: datetime) -> Dict:
+    """
+    Replay every fire time in [start, end) on a host with `cores` cores.
+
+    Each run needs one core for its duration; runs that find every core busy
+    wait in FIFO order. Runs still active at `end` are played out so their
+    delays are counted, but saturation is only counted up to `end`.
+
+    Args:
+        workload (list[dict]): Jobs to replay (id, schedule, duration)
+        cores (int): Number of cores of the host
+        start (datetime): Start of the simulated period (naive local time)
+        end (datetime): End of the simulated period (naive local time)
+
+    Returns:
+        dict: runs, peak_concurrent, peak_at, saturation_minutes,
+        mean_delay, max_delay (seconds) and delayed_runs
+    """
+    cores = max(1, int(cores))
+    horizon = (end - start).total_seconds()
+    origin = start - timedelta(microseconds=1)
+    arrivals = sorted(
+        ((moment - start).total_seconds(), job["duration"])
+        for job in workload for moment in job["schedule"].iter_between(origin, end)
+    )
+
+    completions: List[float] = []
+    waiting: deque = deque()
+    busy = alive = peak = delayed = 0
+    peak_at = 0.0
+    total_delay = max_delay = saturated = 0.0
+    saturated_since: Optional[float] = None
+    index = 0
+
+    def start_run(now: float, arrived: float, duration: float):
+        nonlocal busy, total_delay, max_delay, delayed, saturated_since
+        delay = now - arrived
+        total_delay += delay
+        max_delay = max(max_delay, delay)
+        delayed += delay > 0
+        busy += 1
+        heapq.heappush(completions, now + duration)
+        if busy == cores and saturated_since is None:
+            saturated_since = now
+
+    while index < len(arrivals) or completions:
+        # Completions first on ties: a core freed at t can take a run arriving at t
+        if completions and (index >= len(arrivals) or completions[0] <= arrivals[index][0]):
+            now = heapq.heappop(completions)
+            busy -= 1
+            alive -= 1
+            if saturated_since is not None:
+                # Leftover runs finish after `end`; that time is outside the simulated period
+                saturated += max(0.0, min(now, horizon) - saturated_since)
+                saturated_since = None
+            if waiting:
+                arrived, duration = waiting.popleft()
+                start_run(now, arrived, duration)
+        else:
+            now, duration = arrivals[index]
+            index += 1
+            alive += 1
+            if alive > peak:
+                peak, peak_at = alive, now
+            if busy < cores:
+                start_run(now, now, duration)
+            else:
+                waiting.append((now, duration))
+
+    runs = len(arrivals)
+    return {
+        "runs": runs,
+        "peak_concurrent": peak,
+        "peak_at": start + timedelta(seconds=peak_at) if runs else None,
+        "saturation_minutes": round(saturated / 60, 1),
+        "mean_delay": round(total_delay / runs, 1) if runs else 0.0,
+        "max_delay": round(max_delay, 1),
+        "delayed_runs": delayed,
+    }
+
+
+def host_cores() -> int:
+    """Return the number of cores available to this process."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS
+        return os.cpu_count() or 1
@@ -0,0 +1,140 @@
+"""
+Purpose: Persist run records of managed cron jobs.
+
+Responsibilities:
+- Append one record per run attempt to a per-job JSON-lines file
+- Keep run files bounded by trimming to the most recent records
+- Answer simple questions about past runs (history, last run, last success, average duration)
+"""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+from script.utils import project_path, validate_job_id
+
+STATE_DEFAULTS = {
+    "dir": "state",
+    "keep_runs": 200,
+}
+
+
+def state_settings(config: Optional[dict] = None) -> dict:
+    """
+    Merge the `state` section of the configuration with defaults.
+
+    Args:
+        config (dict, optional): Full configuration dictionary
+
+    Returns:
+        dict: State settings (`dir` resolved against the project root)
+    """
+    settings = {**STATE_DEFAULTS, **((config or {}).get("state") or {})}
+    settings["dir"] = project_path(settings["dir"])
+    return settings
+
+
+class RunStore:
+    """
+    Stores run attempts of managed jobs under `<state dir>/runs/<job_id>.jsonl`.
+    """
+
+    def __init__(self, config: Optional[dict] = None):
+        """
+        Initialize RunStore.
+
+        Args:
+            config (dict, optional): Full configuration dictionary
+        """
+        settings = state_settings(config)
+        self.runs_dir = os.path.join(settings["dir"], "runs")
+        self.keep_runs = int(settings["keep_runs"])
+
+    def _path(self, job_id: str) -> str:
+        return os.path.join(self.runs_dir, f"{validate_job_id(job_id)}.jsonl")
+
+    def record(self, run: Dict):
+        """
+        Append a run record, trimming the file once it holds twice `keep_runs` records.
+
+        Args:
+            run (dict): Run record; must contain `job_id`
+        """
+        path = self._path(run["job_id"])
+        os.makedirs(self.runs_dir, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run, sort_keys=True) + "\n")
+
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        if len(lines) > 2 * self.keep_runs:
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(lines[-self.keep_runs:])
+            os.replace(tmp_path, path)
+
+    def history(self, job_id: str) -> List[Dict]:
+        """
+        Return recorded runs of a job, oldest first.
+
+        Args:
+            job_id (str): UUID of the managed job
+
+        Returns:
+            list[dict]: Run records (empty if the job never ran)
+        """
+        path = self._path(job_id)
+        if not os.path.exists(path):
+            return []
+        runs = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    runs.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Skip a partially written line
+                    continue
+        return runs
+
+    def last_run(self, job_id: str) -> Optional[Dict]:
+        """
+        Return the most recent run record of a job.
+
+        Args:
+            job_id (str): UUID of the managed job
+
+        Returns:
+            dict or None: Latest run record, or None if the job never ran
+        """
+        runs = self.history(job_id)
+        return runs[-1] if runs else None
+
+    def last_success(self, job_id: str) -> Optional[Dict]:
+        """
+        Return the most recent successful run record of a job.
+
+        Args:
+            job_id (str): UUID of the managed job
+
+        Returns:
+            dict or None: Latest run record with exit code 0, or None
+        """
+        for run in reversed(self.history(job_id)):
+            if run.get("returncode") == 0:
+                return run
+        return None
+
+    def average_duration(self, job_id: str, last: int = 20) -> Optional[float]:
+        """
+        Return the mean wall-clock duration of a job's most recent runs.
+
+        Args:
+            job_id (str): UUID of the managed job
+            last (int): Number of most recent runs to average
+
+        Returns:
+            float or None: Mean duration in seconds, or None if no run recorded one
+        """
+        durations = [run["duration"] for run in self.history(job_id) if run.get("duration") is not None]
+        durations = durations[-last:]
+        return sum(durations) / len(durations) if durations else None
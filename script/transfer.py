@@ -0,0 +1,284 @@
+"""
+Purpose: Compact binary export/import of managed job sets.
+
+Responsibilities:
+- Pack jobs into a versioned, checksummed binary file with interned strings
+  and precompiled schedule bitmasks
+- Load a file back without parsing schedules or commands
+- Rebuild runner-wrapped commands for the importing host
+"""
+
+import hashlib
+import struct
+import uuid
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from script.runner import format_options, parse_options, parse_runner_command, runner_options, wrap_command
+from script.utils import validate_job_id
+from script.schedule import CronSchedule
+
+MAGIC = b"CJMX"
+FORMAT_VERSION = 1
+
+# magic, format version, flags, job count, payload size, SHA-256 of the stored payload
+HEADER = struct.Struct("<4sHHII32s")
+# job id, schedule, command, tag, runner options (string indexes), flags,
+# minute, hour, day, month and weekday masks
+RECORD = struct.Struct("<16sIIIIBQIIHB")
+# downstream record index, upstream record index
+EDGE = struct.Struct("<II")
+
+FILE_COMPRESSED = 1
+
+JOB_ENABLED = 1
+JOB_DAY_STAR = 2
+JOB_WEEKDAY_STAR = 4
+JOB_REBOOT = 8
+JOB_RUNNER = 16
+JOB_STRING_ID = 32
+
+NO_STRING = 0xFFFFFFFF
+
+
+class _StringTable:
+    """Interns strings so repeated commands, tags and schedules are stored once."""
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.strings: List[bytes] = []
+
+    def add(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        if value not in self.index:
+            self.index[value] = len(self.strings)
+            self.strings.append(value.encode("utf-8"))
+        return self.index[value]
+
+    def pack(self) -> bytes:
+        offsets = [0]
+        for value in self.strings:
+            offsets.append(offsets[-1] + len(value))
+        return struct.pack(f"<I{len(offsets)}I", len(self.strings), *offsets) + b"".join(self.strings)
+
+
+def pack_jobs(jobs: List[Dict], upstreams: Optional[Dict[str, List[str]]] = None, compress: bool = True) -> bytes:
+    """
+    Serialize managed jobs.
+
+    Runner-wrapped commands are stored as the original command plus the rendered
+    runner options, so the importing host can wrap them with its own paths.
+
+    Args:
+        jobs (list[dict]): Managed jobs as returned by CronExecutor.list_all()
+        upstreams (dict, optional): Dependency graph ({job_id: [upstream ids]}); only
+            edges between exported jobs are kept
+        compress (bool): Compress the payload with zlib
+
+    Returns:
+        bytes: File content
+
+    Raises:
+        ValueError: if a schedule cannot be parsed
+    """
+    strings = _StringTable()
+    records = []
+    positions = {}
+    for position, job in enumerate(jobs):
+        schedule = CronSchedule(job["schedule"])
+        flags = (
+            (JOB_ENABLED if job.get("enabled", True) else 0)
+            | (JOB_DAY_STAR if schedule.day_star else 0)
+            | (JOB_WEEKDAY_STAR if schedule.weekday_star else 0)
+            | (JOB_REBOOT if schedule.reboot else 0)
+        )
+        options = parse_runner_command(job["command"])
+        if options is not None:
+            flags |= JOB_RUNNER
+            command, rendered = options.command, format_options(runner_options(options))
+        else:
+            command, rendered = job["command"], None
+        try:
+            job_key = uuid.UUID(job["id"]).bytes
+        except ValueError:
+            flags |= JOB_STRING_ID
+            job_key = struct.pack("<I12x", strings.add(job["id"]))
+        records.append(RECORD.pack(
+            job_key, strings.add(job["schedule"]), strings.add(command), strings.add(job.get("tag") or None),
+            strings.add(rendered), flags, *schedule.masks(),
+        ))
+        positions[job["id"]] = position
+
+    edges = [
+        EDGE.pack(positions[child], positions[parent])
+        for child, parents in sorted((upstreams or {}).items()) if child in positions
+        for parent in parents if parent in positions
+    ]
+    payload = b"".join([
+        strings.pack(),
+        struct.pack("<I", len(records)), *records,
+        struct.pack("<I", len(edges)), *edges,
+    ])
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 6)
+        flags |= FILE_COMPRESSED
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, flags, len(records), len(payload), hashlib.sha256(payload).digest())
+    return header + payload
+
+
+def _checked_text(value: str, what: str) -> str:
+    # A line break would end the crontab line and start a new entry; cron splits
+    # lines before any shell sees the quoting
+    if any(ord(char) < 32 or ord(char) == 127 for char in value):
+        raise ValueError(f"Invalid {what} in export file: {value!r}")
+    return value
+
+
+def _check_masks(expression: str, masks: Tuple[int, ...], flags: int):
+    """Raise ValueError unless a stored schedule text parses to its stored masks and flags."""
+    try:
+        schedule = CronSchedule(expression)
+    except ValueError:
+        raise ValueError(f"Invalid schedule in export file: {expression!r}") from None
+    expected = (
+        (JOB_DAY_STAR if schedule.day_star else 0)
+        | (JOB_WEEKDAY_STAR if schedule.weekday_star else 0)
+        | (JOB_REBOOT if schedule.reboot else 0)
+    )
+    if schedule.masks() != masks or expected != flags:
+        raise ValueError(f"Schedule {expression!r} does not match its stored masks in export file")
+
+
+def unpack_jobs(data: bytes) -> Tuple[List[Dict], Dict[str, List[str]]]:
+    """
+    Load jobs from file content produced by `pack_jobs()`.
+
+    Schedules come back as CronSchedule objects rebuilt from their masks and
+    commands as stored. Each distinct schedule text is parsed once, only to
+    check it against its masks: the crontab gets the text, the calendar index
+    the masks, and the checksum does not stop anyone from editing either.
+
+    Args:
+        data (bytes): File content
+
+    Returns:
+        tuple: (jobs, upstreams). Each job has id, schedule (expression),
+        parsed (CronSchedule), command (original), options (rendered runner
+        options or None), tag and enabled.
+
+    Raises:
+        ValueError: if the file is not an export, has an unsupported version, fails its
+            checksum, holds an unsafe job ID, tag, schedule or command, or a schedule
+            that does not match its masks
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Not a job export file (too short)")
+    magic, version, flags, job_count, size, digest = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a job export file (bad magic)")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported export format version {version} (expected {FORMAT_VERSION})")
+    payload = data[HEADER.size:]
+    if len(payload) != size or hashlib.sha256(payload).digest() != digest:
+        raise ValueError("Export file is corrupt (checksum mismatch)")
+    if flags & FILE_COMPRESSED:
+        payload = zlib.decompress(payload)
+
+    view = memoryview(payload)
+    (string_count,) = struct.unpack_from("<I", view)
+    offsets = struct.unpack_from(f"<{string_count + 1}I", view, 4)
+    blob_start = 4 + 4 * (string_count + 1)
+    blob = bytes(view[blob_start:blob_start + offsets[-1]])
+    strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(string_count)]
+
+    cursor = blob_start + offsets[-1]
+    (record_count,) = struct.unpack_from("<I", view, cursor)
+    cursor += 4
+    if record_count != job_count:
+        raise ValueError("Export file is corrupt (job count mismatch)")
+    records_end = cursor + record_count * RECORD.size
+
+    jobs = []
+    checked = set()
+    for (job_key, schedule, command, tag, options, job_flags,
+         *masks) in RECORD.iter_unpack(view[cursor:records_end]):
+        if job_flags & JOB_STRING_ID:
+            # IDs end up in crontab comments, runner command lines and file names
+            job_id = validate_job_id(strings[struct.unpack_from("<I", job_key)[0]])
+        else:
+            job_id = str(uuid.UUID(bytes=job_key))
+        expression = _checked_text(strings[schedule], "schedule")
+        schedule_flags = job_flags & (JOB_DAY_STAR | JOB_WEEKDAY_STAR | JOB_REBOOT)
+        if (schedule, schedule_flags, *masks) not in checked:
+            _check_masks(expression, tuple(masks), schedule_flags)
+            checked.add((schedule, schedule_flags, *masks))
+        jobs.append({
+            "id": job_id,
+            "schedule": expression,
+            "parsed": CronSchedule.from_masks(expression, tuple(masks), bool(job_flags & JOB_DAY_STAR),
+                                              bool(job_flags & JOB_WEEKDAY_STAR), bool(job_flags & JOB_REBOOT)),
+            "command": _checked_text(strings[command], "command"),
+            "options": strings[options] if job_flags & JOB_RUNNER else None,
+            "tag": _checked_text(strings[tag], "tag") if tag != NO_STRING else "",
+            "enabled": bool(job_flags & JOB_ENABLED),
+        })
+
+    (edge_count,) = struct.unpack_from("<I", view, records_end)
+    upstreams: Dict[str, List[str]] = {}
+    for child, parent in EDGE.iter_unpack(view[records_end + 4:records_end + 4 + edge_count * EDGE.size]):
+        upstreams.setdefault(jobs[child]["id"], []).append(jobs[parent]["id"])
+    return jobs, upstreams
+
+
+def crontab_command(job: Dict, storage: Optional[Dict[str, str]] = None) -> str:
+    """
+    Return the crontab command of an imported job, wrapped for this host if it used the runner.
+
+    Args:
+        job (dict): Job as returned by `unpack_jobs()`
+        storage (dict, optional): Options selecting the importing backend (CronBackend.cli_options())
+
+    Returns:
+        str: Command to store in the crontab
+
+    Raises:
+        ValueError: if the stored runner options are invalid
+    """
+    if job["options"] is None:
+        return job["command"]
+    # Re-render from parsed values: the stored text must never reach the shell as is
+    return wrap_command(job["id"], job["command"], {**parse_options(job["options"]), **(storage or {})})
+
+
+def export_jobs(path: str, jobs: List[Dict], upstreams: Optional[Dict[str, List[str]]] = None) -> int:
+    """
+    Write jobs to an export file.
+
+    Args:
+        path (str): Destination file
+        jobs (list[dict]): Managed jobs as returned by CronExecutor.list_all()
+        upstreams (dict, optional): Dependency graph
+
+    Returns:
+        int: Size of the file in bytes
+    """
+    data = pack_jobs(jobs, upstreams)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+
+def import_jobs(path: str) -> Tuple[List[Dict], Dict[str, List[str]]]:
+    """
+    Read jobs from an export file.
+
+    Args:
+        path (str): Export file
+
+    Returns:
+        tuple: (jobs, upstreams) as returned by `unpack_jobs()`
+    """
+    with open(path, "rb") as f:
+        return unpack_jobs(f.read())
@@ -5,14 +5,39 @@ Responsibilities:
 - Validate cron expressions
 - Check command existence in PATH
 - Provide safe file writing with logging
+- Validate job IDs used in file names
+- Resolve configured relative paths against the project root
 - Professional docstrings and comments
 """
 
 import logging
+import os
+import re
 import shutil
 from typing import Optional
 from pathlib import Path
-from crontab import CronTab
+from script.schedule import CronSchedule
+
+JOB_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# The runner wrapper `cd`s here before running a job
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def project_path(path: str) -> str:
+    """
+    Resolve a configured path against the project root.
+
+    Relative state and log paths must not depend on the directory the CLI is
+    started from, since cron runs jobs from PROJECT_ROOT.
+
+    Args:
+        path (str): Absolute path, or path relative to the project root
+
+    Returns:
+        str: Absolute path
+    """
+    return os.path.join(PROJECT_ROOT, os.path.expanduser(path))
 
 
 def validate_cron_expression(expression: str) -> bool:
@@ -26,9 +51,9 @@ def validate_cron_expression(expression: str) -> bool:
         bool: True if valid, False otherwise
     """
     try:
-        test_cron = CronTab(expression)
+        CronSchedule(expression)
         return True
-    except (ValueError):
+    except (ValueError, AttributeError):
         return False
 
 
@@ -46,6 +71,24 @@ def command_exists(command: str) -> bool:
     return cmd_path is not None
 
 
+def validate_job_id(job_id: str) -> str:
+    """
+    Ensure a job ID is safe to use as part of a file name.
+
+    Args:
+        job_id (str): Job ID to check
+
+    Returns:
+        str: The job ID unchanged
+
+    Raises:
+        ValueError: if the ID contains characters other than letters, digits, '-' or '_'
+    """
+    if not job_id or not JOB_ID_PATTERN.match(job_id):
+        raise ValueError(f"Invalid job ID: {job_id!r}")
+    return job_id
+
+
 def safe_write_file(file_path: str, content: str, logger: Optional[logging.Logger] = None):
     """
     Write content to a file safely, creating directories if needed.
@@ -0,0 +1,112 @@
+"""
+Purpose: Unit tests for the crontab storage backends.
+
+Covers:
+- Backend selection from config
+- Tabfile and in-memory backends through CronExecutor
+- /etc/cron.d drop-ins: one file per tag, only touched files rewritten, rollback
+- Runner jobs reopening the backend they were added to
+"""
+
+import logging
+import os
+import pytest
+from script.backends import DropInBackend, MemoryBackend, SingleTableBackend, TabfileBackend, create_backend
+from script.executor import CronExecutor
+from script.job import JobManager
+from script.runner import parse_runner_command
+
+
+def make_executor(tmp_path, backend):
+    """Build an executor over `backend` with history under tmp_path."""
+    return CronExecutor(logging.getLogger("test_backends"), {"state": {"dir": str(tmp_path / "state")}}, backend)
+
+
+def test_create_backend_from_config(tmp_path):
+    """storage.backend should select the backend; bad settings should raise ValueError."""
+    assert isinstance(create_backend({"storage": {"backend": "memory"}}), MemoryBackend)
+    tabfile = create_backend({"storage": {"backend": "tabfile", "tabfile": str(tmp_path / "jobs.tab")}})
+    assert isinstance(tabfile, TabfileBackend)
+    cron_d = create_backend({"storage": {"backend": "cron_d", "cron_d": {"dir": str(tmp_path)}}})
+    assert isinstance(cron_d, DropInBackend) and cron_d.user == "root"
+    with pytest.raises(ValueError):
+        create_backend({"storage": {"backend": "tabfile"}})
+    with pytest.raises(ValueError):
+        create_backend({"storage": {"backend": "nosql"}})
+
+
+def test_incomplete_backend_fails_on_creation():
+    """A backend missing write() should not be instantiable."""
+    class ReadOnly(SingleTableBackend):
+        def _load(self):
+            return None
+
+    with pytest.raises(TypeError, match="write"):
+        ReadOnly()
+
+
+def test_memory_backend_round_trip(tmp_path):
+    """Jobs should be added, listed and removed without touching the system."""
+    executor = make_executor(tmp_path, MemoryBackend())
+    job_id = executor.add("*/5 * * * *", "/bin/true", comment="web")
+    jobs = executor.list_all()
+    assert [(job["id"], job["tag"], job["schedule"]) for job in jobs] == [(job_id, "web", "*/5 * * * *")]
+    executor.remove(job_id)
+    assert executor.list_all() == []
+
+
+def test_tabfile_backend_persists(tmp_path):
+    """A tabfile should be created on the first write and read back by a new executor."""
+    path = tmp_path / "cron" / "jobs.tab"
+    job_id = make_executor(tmp_path, TabfileBackend(str(path))).add("0 3 * * *", "/bin/true")
+    assert job_id in path.read_text()
+    assert [job["id"] for job in make_executor(tmp_path, TabfileBackend(str(path))).list_all()] == [job_id]
+
+
+def test_drop_ins_per_tag(tmp_path):
+    """Each tag should get its own system-format file; changes rewrite only that file."""
+    directory = tmp_path / "cron.d"
+    executor = make_executor(tmp_path, DropInBackend(str(directory), "cjm", "backup"))
+    etl = executor.add("0 2 * * *", "/opt/etl.sh", comment="etl")
+    plain = executor.add("@hourly", "/bin/true")
+    assert sorted(os.listdir(directory)) == ["cjm", "cjm-etl"]
+    assert "0 2 * * * backup /opt/etl.sh" in (directory / "cjm-etl").read_text()
+
+    untouched = (directory / "cjm").stat().st_mtime_ns
+    os.utime(directory / "cjm", ns=(untouched - 10**9, untouched - 10**9))
+    executor.remove(etl)
+    assert sorted(os.listdir(directory)) == ["cjm"]
+    assert (directory / "cjm").stat().st_mtime_ns == untouched - 10**9
+
+    reloaded = make_executor(tmp_path, DropInBackend(str(directory), "cjm", "backup"))
+    assert [job["id"] for job in reloaded.list_all()] == [plain]
+
+
+def test_drop_in_rollback_restores_files(tmp_path):
+    """Rolling back should recreate removed drop-ins."""
+    directory = tmp_path / "cron.d"
+    executor = make_executor(tmp_path, DropInBackend(str(directory), "cjm", "root"))
+    etl = executor.add("0 2 * * *", "/opt/etl.sh", comment="etl")
+    executor.add("@hourly", "/bin/true", comment="web")
+    executor.remove_many([etl])
+    assert sorted(os.listdir(directory)) == ["cjm-web"]
+
+    executor.rollback(3)
+    assert sorted(os.listdir(directory)) == ["cjm-etl", "cjm-web"]
+    assert len(make_executor(tmp_path, DropInBackend(str(directory), "cjm", "root")).list_all()) == 2
+
+
+def test_runner_jobs_pin_their_backend(tmp_path):
+    """A backend chosen only on the command line must be written into the --run line."""
+    path = tmp_path / "jobs.tab"
+    config = {"storage": {"backend": "tabfile", "tabfile": str(path)}, "state": {"dir": str(tmp_path / "state")}}
+    manager = JobManager(logging.getLogger("test_backends"), config)
+    manager.add_job("0 1 * * *", "/bin/true", capture=True)
+    manager.add_job(None, "/bin/true", after=[manager.executor.list_all()[0]["id"]])
+
+    assert len(manager.executor.list_all()) == 2
+    for job in manager.executor.list_all():
+        options = parse_runner_command(job["command"])
+        assert (options.backend, options.tabfile) == ("tabfile", str(path))
+    assert DropInBackend(str(tmp_path), "cjm", "root").cli_options() == {"--backend": "cron_d"}
+    assert MemoryBackend().cli_options() == {}
@@ -0,0 +1,175 @@
+"""
+Purpose: Unit tests for the calendar index behind time-window queries.
+
+Covers:
+- Agreement with brute-force fire-time enumeration on random schedules and windows
+- Incremental add/remove, persistence and crontab sync
+- Cheap loads and incremental updates on large job sets
+- Persisted inverted rows, updated in place for just the positions a job touches
+- Time zones and DST transitions
+- Windows mixing naive and offset-aware bounds
+"""
+
+import logging
+import random
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from script.calendar_index import CalendarIndex, weekly_mask
+from script.job import JobManager
+from script.schedule import CronSchedule
+
+SCHEDULES = [
+    "*/15 * * * *", "0 2 * * *", "30 1 * * 6", "0 3 1 * *", "0 4 * * 1-5",
+    "5 0 13 * 5", "0 0 1 1 *", "@hourly", "@weekly", "45 23 * 2 *", "0 12 */10 * 0",
+]
+
+
+def make_config(tmp_path, tz="UTC"):
+    """Build a config dict with state in tmp_path."""
+    return {"state": {"dir": str(tmp_path)}, "calendar": {"timezone": tz}}
+
+
+def brute_force(schedules, start, end):
+    """Jobs with a fire time in [start, end), by enumeration (naive UTC times)."""
+    return sorted(
+        job_id for job_id, expression in schedules.items()
+        if next(CronSchedule(expression).iter_between(start - timedelta(microseconds=1), end), None)
+    )
+
+
+def test_matches_brute_force(tmp_path):
+    """Random windows should return exactly the jobs that really fire in them."""
+    index = CalendarIndex(make_config(tmp_path))
+    schedules = {f"job{i}": expression for i, expression in enumerate(SCHEDULES)}
+    for job_id, expression in schedules.items():
+        index.add(job_id, expression)
+
+    rng = random.Random(7)
+    base = datetime(2024, 1, 1)
+    for _ in range(300):
+        start = base + timedelta(minutes=rng.randrange(366 * 1440), seconds=rng.choice([0, 30]))
+        end = start + timedelta(minutes=rng.choice([1, 10, 59, 60, 61, 180, 1440, 3000, 12000]))
+        found = index.query(start.replace(tzinfo=timezone.utc), end.replace(tzinfo=timezone.utc))
+        assert found == brute_force(schedules, start, end), (start, end)
+
+
+def test_weekly_mask_marks_calendar_dependent_schedules():
+    """Only schedules that depend on the day of month or month need calendar checks."""
+    assert weekly_mask(CronSchedule("0 4 * * 1-5"))[1] is True
+    assert weekly_mask(CronSchedule("0 3 1 * *"))[1] is False
+    assert weekly_mask(CronSchedule("0 3 * 6 *"))[1] is False
+    assert bin(weekly_mask(CronSchedule("*/15 * * * *"))[0]).count("1") == 7 * 24 * 4
+
+
+def test_incremental_updates_persist(tmp_path):
+    """Adds and removes should be saved and slots reused."""
+    config = make_config(tmp_path)
+    index = CalendarIndex(config)
+    index.add("a", "30 1 * * 6")
+    index.add("b", "0 2 * * 6")
+    index.remove("a")
+    index.add("c", "0 3 * * 6")
+    index.save()
+
+    reloaded = CalendarIndex(config)
+    window = (datetime(2024, 6, 1, 1, 0, tzinfo=timezone.utc), datetime(2024, 6, 1, 4, 0, tzinfo=timezone.utc))
+    assert reloaded.query(*window) == ["b", "c"]
+    assert len(reloaded.slots) == 2
+
+
+def test_updates_after_queries(tmp_path):
+    """Cached bitsets must not survive an add or remove."""
+    index = CalendarIndex(make_config(tmp_path))
+    window = (datetime(2024, 6, 1, 1, 0, tzinfo=timezone.utc), datetime(2024, 6, 1, 4, 0, tzinfo=timezone.utc))
+    index.add("a", "30 1 * * 6")
+    assert index.query(*window) == ["a"]
+    index.add("b", "0 2 * * 6")
+    index.remove("a")
+    assert index.query(*window) == ["b"]
+
+
+def test_large_index_loads_and_updates_quickly(tmp_path):
+    """With 2,000 dense jobs, loading plus one incremental add should take well under a second."""
+    config = make_config(tmp_path)
+    index = CalendarIndex(config)
+    for i in range(2000):
+        index.add(f"job{i}", f"*/{1 + i % 10} * * * *")
+    index.save()
+
+    began = time.monotonic()
+    reloaded = CalendarIndex(config)
+    reloaded.add("late", "0 2 * * *")
+    reloaded.save()
+    assert time.monotonic() - began < 1
+    window = (datetime(2024, 6, 3, 1, 59, tzinfo=timezone.utc), datetime(2024, 6, 3, 2, 0, tzinfo=timezone.utc))
+    assert "late" not in reloaded.query(*window)
+    assert len(CalendarIndex(config).query(window[0], window[1] + timedelta(minutes=1))) == 2001
+
+
+def test_rows_are_persisted_and_updated_in_place(tmp_path):
+    """Reopened indexes read the stored rows; an update rewrites only the rows of its job."""
+    config = make_config(tmp_path)
+    index = CalendarIndex(config)
+    index.add("daily", "0 2 * * *")
+    index.add("often", "*/30 * * * *")
+    index.save()
+
+    reloaded = CalendarIndex(config)
+    monday_two = 1440 + 120
+    daily, often = (1 << reloaded.jobs[job_id]["slot"] for job_id in ("daily", "often"))
+    assert reloaded.minute_bits(monday_two) == daily | often
+    assert reloaded.hour_bits(monday_two // 60 + 1) == often
+    reloaded.remove("daily")
+    assert {kind: len(positions) for kind, positions in reloaded._dirty_rows.items()} == {"minute": 7, "hour": 7}
+    reloaded.save()
+    assert CalendarIndex(config).minute_bits(monday_two) == often
+
+
+def test_sync_only_touches_differences(tmp_path):
+    """Sync should add new, drop stale and skip disabled or @reboot jobs."""
+    index = CalendarIndex(make_config(tmp_path))
+    index.add("stale", "0 1 * * *")
+    index.add("same", "0 2 * * *")
+    jobs = [
+        {"id": "same", "schedule": "0 2 * * *", "enabled": True},
+        {"id": "new", "schedule": "0 3 * * *", "enabled": True},
+        {"id": "downstream", "schedule": "@reboot", "enabled": False},
+    ]
+    assert index.sync(jobs) is True
+    assert sorted(index.jobs) == ["new", "same"]
+    assert index.sync(jobs) is False
+
+
+def test_dst_transitions(tmp_path):
+    """Windows should be evaluated in local wall-clock time across DST changes."""
+    pytest.importorskip("zoneinfo")
+    index = CalendarIndex(make_config(tmp_path, tz="Europe/Berlin"))
+    index.add("gap", "30 2 * * *")
+    index.add("three", "0 3 * * *")
+
+    # 2024-03-31 02:00 CET jumps to 03:00 CEST (01:00 UTC); 02:30 runs at the jump
+    spring = datetime(2024, 3, 31, 1, 0, tzinfo=timezone.utc)
+    assert index.query(spring, spring + timedelta(minutes=1)) == ["gap", "three"]
+    assert index.query(spring - timedelta(hours=1), spring) == []
+
+    # 2024-10-27 03:00 CEST falls back to 02:00 CET; 02:30 local occurs twice
+    assert index.query(datetime(2024, 10, 27, 0, 15, tzinfo=timezone.utc),
+                       datetime(2024, 10, 27, 0, 45, tzinfo=timezone.utc)) == ["gap"]
+    assert index.query(datetime(2024, 10, 27, 1, 15, tzinfo=timezone.utc),
+                       datetime(2024, 10, 27, 1, 45, tzinfo=timezone.utc)) == ["gap"]
+    # Naive bounds are local time
+    assert index.query(datetime(2024, 7, 1, 2, 59), datetime(2024, 7, 1, 3, 1)) == ["three"]
+
+
+def test_window_with_mixed_offsets(tmp_path):
+    """A window may mix a UTC bound with a naive (index-local) one."""
+    config = {**make_config(tmp_path, tz="Europe/Berlin"), "storage": {"backend": "memory"}}
+    manager = JobManager(logging.getLogger("test_calendar_index"), config)
+    manager.executor.add("0 3 * * *", "/bin/true", job_id="three")
+
+    # 01:00Z is 03:00 in Berlin (CEST)
+    found = manager.jobs_in_window(datetime(2024, 6, 1, 1, 0, tzinfo=timezone.utc), datetime(2024, 6, 1, 3, 30))
+    assert [job["id"] for job in found] == ["three"]
+    with pytest.raises(ValueError, match="after its start"):
+        manager.jobs_in_window(datetime(2024, 6, 1, 2, 0, tzinfo=timezone.utc), datetime(2024, 6, 1, 3, 30))
@@ -0,0 +1,135 @@
+"""
+Purpose: Unit tests for missed-run catch-up.
+
+Covers:
+- Planning missed runs from recorded last runs and schedules
+- Per-job policies (once, all, skip) and the max_runs cap
+- Concurrency cap when running the plan, shared with the downstream jobs it releases
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+import pytest
+from script.catchup import CatchUp
+from script.job import JobManager
+from script.runner import wrap_command
+from script.state import RunStore
+
+NOW = datetime(2026, 3, 10, 9, 30, 20)
+
+
+def make_catchup(tmp_path, **settings):
+    """Create a CatchUp instance with state in tmp_path."""
+    config = {"state": {"dir": str(tmp_path)}, "catchup": settings}
+    return CatchUp(logging.getLogger("test_catchup"), config), RunStore(config)
+
+
+def make_job(job_id, schedule, policy=None, enabled=True):
+    """Build a managed job entry as returned by CronExecutor.list_all()."""
+    options = {"--catch-up-policy": policy} if policy else None
+    return {"id": job_id, "schedule": schedule, "command": wrap_command(job_id, "true", options),
+            "enabled": enabled}
+
+
+def record_start(store, job_id, started):
+    """Record a run that started at `started`."""
+    store.record({"job_id": job_id, "returncode": 0, "started_at": started.timestamp()})
+
+
+def test_plan_counts_missed_runs_and_applies_policies(tmp_path):
+    """Missed fire times should be counted per job and mapped through its policy."""
+    catchup, store = make_catchup(tmp_path, max_runs=5)
+    jobs = [
+        make_job("hourly", "0 * * * *", "all"),
+        make_job("daily", "0 2 * * *"),
+        make_job("skipped", "*/10 * * * *", "skip"),
+        make_job("fresh", "0 9 * * *"),
+        make_job("never", "0 * * * *"),
+        make_job("disabled", "0 * * * *", enabled=False),
+        {"id": "plain", "schedule": "0 * * * *", "command": "/bin/true", "enabled": True},
+    ]
+    for job_id in ("hourly", "daily", "skipped", "disabled", "plain"):
+        record_start(store, job_id, datetime(2026, 3, 7, 23, 0, 1))
+    record_start(store, "fresh", datetime(2026, 3, 10, 9, 0, 2))
+
+    plan = {entry["id"]: entry for entry in catchup.plan(jobs, now=NOW)}
+
+    assert set(plan) == {"hourly", "daily", "skipped"}
+    assert plan["hourly"]["missed"] == 58
+    assert plan["hourly"]["runs"] == 5
+    assert plan["hourly"]["last_missed"] == datetime(2026, 3, 10, 9, 0)
+    assert plan["hourly"]["fire_times"] == [datetime(2026, 3, 10, hour, 0) for hour in range(5, 10)]
+    assert plan["daily"]["fire_times"] == [datetime(2026, 3, 10, 2, 0)]
+    assert plan["skipped"]["fire_times"] == []
+    assert (plan["daily"]["missed"], plan["daily"]["runs"], plan["daily"]["policy"]) == (3, 1, "once")
+    assert plan["skipped"]["runs"] == 0
+
+
+def test_current_minute_is_not_missed(tmp_path):
+    """A fire time in the current minute belongs to cron, not to catch-up."""
+    catchup, store = make_catchup(tmp_path)
+    record_start(store, "job", datetime(2026, 3, 10, 9, 29, 0))
+    assert catchup.plan([make_job("job", "* * * * *")], now=NOW) == []
+
+
+def test_run_respects_concurrency_cap(tmp_path):
+    """No more than max_parallel jobs should run at once."""
+    catchup, _ = make_catchup(tmp_path)
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+    calls = []
+
+    def launch(job_id, fire_time):
+        with lock:
+            calls.append((job_id, fire_time))
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+        return 0
+
+    plan = [{"id": f"job{i}", "missed": 2, "runs": 2, "fire_times": [NOW, NOW]} for i in range(6)]
+    plan.append({"id": "skip", "missed": 4, "runs": 0, "fire_times": []})
+    results = catchup.run(plan, launch, max_parallel=2)
+
+    assert state["peak"] == 2
+    assert len(calls) == 12
+    assert results["job0"] == [0, 0]
+    assert "skip" not in results
+
+
+def test_downstream_runs_share_the_cap(tmp_path):
+    """Fan-out downstream jobs released by catch-up runs must stay within max_parallel."""
+    config = {"storage": {"backend": "memory"}, "state": {"dir": str(tmp_path)}, "catchup": {"max_parallel": 2},
+              "dag": {"max_parallel": 8}}
+    manager = JobManager(logging.getLogger("test_catchup"), config)
+    store = RunStore(config)
+    for upstream in ("up1", "up2"):
+        manager.executor.add("0 * * * *", wrap_command(upstream, "true"), job_id=upstream)
+        record_start(store, upstream, datetime.now() - timedelta(hours=3))
+        for i in range(4):
+            child = f"{upstream}-child{i}"
+            manager.executor.add("@reboot", wrap_command(child, "true"), job_id=child, enabled=False)
+            manager.graph.add(child, [upstream])
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0, "runs": 0}
+
+    def run_managed_job(job_id, fire_time=None, immediate=False):
+        with lock:
+            state["active"] += 1
+            state["runs"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        started = time.time()
+        time.sleep(0.05)
+        with lock:
+            state["active"] -= 1
+        store.record({"job_id": job_id, "returncode": 0, "started_at": started, "finished_at": time.time()})
+        return 0
+
+    manager.run_managed_job = run_managed_job
+    manager.catch_up()
+    assert state["runs"] == 10
+    assert state["peak"] == 2
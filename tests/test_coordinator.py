@@ -0,0 +1,210 @@
+"""
+Purpose: Unit tests for sharded execution.
+
+Covers:
+- Even spread of jobs over the hash ring and minimal moves when a host joins
+- Exactly-once leases with several hosts competing (memory and SQLite stores)
+- Lease expiry, completion and pruning
+- Owner claims, failover by other hosts, and failover disabled
+- Lease keys taken from the job's schedule rather than the start time
+- Catch-up replays and triggered downstream runs going through the same leases
+- Catch-up skipping runs made elsewhere or too old, with one failover wait per plan
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+import pytest
+from script.coordinator import Coordinator, HashRing, MemoryLeaseStore, SQLiteLeaseStore
+from script.job import JobManager
+from script.runner import wrap_command
+from script.state import RunStore
+
+FIRE = datetime(2024, 6, 3, 2, 0)
+JOBS = [str(uuid.uuid4()) for _ in range(3000)]
+
+
+def coordinator(host, store, hosts=("a", "b", "c"), failover_after=0):
+    """Build a coordinator acting as `host`."""
+    config = {"sharding": {"enabled": True, "hosts": list(hosts), "host": host, "failover_after": failover_after}}
+    return Coordinator(logging.getLogger("test_coordinator"), config, store=store)
+
+
+def test_ring_spreads_jobs_evenly():
+    """Each of four hosts should get close to a quarter of the jobs."""
+    ring = HashRing(["a", "b", "c", "d"], replicas=128)
+    counts = Counter(ring.owner(job_id) for job_id in JOBS)
+    assert set(counts) == {"a", "b", "c", "d"}
+    assert max(counts.values()) < len(JOBS) / 4 * 1.3
+
+
+def test_adding_a_host_moves_few_jobs():
+    """A fifth host should take about a fifth of the jobs, all from the others."""
+    before = HashRing(["a", "b", "c", "d"])
+    after = HashRing(["a", "b", "c", "d", "e"])
+    moved = [job_id for job_id in JOBS if before.owner(job_id) != after.owner(job_id)]
+    assert all(after.owner(job_id) == "e" for job_id in moved)
+    assert len(moved) < len(JOBS) * 0.3
+    assert HashRing([]).owner(JOBS[0]) is None
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_exactly_one_host_gets_each_lease(tmp_path, kind):
+    """Hosts racing for the same runs should each run get exactly one winner."""
+    store = MemoryLeaseStore() if kind == "memory" else SQLiteLeaseStore(str(tmp_path / "leases.db"))
+    winners = []
+    lock = threading.Lock()
+
+    def host(name):
+        for job_id in JOBS[:50]:
+            if store.acquire(job_id, "2024-06-03T02:00", name, 60):
+                with lock:
+                    winners.append(job_id)
+
+    threads = [threading.Thread(target=host, args=(f"host{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(winners) == sorted(JOBS[:50])
+
+
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+def test_lease_expiry_and_completion(tmp_path, kind):
+    """Unfinished leases expire; finished ones are never granted again."""
+    store = MemoryLeaseStore() if kind == "memory" else SQLiteLeaseStore(str(tmp_path / "leases.db"))
+    assert store.acquire("job", "t1", "a", -1)
+    assert store.acquire("job", "t1", "b", 60)
+    assert store.holder("job", "t1") == "b"
+    assert not store.acquire("job", "t1", "a", 60)
+
+    store.complete("job", "t1", "b", 0)
+    assert not store.acquire("job", "t1", "b", 60)
+    assert store.acquire("job", "t2", "a", 60)
+
+    store.prune(time.time() + 120)
+    assert store.holder("job", "t1") is None
+
+
+def sharded_manager(tmp_path, host):
+    """Build a JobManager acting as `host`, with its own state but the shared lease store."""
+    config = {
+        "storage": {"backend": "memory"},
+        "state": {"dir": str(tmp_path / host)},
+        "runner": {"log_dir": str(tmp_path / host / "jobs")},
+        "sharding": {"enabled": True, "hosts": ["a", "b"], "host": host, "failover_after": 0,
+                     "store": str(tmp_path / "leases.db")},
+    }
+    return JobManager(logging.getLogger("test_coordinator"), config)
+
+
+def test_owner_runs_and_others_fail_over():
+    """The owner claims right away; another host only runs a run nobody claimed."""
+    store = MemoryLeaseStore()
+    hosts = {name: coordinator(name, store) for name in ("a", "b", "c")}
+    job_id = JOBS[0]
+    owner = hosts["a"].owner(job_id)
+    other = next(name for name in hosts if name != owner)
+    waits = []
+
+    assert hosts[owner].claim(job_id, FIRE)
+    assert not hosts[other].claim(job_id, FIRE, sleep=waits.append)
+    assert waits == [0.0]
+
+    # Owner down for the next fire time: another host takes it
+    later = FIRE.replace(minute=5)
+    assert hosts[other].claim(job_id, later, sleep=waits.append)
+    hosts[other].complete(job_id, later, 0)
+    assert not hosts[owner].claim(job_id, later)
+
+
+def test_failover_disabled():
+    """With failover_after null, non-owners never run a job."""
+    store = MemoryLeaseStore()
+    job_id = JOBS[1]
+    owner = HashRing(["a", "b"]).owner(job_id)
+    other = "b" if owner == "a" else "a"
+    assert not coordinator(other, store, hosts=("a", "b"), failover_after=None).claim(job_id, FIRE)
+    assert store.holder(job_id, "2024-06-03T02:00") is None
+    assert coordinator(owner, store, hosts=("a", "b"), failover_after=None).claim(job_id, FIRE)
+
+
+def test_default_store_lives_in_state_dir(tmp_path):
+    """Without a configured store the lease database goes into the state directory."""
+    config = {"state": {"dir": str(tmp_path)}, "sharding": {"host": "solo"}}
+    solo = Coordinator(logging.getLogger("test_coordinator"), config)
+    assert solo.owner(JOBS[2]) == "solo"
+    assert solo.claim(JOBS[2], FIRE)
+    assert (tmp_path / "leases.db").exists()
+
+
+def test_lease_key_is_the_scheduled_fire_time(tmp_path):
+    """Hosts starting a run on either side of a minute boundary should agree on its fire time."""
+    manager = JobManager(logging.getLogger("test_coordinator"),
+                         {"storage": {"backend": "memory"}, "state": {"dir": str(tmp_path)}})
+    manager.executor.add("*/5 * * * *", "/bin/true", job_id="five")
+    manager.executor.add("@reboot", "/bin/true", job_id="boot")
+    assert manager._fire_time("five", datetime(2024, 6, 3, 2, 5, 59)) == datetime(2024, 6, 3, 2, 5)
+    assert manager._fire_time("five", datetime(2024, 6, 3, 2, 6, 1)) == datetime(2024, 6, 3, 2, 5)
+    assert manager._fire_time("boot", datetime(2024, 6, 3, 2, 6, 1)) == datetime(2024, 6, 3, 2, 6)
+    assert manager._fire_time("missing", datetime(2024, 6, 3, 2, 6, 1)) == datetime(2024, 6, 3, 2, 6)
+
+
+def test_triggered_runs_are_claimed_right_away():
+    """A run triggered on a non-owner (e.g. by its upstream) should not wait for the owner."""
+    store = MemoryLeaseStore()
+    job_id = JOBS[3]
+    other = "b" if HashRing(["a", "b"]).owner(job_id) == "a" else "a"
+    waits = []
+    assert coordinator(other, store, hosts=("a", "b"), failover_after=None).claim(
+        job_id, FIRE, sleep=waits.append, immediate=True)
+    assert waits == []
+
+
+def test_catch_up_replays_each_missed_run_once(tmp_path):
+    """Every host of the ring catches up, but each missed fire time runs on one host only."""
+    job_id = JOBS[4]
+    last_start = (datetime.now() - timedelta(hours=3)).timestamp()
+    managers = [sharded_manager(tmp_path, host) for host in ("a", "b")]
+    for manager in managers:
+        manager.executor.add("0 * * * *", wrap_command(job_id, "/bin/true", {"--catch-up-policy": "all"}),
+                             job_id=job_id)
+        RunStore(manager.config).record({"job_id": job_id, "returncode": 0, "started_at": last_start})
+
+    plans = [manager.catch_up() for manager in managers]
+    runs = [len(RunStore(manager.config).history(job_id)) - 1 for manager in managers]
+    assert sum(runs) == plans[0][0]["runs"] >= 2
+    assert plans[1] == []
+
+
+def test_catch_up_skips_runs_made_elsewhere():
+    """Fire times with a lease or older than keep_days are dropped; owners get one head start."""
+    store = MemoryLeaseStore()
+    ring = HashRing(["a", "b"])
+    mine = next(job_id for job_id in JOBS if ring.owner(job_id) == "a")
+    foreign = [job_id for job_id in JOBS if ring.owner(job_id) == "b"][:100]
+    now = datetime(2024, 6, 10, 12, 0)
+    hours = [now - timedelta(hours=hour) for hour in (240, 3, 2, 1)]
+    plan = [{"id": job_id, "policy": "all", "missed": 4, "runs": 4, "fire_times": hours}
+            for job_id in [mine] + foreign]
+    plan.append({"id": JOBS[5], "policy": "skip", "missed": 4, "runs": 0, "fire_times": []})
+    owner_b = coordinator("b", store, hosts=("a", "b"))
+    for job_id in foreign[1:]:
+        for fire_time in hours[1:]:
+            assert owner_b.claim(job_id, fire_time)
+    assert owner_b.claim(mine, hours[2], immediate=True)
+
+    waits = []
+    filtered = coordinator("a", store, hosts=("a", "b"), failover_after=60).filter_catch_up(
+        plan, now=now, sleep=waits.append)
+    assert waits == [60.0]
+    assert [(entry["id"], entry["fire_times"], entry["runs"]) for entry in filtered[:2]] == [
+        (mine, [hours[1], hours[3]], 2), (foreign[0], hours[1:], 3)]
+    assert [entry["id"] for entry in filtered[2:]] == [JOBS[5]]
+
+    # Without failover other hosts' jobs are never caught up here
+    filtered = coordinator("a", store, hosts=("a", "b"), failover_after=None).filter_catch_up(plan, now=now)
+    assert [entry["id"] for entry in filtered] == [mine, JOBS[5]]
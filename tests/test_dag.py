@@ -0,0 +1,126 @@
+"""
+Purpose: Unit tests for job dependency chains (DAG).
+
+Covers:
+- JobGraph add/remove, persistence, unknown upstreams and cycle rejection
+- DownstreamRunner readiness, parallel branches and failure propagation
+"""
+
+import logging
+import threading
+import time
+import pytest
+from script.dag import DownstreamRunner, JobGraph
+from script.state import RunStore
+
+
+def make_config(tmp_path):
+    """Build a config dict with state in tmp_path."""
+    return {"state": {"dir": str(tmp_path)}, "dag": {"max_parallel": 4}}
+
+
+def test_graph_persists_and_reports_relations(tmp_path):
+    """Dependencies should survive a reload."""
+    config = make_config(tmp_path)
+    graph = JobGraph(config)
+    graph.add("b", ["a"])
+    graph.add("c", ["a", "b"])
+    graph.save()
+
+    reloaded = JobGraph(config)
+    assert reloaded.parents("c") == ["a", "b"]
+    assert reloaded.children("a") == ["b", "c"]
+    assert reloaded.ancestors("c") == {"a", "b"}
+
+
+def test_graph_rejects_cycles_and_unknown_upstreams(tmp_path):
+    """Cycles and unknown upstreams should raise ValueError."""
+    graph = JobGraph(make_config(tmp_path))
+    graph.add("b", ["a"])
+    graph.add("c", ["b"])
+    with pytest.raises(ValueError):
+        graph.add("a", ["c"])
+    with pytest.raises(ValueError):
+        graph.add("a", ["a"])
+    with pytest.raises(ValueError):
+        graph.add("d", ["missing"], known_jobs=["a", "b", "c"])
+
+
+def test_graph_remove_reports_orphans(tmp_path):
+    """Removing an upstream should drop its edges and report orphaned children."""
+    graph = JobGraph(make_config(tmp_path))
+    graph.add("b", ["a"])
+    graph.add("c", ["a", "b"])
+    assert graph.remove("a") == ["b"]
+    assert graph.parents("c") == ["b"]
+
+
+class FakeLauncher:
+    """Records runs in the RunStore like the real runner would."""
+
+    def __init__(self, store, failing=(), duration=0.2):
+        self.store = store
+        self.failing = set(failing)
+        self.duration = duration
+        self.calls = []
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, job_id):
+        started = time.time()
+        with self.lock:
+            self.calls.append(job_id)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.duration)
+        with self.lock:
+            self.active -= 1
+        returncode = 1 if job_id in self.failing else 0
+        self.store.record({"job_id": job_id, "returncode": returncode,
+                           "started_at": started, "finished_at": time.time()})
+        return returncode
+
+
+def diamond(tmp_path):
+    """a -> (b, c) -> d, with `a` having just succeeded."""
+    config = make_config(tmp_path)
+    graph = JobGraph(config)
+    graph.add("b", ["a"])
+    graph.add("c", ["a"])
+    graph.add("d", ["b", "c"])
+    store = RunStore(config)
+    store.record({"job_id": "a", "returncode": 0, "started_at": time.time() - 1, "finished_at": time.time()})
+    return config, graph, store
+
+
+def test_downstream_runs_branches_in_parallel(tmp_path):
+    """Independent branches should overlap and the join should run once."""
+    config, graph, store = diamond(tmp_path)
+    launcher = FakeLauncher(store)
+    results = DownstreamRunner(logging.getLogger("test_dag"), config, graph, store).run_after("a", launcher)
+
+    assert results == {"b": 0, "c": 0, "d": 0}
+    assert launcher.calls[-1] == "d"
+    assert launcher.calls.count("d") == 1
+    assert launcher.peak == 2
+
+
+def test_failed_branch_blocks_join(tmp_path):
+    """A downstream job should not run if one of its upstreams failed."""
+    config, graph, store = diamond(tmp_path)
+    launcher = FakeLauncher(store, failing={"c"}, duration=0.01)
+    results = DownstreamRunner(logging.getLogger("test_dag"), config, graph, store).run_after("a", launcher)
+
+    assert results == {"b": 0, "c": 1}
+    assert "d" not in launcher.calls
+
+
+def test_downstream_not_rerun_without_new_upstream_success(tmp_path):
+    """A second trigger without a fresh upstream success should not rerun children."""
+    config, graph, store = diamond(tmp_path)
+    runner = DownstreamRunner(logging.getLogger("test_dag"), config, graph, store)
+    launcher = FakeLauncher(store, duration=0.01)
+    runner.run_after("a", launcher)
+    assert runner.run_after("a", launcher) == {}
+    assert len(launcher.calls) == 3
@@ -0,0 +1,108 @@
+"""
+Purpose: Unit tests for duplicate job detection.
+
+Covers:
+- Command normalization (runner wrapper, quoting, whitespace) that keeps shell meaning
+- Grouping of equivalent schedules and commands
+- Jobs that differ in run options (including the profile-selecting tag), enabled
+  state or upstreams are kept apart
+- Applying removes duplicates with one crontab write and one calendar index save
+"""
+
+import logging
+import pytest
+from script.calendar_index import CalendarIndex
+from script.dedupe import find_duplicates, normalize_command
+from script.job import JobManager
+from script.runner import wrap_command
+
+
+def job(job_id, schedule, command, enabled=True):
+    """Build a job dict like CronExecutor.list_all() returns."""
+    return {"id": job_id, "schedule": schedule, "command": command, "enabled": enabled}
+
+
+def test_normalize_command():
+    """Wrapper, quoting and whitespace differences should not matter."""
+    assert normalize_command("/bin/echo  'hi'") == normalize_command("/bin/echo hi")
+    assert normalize_command(wrap_command("abc", "/bin/echo hi")) == "/bin/echo hi"
+    assert normalize_command("echo 'unbalanced  ") == "echo 'unbalanced"
+
+
+@pytest.mark.parametrize("first,second", [
+    ("echo a;b", "echo 'a;b'"),
+    ('echo "$HOME"', "echo '$HOME'"),
+    ("ls > out", "ls '>' out"),
+    ("echo *", "echo '*'"),
+    ("FOO=bar env", "'FOO=bar' env"),
+    ("if true; then x; fi", "'if' true; then x; fi"),
+    ('echo "a  b"', 'echo "a b"'),
+    ("echo a\\  b", "echo a\\ b"),
+    ("echo 'a%b'", "echo a%b"),
+])
+def test_normalize_command_keeps_shell_meaning(first, second):
+    """Commands the shell treats differently must not normalize to the same string."""
+    assert normalize_command(first) != normalize_command(second)
+
+
+def test_normalize_command_equates_plain_words():
+    """Quoting style of plain words and unquoted whitespace should not matter."""
+    assert normalize_command('cp  "a b"   /tmp/x') == normalize_command("cp 'a b' /tmp/x")
+    assert normalize_command('echo "ab" \'c\'') == normalize_command("echo ab c")
+
+
+def test_shell_differences_are_not_duplicates():
+    """--dedupe must not group commands that only look alike."""
+    jobs = [job("a", "@hourly", "echo a;b"), job("b", "@hourly", "echo 'a;b'")]
+    assert find_duplicates(jobs) == []
+
+
+def test_starred_day_field_is_not_a_duplicate():
+    """'*/31' keeps AND semantics of the day fields, unlike a plain '1'."""
+    jobs = [job("a", "0 0 */31 * 1", "/bin/x"), job("b", "0 0 1 * 1", "/bin/x")]
+    assert find_duplicates(jobs) == []
+
+
+def test_groups_equivalent_jobs_keeping_the_first():
+    """Equivalent schedules and commands should form one group, in crontab order."""
+    jobs = [
+        job("a", "*/15 * * * *", "/bin/backup.sh"),
+        job("b", "@daily", "/bin/report.sh"),
+        job("c", "0,15,30,45 * * * *", "/bin/backup.sh  "),
+        job("d", "0 0 * * *", "/bin/report.sh"),
+        job("e", "0 0 * * *", "/bin/other.sh"),
+    ]
+    groups = find_duplicates(jobs)
+    assert [[entry["id"] for entry in group] for group in groups] == [["a", "c"], ["b", "d"]]
+
+
+def test_different_options_are_not_duplicates():
+    """Run options, tags (they select resource profiles), enabled state and upstreams are part of the key."""
+    jobs = [
+        job("a", "@hourly", wrap_command("a", "/bin/x", {"--timeout": 60})),
+        job("b", "@hourly", wrap_command("b", "/bin/x", {"--timeout": 30})),
+        job("c", "@hourly", wrap_command("c", "/bin/x", {"--timeout": 60})),
+        job("g", "@hourly", wrap_command("g", "/bin/x", {"--timeout": 60, "--tag": "heavy"})),
+        job("d", "@reboot", wrap_command("d", "/bin/y"), enabled=False),
+        job("e", "@reboot", wrap_command("e", "/bin/y"), enabled=False),
+        job("f", "@hourly", "/bin/x", enabled=False),
+    ]
+    groups = find_duplicates(jobs, parents={"d": ["a"], "e": ["b"]})
+    assert [[entry["id"] for entry in group] for group in groups] == [["a", "c"]]
+
+
+def test_apply_updates_the_calendar_once(tmp_path, monkeypatch):
+    """Removing many duplicates should load and save the calendar index once."""
+    manager = JobManager(logging.getLogger("test_dedupe"),
+                         {"storage": {"backend": "memory"}, "state": {"dir": str(tmp_path)}})
+    for i in range(20):
+        manager.executor.add("0 2 * * *", "/bin/backup", job_id=f"job{i}")
+    index = CalendarIndex(manager.config)
+    index.sync(manager.executor.list_all())
+    index.save()
+    saves = []
+    monkeypatch.setattr(CalendarIndex, "save", lambda index: saves.append(sorted(index.jobs)))
+
+    manager.dedupe(apply=True)
+    assert [job["id"] for job in manager.executor.list_all()] == ["job0"]
+    assert saves == [["job0"]]
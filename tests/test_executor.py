@@ -7,100 +7,74 @@ Covers:
 - remove
 
 Strategy:
-- Mock python-crontab CronTab object
+- Run against the in-memory and tabfile storage backends (no system crontab, no mocks)
 - Verify correct job creation, listing, and removal
-- Ensure error handling (PermissionError, CronTabError, ValueError)
+- Ensure error handling (PermissionError, ValueError)
 """
 
+import logging
 import pytest
-from unittest.mock import MagicMock, patch
+from script.backends import MemoryBackend, TabfileBackend
 from script.executor import CronExecutor
-from crontab import CronTab
+
+
+class ReadOnlyBackend(MemoryBackend):
+    """In-memory backend whose writes fail like an unwritable crontab."""
+
+    def write(self, table):
+        raise PermissionError("No permission")
 
 
 class TestCronExecutor:
     """Unit tests for Executor methods."""
 
-    @patch("core.executor.CronTab")
-    def test_add_job_success(self, mock_crontab):
-        """Should add a job and return UUID successfully."""
-        mock_cron = MagicMock()
-        mock_crontab.return_value = mock_cron
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Config with state (version history) under tmp_path."""
+        return {"state": {"dir": str(tmp_path / "state")}}
 
-        # Mock job object
-        mock_job = MagicMock()
-        mock_cron.new.return_value = mock_job
+    def executor(self, config, backend):
+        return CronExecutor(logging.getLogger("test_executor"), config, backend)
 
-        executor = CronExecutor(logger=MagicMock())
-        job_id = executor.add("0 * * * *", "echo 'hello'")
+    def test_add_job_success(self, config, tmp_path):
+        """Should add a job, write it to the tabfile and return its UUID."""
+        path = tmp_path / "jobs.tab"
+        job_id = self.executor(config, TabfileBackend(str(path))).add("30 * * * *", "echo 'hello'")
 
         assert job_id is not None
-        mock_cron.new.assert_called_once_with(command="echo 'hello'")
-        mock_job.setall.assert_called_once_with("0 * * * *")
-        mock_cron.write.assert_called_once()
+        assert f"30 * * * * echo 'hello' # cron_job_script_{job_id}" in path.read_text()
 
-    @patch("core.executor.CronTab")
-    def test_add_job_permission_error(self, mock_crontab):
+    def test_add_job_permission_error(self, config):
         """Should raise PermissionError when crontab write fails."""
-        mock_cron = MagicMock()
-        mock_crontab.return_value = mock_cron
-        mock_cron.new.side_effect = PermissionError("No permission")
-
-        executor = CronExecutor(logger=MagicMock())
+        executor = self.executor(config, ReadOnlyBackend())
         with pytest.raises(PermissionError):
             executor.add("0 * * * *", "echo 'fail'")
 
-    @patch("core.executor.CronTab")
-    def test_list_all_with_tagged_jobs(self, mock_crontab):
+    def test_list_all_with_tagged_jobs(self, config):
         """Should list only jobs containing unique tag."""
-        mock_cron = MagicMock()
-        mock_crontab.return_value = mock_cron
-
-        # Mock jobs
-        job1 = MagicMock()
-        job1.command = "echo 'job1'"
-        job1.slices = "0 * * * *"
-        job1.comment = "CRONJOB_SCRIPT:1234"
-
-        job2 = MagicMock()
-        job2.command = "echo 'job2'"
-        job2.slices = "*/5 * * * *"
-        job2.comment = ""
-
-        mock_cron.__iter__.return_value = [job1, job2]
-
-        executor = CronExecutor(logger=MagicMock())
-        jobs = executor.list_all()
+        backend = MemoryBackend(
+            "30 * * * * echo 'job1' # cron_job_script_1234 nightly\n"
+            "*/5 * * * * echo 'job2'\n"
+        )
+        jobs = self.executor(config, backend).list_all()
 
         assert len(jobs) == 1
         assert jobs[0]["command"] == "echo 'job1'"
+        assert (jobs[0]["id"], jobs[0]["tag"], jobs[0]["schedule"]) == ("1234", "nightly", "30 * * * *")
 
-    @patch("core.executor.CronTab")
-    def test_remove_job_success(self, mock_crontab):
+    def test_remove_job_success(self, config, tmp_path):
         """Should remove a job successfully when ID matches."""
-        mock_cron = MagicMock()
-        mock_crontab.return_value = mock_cron
-
-        # Mock job with matching ID
-        job = MagicMock()
-        job.comment = "CRONJOB_SCRIPT:abcd1234"
-        mock_cron.__iter__.return_value = [job]
+        path = tmp_path / "jobs.tab"
+        executor = self.executor(config, TabfileBackend(str(path)))
+        job_id = executor.add("0 * * * *", "echo 'bye'")
+        kept = executor.add("*/5 * * * *", "echo 'stay'")
 
-        executor = CronExecutor(logger=MagicMock())
-        result = executor.remove("abcd1234")
+        executor.remove(job_id)
+        assert [job["id"] for job in executor.list_all()] == [kept]
+        assert job_id not in path.read_text()
 
-        assert result is True
-        mock_cron.remove.assert_called_once_with(job)
-        mock_cron.write.assert_called_once()
-
-    @patch("core.executor.CronTab")
-    def test_remove_job_not_found(self, mock_crontab):
+    def test_remove_job_not_found(self, config):
         """Should raise ValueError if no job matches given ID."""
-        mock_cron = MagicMock()
-        mock_crontab.return_value = mock_cron
-        mock_cron.__iter__.return_value = []
-
-        executor = CronExecutor(logger=MagicMock())
+        executor = self.executor(config, MemoryBackend())
         with pytest.raises(ValueError):
             executor.remove("nonexistent")
-            
\ No newline at end of file
@@ -0,0 +1,118 @@
+"""
+Purpose: Unit tests for the crontab version history.
+
+Covers:
+- Delta round trips and reconstruction across snapshots
+- Recording of the initial crontab and external edits
+- Compaction keeping storage bounded
+- Rollback through CronExecutor in one write
+- Separate histories per backend and target; foreign versions are never restored
+"""
+
+import logging
+import os
+import shutil
+import pytest
+from script.backends import DropInBackend, MemoryBackend, TabfileBackend
+from script.executor import CronExecutor
+from script.history import CrontabHistory, apply_delta, make_delta
+
+
+def make_config(tmp_path, **history):
+    """Build a config dict with state in tmp_path."""
+    return {"state": {"dir": str(tmp_path)}, "history": history}
+
+
+def test_delta_round_trip():
+    """Applying a delta should reproduce the new content exactly."""
+    old = "a\nb\nc\nd\n"
+    new = "a\nB\nc\nd\ne"
+    assert apply_delta(old, make_delta(old, new)) == new
+    assert apply_delta("", make_delta("", new)) == new
+    assert apply_delta(new, make_delta(new, "")) == ""
+
+
+def test_versions_reconstruct_across_snapshots(tmp_path):
+    """Every version should be rebuilt from its snapshot and deltas."""
+    history = CrontabHistory(make_config(tmp_path, checkpoint_every=4))
+    states = [""]
+    for i in range(10):
+        states.append(states[-1] + f"{i} * * * * job{i}\n")
+        history.record(states[-2], states[-1], f"add job{i}")
+
+    versions = history.versions()
+    assert [entry["version"] for entry in versions] == list(range(1, 12))
+    assert versions[0]["action"] == "initial crontab"
+    assert versions[3]["added"] == 1 and versions[3]["removed"] == 0
+    for version, content in enumerate(states, start=1):
+        assert history.content(version) == content
+    with pytest.raises(ValueError):
+        history.content(99)
+
+
+def test_external_edits_and_no_op_writes(tmp_path):
+    """Changes made elsewhere should become their own version; unchanged writes none."""
+    history = CrontabHistory(make_config(tmp_path))
+    assert history.record("", "a\n", "add a") == 2
+    assert history.record("a\n", "a\n", "noop") is None
+    assert history.record("a\nmanual\n", "a\nmanual\nb\n", "add b") == 4
+    assert [entry["action"] for entry in history.versions()] == ["initial crontab", "add a", "external edit", "add b"]
+    assert history.content(3) == "a\nmanual\n"
+
+
+def test_compaction_bounds_storage(tmp_path):
+    """Old versions should be dropped and unreferenced snapshots deleted."""
+    history = CrontabHistory(make_config(tmp_path, checkpoint_every=5, max_versions=20))
+    content = ""
+    for i in range(500):
+        new = f"{i % 60} * * * * job\n" + ("x\n" * (i % 7))
+        history.record(content, new, f"change {i}")
+        content = new
+
+    versions = history.versions()
+    assert len(versions) <= 25
+    assert history.content(versions[-1]["version"]) == content
+    assert history.content(versions[0]["version"])
+    objects = sum(len(files) for _, _, files in os.walk(history.objects_dir))
+    assert objects <= 6
+
+
+def test_executor_rollback(tmp_path):
+    """Rolling back should restore the old crontab and record a new version."""
+    executor = CronExecutor(logging.getLogger("test_history"), make_config(tmp_path), backend=MemoryBackend())
+    first = executor.add("0 1 * * *", "/bin/true")
+    executor.add("0 2 * * *", "/bin/false")
+    executor.remove(first)
+    assert [job["command"] for job in executor.list_all()] == ["/bin/false"]
+
+    executor.rollback(2)
+    assert [job["command"] for job in executor.list_all()] == ["/bin/true"]
+    assert executor.history.versions()[-1]["action"] == "rollback to version 2"
+
+
+def test_histories_are_kept_per_backend_and_target(tmp_path):
+    """Each backend target gets its own versions; --rollback cannot cross them."""
+    config = make_config(tmp_path)
+    logger = logging.getLogger("test_history")
+    first = CronExecutor(logger, config, backend=TabfileBackend(str(tmp_path / "a.tab")))
+    second = CronExecutor(logger, config, backend=TabfileBackend(str(tmp_path / "b.tab")))
+    drop_ins = CronExecutor(logger, config, backend=DropInBackend(str(tmp_path / "cron.d"), "cjm", "root"))
+    first.add("0 1 * * *", "/bin/true")
+    second.add("0 2 * * *", "/bin/false")
+    drop_ins.add("0 3 * * *", "/bin/true", comment="etl")
+    assert first.history.dir != second.history.dir != drop_ins.history.dir
+    assert len(first.history.versions()) == len(second.history.versions()) == 2
+
+    # A log copied from another target is refused instead of restored
+    shutil.rmtree(drop_ins.history.dir)
+    shutil.copytree(first.history.dir, drop_ins.history.dir)
+    with pytest.raises(ValueError, match="tabfile backend"):
+        drop_ins.rollback(2)
+    assert sorted(os.listdir(tmp_path / "cron.d")) == ["cjm-etl"]
+
+
+def test_drop_ins_refuse_foreign_content(tmp_path):
+    """Restoring a non-drop-in rendering must not delete the managed drop-ins."""
+    backend = DropInBackend(str(tmp_path), "cjm", "root")
+    with pytest.raises(ValueError):
+        backend.restore("0 1 * * * /bin/true\n")
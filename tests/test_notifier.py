@@ -0,0 +1,185 @@
+"""
+Purpose: Unit tests for the batched notification pipeline.
+
+Covers:
+- Disabled / filtered events
+- Digest deduplication
+- Batch window across Notifier instances (separate processes share the spool)
+- SMTP connection reuse
+- End-to-end delivery to a local aiosmtpd server
+- Flush crontab entry installed by JobManager.add_job
+"""
+
+import logging
+import socket
+import threading
+from unittest.mock import MagicMock
+import pytest
+from script.notifier import Notifier
+
+
+def make_config(tmp_path, **overrides):
+    """Build a config dict with notifications enabled and state in tmp_path."""
+    notification = {"enabled": True, "email": "ops@example.com", "sender": "cron@example.com",
+                    "smtp_server": "127.0.0.1", "smtp_port": 2525, "batch_window": 300,
+                    "notify_on": ["failure", "success"]}
+    notification.update(overrides)
+    return {"notification": notification, "state": {"dir": str(tmp_path)}}
+
+
+def make_notifier(tmp_path, factory=None, **overrides):
+    """Create a Notifier with a mock SMTP factory."""
+    factory = factory or MagicMock()
+    return Notifier(logging.getLogger("test_notifier"), make_config(tmp_path, **overrides), smtp_factory=factory)
+
+
+def test_disabled_notifier_does_nothing(tmp_path):
+    """Events should be ignored when notifications are disabled."""
+    factory = MagicMock()
+    notifier = make_notifier(tmp_path, factory, enabled=False)
+    notifier.notify("failure", "job", "failed")
+    notifier.close(force_flush=True)
+    factory.assert_not_called()
+    assert not (tmp_path / "notifications.spool").exists()
+
+
+def test_unsubscribed_events_are_dropped(tmp_path):
+    """Only event kinds listed in notify_on should be delivered."""
+    factory = MagicMock()
+    notifier = make_notifier(tmp_path, factory, notify_on=["failure"])
+    notifier.notify("success", "job", "ok")
+    notifier.close(force_flush=True)
+    factory.assert_not_called()
+
+
+def test_digest_deduplicates_repeated_failures(tmp_path):
+    """Repeated failures of one job should collapse into a single digest line."""
+    notifier = make_notifier(tmp_path)
+    events = [{"event": "failure", "job_id": "a", "message": "exit 1", "details": "boom",
+               "time": f"2026-01-01T00:0{i}:00", "host": "h1"} for i in range(5)]
+    events.append({"event": "success", "job_id": "b", "message": "ok", "details": "",
+                   "time": "2026-01-01T00:09:00", "host": "h1"})
+    body = notifier.build_digest(events).get_content()
+
+    assert body.count("[failure]") == 1
+    assert "(x5, first 2026-01-01T00:00:00)" in body
+    assert "[success]" in body
+
+
+def test_batch_window_shared_between_instances(tmp_path):
+    """A second process within the batch window should spool instead of sending."""
+    factory = MagicMock()
+    first = make_notifier(tmp_path, factory)
+    first.notify("failure", "a", "failed")
+    first.close()
+    assert factory.return_value.send_message.call_count == 1
+
+    second = make_notifier(tmp_path, factory)
+    for _ in range(50):
+        second.notify("failure", "b", "failed")
+    second.close()
+    assert factory.return_value.send_message.call_count == 1
+
+    third = make_notifier(tmp_path, factory)
+    assert third.flush() == 50
+    assert factory.return_value.send_message.call_count == 2
+
+
+def test_failed_delivery_keeps_events(tmp_path):
+    """Events should be re-spooled when the SMTP server is unreachable."""
+    factory = MagicMock(side_effect=ConnectionRefusedError("down"))
+    notifier = make_notifier(tmp_path, factory)
+    notifier.notify("failure", "a", "failed")
+    notifier.close()
+    assert (tmp_path / "notifications.spool").read_text().count('"failure"') == 1
+
+
+def test_flush_races_with_writers(tmp_path):
+    """Events spooled while other threads flush must be delivered exactly once."""
+    notifier = make_notifier(tmp_path)
+    done = threading.Event()
+    delivered = []
+
+    def writer(name):
+        for i in range(200):
+            notifier._spool([{"event": "failure", "job_id": f"{name}-{i}", "message": "x", "time": "t", "host": "h"}])
+
+    def flusher():
+        while not done.is_set():
+            delivered.append(notifier.flush())
+
+    writers = [threading.Thread(target=writer, args=(name,)) for name in "abcd"]
+    flushing = threading.Thread(target=flusher)
+    flushing.start()
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    flushing.join()
+    delivered.append(notifier.flush())
+    assert sum(delivered) == 800
+
+
+def test_pool_reuses_connection(tmp_path):
+    """Successive digests of one process should reuse the SMTP connection."""
+    factory = MagicMock()
+    notifier = make_notifier(tmp_path, factory)
+    for job in ("a", "b"):
+        notifier._spool([{"event": "failure", "job_id": job, "message": "x", "time": "t", "host": "h"}])
+        notifier.flush()
+    assert factory.call_count == 1
+    assert factory.return_value.send_message.call_count == 2
+
+
+def test_storm_delivered_as_one_digest_to_local_smtp(tmp_path):
+    """500 failures should arrive as a single e-mail at a local SMTP server."""
+    controller_module = pytest.importorskip("aiosmtpd.controller")
+    handlers = pytest.importorskip("aiosmtpd.handlers")
+
+    class Collector(handlers.Message):
+        def __init__(self):
+            super().__init__()
+            self.messages = []
+
+        def handle_message(self, message):
+            self.messages.append(message)
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    collector = Collector()
+    controller = controller_module.Controller(collector, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        config = make_config(tmp_path, smtp_port=port)
+        # Pretend a digest was just sent so the whole storm lands in the next one
+        (tmp_path / "notifications.spool.sent").touch()
+        notifier = Notifier(logging.getLogger("test_notifier"), config)
+        for i in range(500):
+            notifier.notify("failure", f"job{i % 10}", "failed with exit code 1")
+        notifier.close(force_flush=True)
+    finally:
+        controller.stop()
+
+    assert len(collector.messages) == 1
+    message = collector.messages[0]
+    assert message["To"] == "ops@example.com"
+    assert "500 failure" in message["Subject"]
+    assert message.get_payload().count("[failure]") == 10
+
+
+def test_add_job_installs_flush_entry_once(tmp_path):
+    """Adding jobs with notifications enabled should install a single flush entry."""
+    from script.job import JobManager, NOTIFY_FLUSH_ID
+
+    config = {**make_config(tmp_path), "storage": {"backend": "memory"}}
+    manager = JobManager(logging.getLogger("test_notifier"), config)
+    manager.add_job("0 1 * * *", "/bin/true")
+    manager.add_job("0 2 * * *", "/bin/true")
+
+    flush = [job for job in manager.executor.list_all() if job["id"] == NOTIFY_FLUSH_ID]
+    assert len(flush) == 1
+    assert flush[0]["schedule"] == "*/5 * * * *"
+    assert "main.py --notify-flush" in flush[0]["command"]
@@ -0,0 +1,91 @@
+"""
+Purpose: Unit tests for resource isolation profiles.
+
+Covers:
+- resolve_profile (explicit profile, tag assignment, unknown profile)
+- validate_profile
+- build_preexec applied to a real child process
+"""
+
+import subprocess
+import pytest
+from script.resources import build_preexec, resolve_profile, validate_profile
+
+CONFIG = {
+    "resources": {
+        "profiles": {
+            "heavy": {"cpu_seconds": 60, "nice": 5, "timeout": 30},
+            "small": {"open_files": 64},
+        },
+        "tags": {"etl": "heavy"},
+    }
+}
+
+
+def test_resolve_explicit_profile_wins_over_tag():
+    """An explicit profile should override the tag assignment."""
+    assert resolve_profile(CONFIG, "small", "etl") == {"open_files": 64}
+
+
+def test_resolve_profile_from_tag():
+    """Jobs with a mapped tag should get the tag's profile."""
+    assert resolve_profile(CONFIG, tag="etl")["cpu_seconds"] == 60
+    assert resolve_profile(CONFIG, tag="other") == {}
+    assert resolve_profile({}) == {}
+
+
+def test_resolve_unknown_profile():
+    """Unknown profile names should raise ValueError."""
+    with pytest.raises(ValueError):
+        resolve_profile(CONFIG, "missing")
+
+
+@pytest.mark.parametrize("profile", [
+    {"cpu": 10},
+    {"nice": 40},
+    {"io_class": "fast"},
+    {"timeout": -1},
+])
+def test_validate_profile_rejects_invalid(profile):
+    """Invalid profile settings should raise ValueError."""
+    with pytest.raises(ValueError):
+        validate_profile("bad", profile)
+
+
+def test_build_preexec_timeout_only():
+    """A profile with only a timeout needs no preexec function."""
+    assert build_preexec({"timeout": 5}) is None
+    assert build_preexec({}) is None
+
+
+def test_build_preexec_applies_limits():
+    """Limits and nice level should be visible inside the child process."""
+    preexec = build_preexec({"open_files": 64, "nice": 3})
+    output = subprocess.run(
+        "ulimit -n; nice", shell=True, capture_output=True, text=True, preexec_fn=preexec, check=True
+    ).stdout.split()
+    base_nice = int(subprocess.run("nice", shell=True, capture_output=True, text=True).stdout)
+    assert output[0] == "64"
+    assert int(output[1]) == base_nice + 3
+
+
+def test_build_preexec_resolves_io_priority_in_parent(monkeypatch):
+    """libc must be loaded when the function is built, never in the forked child."""
+    calls = []
+
+    class FakeLibc:
+        def syscall(self, *args):
+            calls.append(args)
+            return 0
+
+    monkeypatch.setattr("script.resources.platform.system", lambda: "Linux")
+    monkeypatch.setattr("script.resources.platform.machine", lambda: "x86_64")
+    monkeypatch.setattr("script.resources.ctypes.CDLL", lambda *args, **kwargs: FakeLibc())
+    preexec = build_preexec({"io_class": "idle"})
+
+    def no_load(*args, **kwargs):
+        raise AssertionError("libc loaded in the child")
+
+    monkeypatch.setattr("script.resources.ctypes.CDLL", no_load)
+    preexec()
+    assert calls == [(251, 1, 0, 3 << 13)]
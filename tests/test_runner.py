@@ -0,0 +1,172 @@
+"""
+Purpose: Unit tests for the output-capturing job runner.
+
+Covers:
+- wrap_command / unwrap_command
+- TailBuffer
+- CompressingLogWriter rotation and compression
+- JobRunner.run and read_job_logs
+- JobRunner.execute (timeouts, retries with backoff, run records)
+"""
+
+import gzip
+import logging
+import os
+import time
+import pytest
+from unittest.mock import patch
+from script.runner import (
+    CompressingLogWriter,
+    JobRunner,
+    PROJECT_ROOT,
+    TailBuffer,
+    read_job_logs,
+    runner_settings,
+    unwrap_command,
+    validate_job_id,
+    wrap_command,
+)
+
+
+def make_config(tmp_path, **overrides):
+    """Build a config dict pointing runner logs into tmp_path."""
+    runner = {"log_dir": str(tmp_path / "jobs"), "max_bytes": 0, "backup_count": 3,
+              "buffer_size": 1024, "tail_kb": 1}
+    runner.update(overrides)
+    return {"runner": runner, "state": {"dir": str(tmp_path / "state")}}
+
+
+def backoff_delays(mock_sleep):
+    """Return the backoff delays passed to time.sleep (ignoring subprocess polling)."""
+    return [c.args[0] for c in mock_sleep.call_args_list if c.args and c.args[0] >= 1]
+
+
+def test_wrap_and_unwrap_round_trip():
+    """Wrapped command should unwrap back to the original command."""
+    command = "echo 'hello world' && ls -l | grep x"
+    wrapped = wrap_command("abc-123", command)
+    assert "--run --id abc-123" in wrapped
+    assert unwrap_command(wrapped) == command
+
+
+def test_unwrap_plain_command_unchanged():
+    """Commands not routed through the runner are returned unchanged."""
+    assert unwrap_command("/usr/bin/backup.sh") == "/usr/bin/backup.sh"
+
+
+def test_validate_job_id_rejects_paths():
+    """Job IDs must not be usable for path traversal."""
+    with pytest.raises(ValueError):
+        validate_job_id("../etc/passwd")
+
+
+def test_tail_buffer_keeps_last_bytes():
+    """TailBuffer should never hold more than its capacity."""
+    tail = TailBuffer(8)
+    tail.write(b"0123456789")
+    tail.write(b"abc")
+    assert tail.getvalue() == b"56789abc"
+    tail.write(b"x" * 100)
+    assert tail.getvalue() == b"x" * 8
+
+
+def test_writer_rotates_and_compresses(tmp_path):
+    """Rotated segments should be gzipped and limited to backup_count."""
+    path = str(tmp_path / "job.log")
+    writer = CompressingLogWriter(path, max_bytes=10, backup_count=2)
+    writer.write(b"a" * 10 + b"b" * 10 + b"c" * 10 + b"d" * 5)
+    writer.close()
+
+    assert not (tmp_path / "job.log.3.gz").exists()
+    assert gzip.decompress((tmp_path / "job.log.1.gz").read_bytes()) == b"c" * 10
+    assert gzip.decompress((tmp_path / "job.log.2.gz").read_bytes()) == b"b" * 10
+    assert (tmp_path / "job.log").read_bytes() == b"d" * 5
+
+
+def test_run_captures_output_and_tail(tmp_path):
+    """JobRunner should stream all output to logs but keep only a bounded tail."""
+    config = make_config(tmp_path, max_bytes=8192)
+    runner = JobRunner(logging.getLogger("test_runner"), config)
+    result = runner.run("job1", "for i in $(seq 1 2000); do echo line$i; done; echo err >&2; exit 3")
+
+    assert result["returncode"] == 3
+    assert len(result["tail"]) <= 1024
+    assert result["tail"].endswith("err\n")
+
+    output = b"".join(read_job_logs("job1", config)).decode()
+    assert "line1\n" in output
+    assert "line2000\n" in output
+    assert "exit code 3" in output
+    assert list((tmp_path / "jobs").glob("job1.log.*.gz"))
+
+
+def test_read_logs_missing_job(tmp_path):
+    """Reading logs of an unknown job should raise FileNotFoundError."""
+    with pytest.raises(FileNotFoundError):
+        list(read_job_logs("missing", make_config(tmp_path)))
+
+
+def test_run_kills_job_after_timeout(tmp_path):
+    """A job exceeding the profile timeout should be killed and flagged."""
+    runner = JobRunner(logging.getLogger("test_runner"), make_config(tmp_path))
+    result = runner.run("slow", "echo started; exec sleep 5", profile={"timeout": 0.5})
+
+    assert result["timed_out"] is True
+    assert result["returncode"] != 0
+    assert "started" in result["tail"]
+
+
+def test_timeout_kills_whole_process_group(tmp_path):
+    """Background children of a timed-out job should be killed too."""
+    marker = tmp_path / "survived"
+    runner = JobRunner(logging.getLogger("test_runner"), make_config(tmp_path, kill_grace=0.2))
+    started = time.monotonic()
+    result = runner.run("group", f"(sleep 1 && touch {marker}) & sleep 10", timeout=0.3)
+
+    assert result["timed_out"] is True
+    assert time.monotonic() - started < 5
+    time.sleep(1.2)
+    assert not marker.exists()
+
+
+@patch("script.runner.time.sleep")
+def test_execute_retries_with_backoff_and_records_attempts(mock_sleep, tmp_path):
+    """Failed attempts should be retried with growing delays and recorded."""
+    config = make_config(tmp_path, retry={"backoff_base": 1, "backoff_max": 3, "jitter": 0, "max_total": 0})
+    runner = JobRunner(logging.getLogger("test_runner"), config)
+    result = runner.execute("flaky", "exit 1", retries=3)
+
+    assert result["attempt"] == 4
+    assert backoff_delays(mock_sleep) == [1, 2, 3]
+    attempts = runner.store.history("flaky")
+    assert [a["attempt"] for a in attempts] == [1, 2, 3, 4]
+    assert all(a["returncode"] == 1 for a in attempts)
+
+
+@patch("script.runner.time.sleep")
+def test_execute_stops_after_success(mock_sleep, tmp_path):
+    """A job that succeeds on a retry should not be attempted again."""
+    counter = tmp_path / "count"
+    config = make_config(tmp_path, retry={"backoff_base": 1, "jitter": 0})
+    runner = JobRunner(logging.getLogger("test_runner"), config)
+    result = runner.execute("eventual", f"echo x >> {counter}; [ $(wc -l < {counter}) -ge 2 ]", retries=5)
+
+    assert result["returncode"] == 0
+    assert result["attempt"] == 2
+    assert backoff_delays(mock_sleep) == [1]
+
+
+def test_execute_respects_max_total(tmp_path):
+    """Retries should stop once the total time budget would be exceeded."""
+    config = make_config(tmp_path, retry={"backoff_base": 5, "jitter": 0, "max_total": 1})
+    runner = JobRunner(logging.getLogger("test_runner"), config)
+    result = runner.execute("budget", "exit 2", retries=10)
+
+    assert result["attempt"] == 1
+    assert len(runner.store.history("budget")) == 1
+
+
+def test_relative_log_dir_is_project_relative(tmp_path, monkeypatch):
+    """Job logs should be found from any directory, like the cron runner writes them."""
+    monkeypatch.chdir(tmp_path)
+    assert runner_settings({})["log_dir"] == os.path.join(PROJECT_ROOT, "logs", "jobs")
@@ -0,0 +1,111 @@
+"""
+Purpose: Unit tests for cron schedule parsing and fire-time arithmetic.
+
+Covers:
+- Parsing (ranges, steps, names, macros, invalid input)
+- Day-of-month / day-of-week semantics
+- iter_between / count_between / last_before against a brute-force scan
+- Canonical rendering of equivalent schedules
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from script.schedule import CronSchedule
+
+
+def brute_force(expression, after, before):
+    """Reference implementation: test every minute in the range."""
+    schedule = CronSchedule(expression)
+    moment = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    fires = []
+    while moment < before:
+        if (schedule.matches_day(moment.date()) and moment.hour in schedule.hours
+                and moment.minute in schedule.minutes):
+            fires.append(moment)
+        moment += timedelta(minutes=1)
+    return fires
+
+
+@pytest.mark.parametrize("expression", ["100 * * * *", "* *", "*/0 * * * *", "5-1 * * * *", "* * * foo *", ""])
+def test_invalid_expressions(expression):
+    """Invalid expressions should raise ValueError."""
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_parse_fields():
+    """Ranges, steps, lists and names should expand to value sets."""
+    schedule = CronSchedule("5/20 1-5/2,23 * jan,jun mon-fri")
+    assert schedule.minutes == (5, 25, 45)
+    assert schedule.hours == (1, 3, 5, 23)
+    assert schedule.months == {1, 6}
+    assert schedule.weekdays == {1, 2, 3, 4, 5}
+
+
+def test_day_of_month_or_day_of_week():
+    """Restricted day-of-month and day-of-week fields match if either matches."""
+    schedule = CronSchedule("0 0 13 * 5")
+    assert schedule.matches_day(datetime(2026, 3, 13).date())   # Friday 13th
+    assert schedule.matches_day(datetime(2026, 3, 6).date())    # any Friday
+    assert schedule.matches_day(datetime(2026, 4, 13).date())   # any 13th
+    assert not schedule.matches_day(datetime(2026, 4, 14).date())
+    assert not CronSchedule("0 0 * * 5").matches_day(datetime(2026, 4, 13).date())
+
+
+@pytest.mark.parametrize("expression", [
+    "*/15 * * * *", "30 2 * * *", "0 9-17 * * mon-fri", "0 0 1,15 * 0", "@weekly", "7 */5 31 * *",
+])
+def test_iteration_and_count_match_brute_force(expression):
+    """Arithmetic enumeration should agree with a minute-by-minute scan."""
+    after, before = datetime(2026, 2, 26, 13, 7), datetime(2026, 3, 9, 4, 30)
+    expected = brute_force(expression, after, before)
+    schedule = CronSchedule(expression)
+    assert list(schedule.iter_between(after, before)) == expected
+    assert schedule.count_between(after, before) == len(expected)
+    assert schedule.last_before(before, after) == (expected[-1] if expected else None)
+
+
+def test_count_over_long_range_is_fast():
+    """Counting a year of per-minute fires should not enumerate them."""
+    schedule = CronSchedule("* * * * *")
+    assert schedule.count_between(datetime(2025, 1, 1), datetime(2026, 1, 1)) == 365 * 24 * 60 - 1
+
+
+def test_reboot_never_fires():
+    """@reboot schedules have no fire times."""
+    schedule = CronSchedule("@reboot")
+    assert schedule.count_between(datetime(2026, 1, 1), datetime(2026, 2, 1)) == 0
+    assert schedule.canonical() == "@reboot"
+
+
+@pytest.mark.parametrize("first,second", [
+    ("*/15 * * * *", "0,15,30,45 * * * *"),
+    ("@daily", "0 0 * * *"),
+    ("0 0 * * 1-5", "0 0 * * mon-fri"),
+    ("0 0 * * 0", "0 0 * * 7"),
+    ("0 0 1-31 * *", "0 0 * * *"),
+    ("0 0 15 * 0-6", "0 0 * * *"),
+])
+def test_equivalent_schedules_share_canonical_form(first, second):
+    """Equivalent schedules should render to the same canonical form."""
+    assert CronSchedule(first).canonical() == CronSchedule(second).canonical()
+    assert CronSchedule(first) == CronSchedule(second)
+
+
+@pytest.mark.parametrize("expression", ["0 0 */31 * 1", "0 0 1 * */7", "0 0 */2,6 * 1", "30 4 */31,15 * 5"])
+def test_canonical_keeps_starred_day_fields(expression):
+    """A '*'-led day field with one value must not lose its '*' (AND vs OR of day fields)."""
+    schedule = CronSchedule(expression)
+    canonical = CronSchedule(schedule.canonical())
+    assert (canonical.day_star, canonical.weekday_star) == (schedule.day_star, schedule.weekday_star)
+    start, end = datetime(2024, 1, 1), datetime(2026, 1, 1)
+    assert list(canonical.iter_between(start, end)) == list(schedule.iter_between(start, end))
+    assert CronSchedule("0 0 */31 * 1") != CronSchedule("0 0 1 * 1")
+
+
+def test_canonical_keeps_day_semantics():
+    """Canonical form must not turn an OR of day fields into an AND."""
+    restricted = CronSchedule("0 0 1-31/2 * 1")
+    canonical = CronSchedule(restricted.canonical())
+    assert not canonical.day_star and not canonical.weekday_star
+    assert canonical != CronSchedule("0 0 */2 * 1")
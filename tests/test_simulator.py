@@ -0,0 +1,92 @@
+"""
+Purpose: Unit tests for the load simulator.
+
+Covers:
+- Workload durations from estimates, recorded runs and defaults
+- Peak concurrency, queueing delay and saturation on small hand-checked cases
+- Saturation clipped to the simulated period while leftover runs play out
+- Candidate parsing and a week-long simulation staying fast
+"""
+
+import time
+from datetime import datetime, timedelta
+import pytest
+from script.schedule import CronSchedule
+from script.simulator import build_workload, parse_candidate, simulate
+from script.state import RunStore
+
+START = datetime(2024, 6, 3)
+
+
+def job(schedule, duration, job_id="j"):
+    """Build a workload entry."""
+    return {"id": job_id, "schedule": CronSchedule(schedule), "duration": duration}
+
+
+def test_workload_durations(tmp_path):
+    """Estimates beat recorded averages, which beat the default."""
+    store = RunStore({"state": {"dir": str(tmp_path)}})
+    for duration in (10, 20, 30):
+        store.record({"job_id": "recorded", "returncode": 0, "duration": duration})
+    jobs = [
+        {"id": "recorded", "schedule": "@hourly", "enabled": True},
+        {"id": "estimated", "schedule": "@hourly", "enabled": True},
+        {"id": "unknown", "schedule": "@hourly", "enabled": True},
+        {"id": "downstream", "schedule": "@reboot", "enabled": False},
+    ]
+    workload = build_workload(jobs, store, {"estimated": 5}, default_duration=60, history_runs=2)
+    assert {entry["id"]: entry["duration"] for entry in workload} == {"recorded": 25, "estimated": 5, "unknown": 60}
+
+
+def test_queueing_on_a_single_core():
+    """Three 10-minute jobs at 02:00 on one core should queue behind each other."""
+    workload = [job("0 2 * * *", 600, f"j{i}") for i in range(3)]
+    report = simulate(workload, 1, START, START + timedelta(days=1))
+    assert report["runs"] == 3
+    assert report["peak_concurrent"] == 3
+    assert report["peak_at"] == START.replace(hour=2)
+    assert report["delayed_runs"] == 2
+    assert report["max_delay"] == 1200
+    assert report["mean_delay"] == 600
+    assert report["saturation_minutes"] == 30
+
+
+def test_enough_cores_means_no_delay():
+    """With one core per concurrent job nothing should wait."""
+    workload = [job("*/15 * * * *", 600, "a"), job("*/15 * * * *", 600, "b")]
+    report = simulate(workload, 2, START, START + timedelta(days=1))
+    assert report["runs"] == 192
+    assert report["peak_concurrent"] == 2
+    assert report["mean_delay"] == 0
+    # Both cores are busy 10 of every 15 minutes
+    assert report["saturation_minutes"] == pytest.approx(96 * 10)
+
+
+def test_saturation_stops_at_the_end_of_the_period():
+    """Runs finishing after the horizon only count their delays, not their saturation."""
+    report = simulate([job("0 23 * * *", 7200)], 1, START, START + timedelta(days=1))
+    assert report["saturation_minutes"] == 60
+
+    overloaded = [job("*/5 * * * *", 3600, f"j{i}") for i in range(20)]
+    report = simulate(overloaded, 2, START, START + timedelta(days=1))
+    assert report["saturation_minutes"] <= 1440
+    assert report["max_delay"] > 86400
+
+
+def test_parse_candidate():
+    """Candidates are ';'-separated schedules with optional durations."""
+    jobs = parse_candidate("0 2 * * *=600; @hourly", default_duration=60)
+    assert [(entry["id"], entry["duration"]) for entry in jobs] == [("candidate-1", 600), ("candidate-2", 60)]
+    with pytest.raises(ValueError):
+        parse_candidate("0 2 * *=600", 60)
+    with pytest.raises(ValueError):
+        parse_candidate("0 2 * * *=0", 60)
+
+
+def test_week_simulation_is_fast():
+    """A week of 200 jobs (over 100k runs) should simulate in seconds."""
+    workload = [job(f"*/{5 + i % 10} * * * *", 30 + i, f"j{i}") for i in range(200)]
+    began = time.monotonic()
+    report = simulate(workload, 8, START, START + timedelta(days=7))
+    assert report["runs"] > 100000
+    assert time.monotonic() - began < 10
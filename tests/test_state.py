@@ -0,0 +1,51 @@
+"""
+Purpose: Unit tests for the RunStore (per-job run records).
+"""
+
+import os
+import pytest
+from script.state import RunStore, state_settings
+from script.utils import PROJECT_ROOT
+
+
+def make_store(tmp_path, keep_runs=3):
+    """Create a RunStore rooted in tmp_path."""
+    return RunStore({"state": {"dir": str(tmp_path), "keep_runs": keep_runs}})
+
+
+def test_record_and_history(tmp_path):
+    """Recorded runs should be returned oldest first."""
+    store = make_store(tmp_path)
+    store.record({"job_id": "a", "returncode": 1})
+    store.record({"job_id": "a", "returncode": 0})
+    assert [r["returncode"] for r in store.history("a")] == [1, 0]
+    assert store.last_run("a")["returncode"] == 0
+
+
+def test_unknown_job_has_no_runs(tmp_path):
+    """Jobs without records should report no history."""
+    store = make_store(tmp_path)
+    assert store.history("never") == []
+    assert store.last_run("never") is None
+
+
+def test_history_is_trimmed(tmp_path):
+    """Run files should be trimmed to the most recent keep_runs records."""
+    store = make_store(tmp_path, keep_runs=3)
+    for i in range(7):
+        store.record({"job_id": "b", "n": i})
+    assert [r["n"] for r in store.history("b")] == [4, 5, 6]
+
+
+def test_rejects_unsafe_job_id(tmp_path):
+    """Job IDs containing path separators should be rejected."""
+    with pytest.raises(ValueError):
+        make_store(tmp_path).record({"job_id": "../x"})
+
+
+def test_relative_state_dir_is_project_relative(tmp_path, monkeypatch):
+    """A relative state dir should not depend on the current directory."""
+    monkeypatch.chdir(tmp_path)
+    settings = state_settings({"state": {"dir": "state"}})
+    assert settings["dir"] == os.path.join(PROJECT_ROOT, "state")
+    assert state_settings({"state": {"dir": str(tmp_path)}})["dir"] == str(tmp_path)
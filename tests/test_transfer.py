@@ -0,0 +1,182 @@
+"""
+Purpose: Unit tests for binary export/import of job sets.
+
+Covers:
+- Round trip of jobs, tags, enabled state, runner options and dependencies
+- Precompiled schedule masks matching parsed schedules
+- Checksum, magic and version validation
+- Import through CronExecutor in one write, and a large job set
+- Invalid dependency graphs rejected before the crontab is written
+- Crafted IDs, tags and runner options cannot inject shell commands
+- Crafted commands and schedules cannot inject crontab lines
+- Schedule text that disagrees with its stored masks is rejected
+"""
+
+import hashlib
+import logging
+import time
+import uuid
+import pytest
+from script.backends import MemoryBackend
+from script.executor import CronExecutor
+from script.job import JobManager
+from script.runner import wrap_command
+from script.schedule import CronSchedule
+from script.transfer import HEADER, crontab_command, pack_jobs, unpack_jobs
+
+
+def sample_jobs():
+    """A small job set with plain, runner-wrapped and disabled jobs."""
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+    return [
+        {"id": first, "tag": "etl", "schedule": "*/15 8-18 * * mon-fri", "enabled": True,
+         "command": wrap_command(first, "/opt/etl.sh --full", {"--tag": "etl", "--timeout": 600.0, "--retries": 2})},
+        {"id": second, "tag": "", "schedule": "@reboot", "enabled": False, "command": wrap_command(second, "/bin/true")},
+        {"id": "legacy-1", "tag": "", "schedule": "0 3 1,15 * 0", "enabled": True, "command": "echo 'hi there'"},
+    ]
+
+
+def test_round_trip():
+    """Jobs and dependencies should come back unchanged, with commands unwrapped."""
+    jobs = sample_jobs()
+    loaded, upstreams = unpack_jobs(pack_jobs(jobs, {jobs[1]["id"]: [jobs[0]["id"]], "gone": ["x"]}))
+
+    assert [job["id"] for job in loaded] == [job["id"] for job in jobs]
+    assert [job["schedule"] for job in loaded] == [job["schedule"] for job in jobs]
+    assert [job["enabled"] for job in loaded] == [True, False, True]
+    assert [job["tag"] for job in loaded] == ["etl", "", ""]
+    assert loaded[0]["command"] == "/opt/etl.sh --full"
+    assert loaded[2]["options"] is None
+    assert upstreams == {jobs[1]["id"]: [jobs[0]["id"]]}
+    assert crontab_command(loaded[0]) == jobs[0]["command"]
+    assert crontab_command(loaded[2]) == "echo 'hi there'"
+
+
+def test_masks_match_parsed_schedules():
+    """Schedules rebuilt from masks should behave like parsed ones."""
+    for job in unpack_jobs(pack_jobs(sample_jobs()))[0]:
+        parsed = CronSchedule(job["schedule"])
+        rebuilt = job["parsed"]
+        assert rebuilt == parsed
+        assert (rebuilt.day_star, rebuilt.weekday_star, rebuilt.reboot) == (
+            parsed.day_star, parsed.weekday_star, parsed.reboot)
+
+
+def test_rejects_corrupt_files():
+    """Checksum, magic and version should be verified."""
+    data = bytearray(pack_jobs(sample_jobs()))
+    tampered = bytes(data[:-1] + bytes([data[-1] ^ 1]))
+    with pytest.raises(ValueError, match="checksum"):
+        unpack_jobs(tampered)
+    with pytest.raises(ValueError, match="magic"):
+        unpack_jobs(b"XXXX" + bytes(data[4:]))
+    future = bytes(data[:4]) + (99).to_bytes(2, "little") + bytes(data[6:])
+    with pytest.raises(ValueError, match="version"):
+        unpack_jobs(future)
+    with pytest.raises(ValueError):
+        unpack_jobs(bytes(data[:HEADER.size - 1]))
+
+
+def test_import_replaces_in_one_write(tmp_path):
+    """Import should add all jobs in one recorded write and replace existing UUIDs."""
+    jobs = sample_jobs()
+    executor = CronExecutor(logging.getLogger("test_transfer"), {"state": {"dir": str(tmp_path)}},
+                            backend=MemoryBackend())
+    executor.add("0 0 * * *", "/bin/old", job_id=jobs[2]["id"])
+    versions = len(executor.history.versions())
+
+    loaded, _ = unpack_jobs(pack_jobs(jobs))
+    executor.add_many([{"id": job["id"], "schedule": job["schedule"], "command": crontab_command(job),
+                        "tag": job["tag"], "enabled": job["enabled"]} for job in loaded])
+
+    assert len(executor.history.versions()) == versions + 1
+    listed = executor.list_all()
+    assert sorted(job["id"] for job in listed) == sorted(job["id"] for job in jobs)
+    assert [job["command"] for job in listed if job["id"] == "legacy-1"] == ["echo 'hi there'"]
+    assert [job["tag"] for job in listed if job["id"] == jobs[0]["id"]] == ["etl"]
+
+
+def test_bad_graph_leaves_crontab_untouched(tmp_path):
+    """A dependency cycle in the file should fail the import before anything is written."""
+    jobs = sample_jobs()
+    path = tmp_path / "jobs.cjm"
+    path.write_bytes(pack_jobs(jobs, {jobs[0]["id"]: [jobs[1]["id"]], jobs[1]["id"]: [jobs[0]["id"]]}))
+    manager = JobManager(logging.getLogger("test_transfer"),
+                         {"storage": {"backend": "memory"}, "state": {"dir": str(tmp_path / "state")}})
+
+    assert manager.import_jobs(str(path)) is False
+    assert manager.executor.list_all() == []
+    assert manager.graph.upstreams == {}
+    assert not (tmp_path / "state" / "dag.json").exists()
+
+
+def test_crafted_ids_and_tags_are_rejected():
+    """IDs and tags from the file must be safe for command lines and crontab comments."""
+    with pytest.raises(ValueError, match="job ID"):
+        unpack_jobs(pack_jobs([{"id": "x; touch /tmp/pwned", "schedule": "@hourly", "command": "/bin/true"}]))
+    with pytest.raises(ValueError, match="tag"):
+        unpack_jobs(pack_jobs([{"id": "ok", "tag": "t\n* * * * * evil", "schedule": "@hourly",
+                                "command": "/bin/true"}]))
+
+
+@pytest.mark.parametrize("runner", [False, True])
+def test_crafted_commands_cannot_add_crontab_lines(tmp_path, runner):
+    """A line break in a command would add its own crontab entry, quoted or not."""
+    command = "true\n* * * * * touch /tmp/pwned"
+    job = {"id": "ok", "schedule": "@hourly", "command": wrap_command("ok", command) if runner else command}
+    with pytest.raises(ValueError, match="command"):
+        unpack_jobs(pack_jobs([job]))
+
+    path = tmp_path / "jobs.cjm"
+    path.write_bytes(pack_jobs([job]))
+    manager = JobManager(logging.getLogger("test_transfer"),
+                         {"storage": {"backend": "memory"}, "state": {"dir": str(tmp_path / "state")}})
+    assert manager.import_jobs(str(path)) is False
+    assert manager.executor.backend.render() == ""
+
+
+def test_crafted_schedules_are_rejected():
+    """Schedule text from the file must not carry line breaks either."""
+    with pytest.raises(ValueError, match="schedule"):
+        unpack_jobs(pack_jobs([{"id": "ok", "schedule": "0 1 * *\n*", "command": "/bin/true"}]))
+
+
+def test_schedule_text_must_match_masks():
+    """Editing the schedule text (and recomputing the checksum) must not desync crontab and index."""
+    data = pack_jobs([{"id": "ok", "schedule": "0 1 * * *", "command": "/bin/true"}], compress=False)
+    payload = data[HEADER.size:].replace(b"0 1 * * *", b"* * * * *")
+    magic, version, flags, count, size, _ = HEADER.unpack_from(data)
+    forged = HEADER.pack(magic, version, flags, count, size, hashlib.sha256(payload).digest()) + payload
+    with pytest.raises(ValueError, match="masks"):
+        unpack_jobs(forged)
+
+
+def test_runner_options_are_rebuilt_not_spliced():
+    """Stored runner options are parsed and re-quoted; anything else is refused."""
+    job = unpack_jobs(pack_jobs(sample_jobs()))[0][0]
+    job["options"] = "--tag '$(touch /tmp/pwned)'"
+    assert "--tag '$(touch /tmp/pwned)'" in crontab_command(job)
+    job["options"] = "--tag x; touch /tmp/pwned"
+    with pytest.raises(ValueError, match="runner options"):
+        crontab_command(job)
+    job["id"] = "$(reboot)"
+    job["options"] = ""
+    with pytest.raises(ValueError, match="job ID"):
+        crontab_command(job)
+
+
+def test_large_job_set_is_compact_and_fast():
+    """20k jobs sharing a few commands should pack small and load quickly."""
+    jobs = [
+        {"id": str(uuid.uuid4()), "tag": f"team{i % 20}", "schedule": f"{i % 60} {i % 24} * * *",
+         "enabled": True, "command": f"/opt/jobs/run.sh --shard {i % 50}"}
+        for i in range(20000)
+    ]
+    data = pack_jobs(jobs)
+    assert len(data) < 20000 * 60
+
+    began = time.monotonic()
+    loaded, _ = unpack_jobs(data)
+    assert time.monotonic() - began < 5
+    assert len(loaded) == 20000
+    assert loaded[12345]["schedule"] == jobs[12345]["schedule"]